@@ -0,0 +1,81 @@
+"""
+==============================================================================
+BENCH_AST_MEMORY.PY - หน่วยความจำของ AST ต่อ 1,000 endpoints
+==============================================================================
+สร้าง API สังเคราะห์ (request model + endpoints ที่มี params, dict, list,
+list comprehension) ขนาด n endpoints แล้ววัดด้วย tracemalloc:
+    - peak     : หน่วยความจำสูงสุดระหว่าง parse() (tokens + parser stack + AST)
+    - retained : หน่วยความจำที่ AST ถือไว้หลัง parse() เสร็จ
+
+ผลลัพธ์รายงานเป็น KiB ต่อ 1,000 endpoints
+
+การรัน:
+    python benchmarks/bench_ast_memory.py
+    python benchmarks/bench_ast_memory.py --endpoints 1000 10000
+==============================================================================
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.parser import parse  # noqa: E402
+
+PREAMBLE = '''import dukpyra
+app = dukpyra.app()
+
+class CreateItem:
+    name: str
+    price: float
+    quantity: int
+
+'''
+
+ENDPOINT = '''@app.get("/items/{{item_id}}/e{i}")
+def get_item_{i}(item_id: int, verbose: bool, body: CreateItem):
+    return {{"id": item_id, "name": body.name, "tags": ["a", "b"], "active": True, "total": body.price * 2}}
+
+@app.get("/items/e{i}")
+def list_items_{i}():
+    return [{{"id": n, "name": "item"}} for n in [1, 2, 3] if n > 1]
+
+'''
+
+
+def make_source(endpoints: int) -> str:
+    return PREAMBLE + "".join(ENDPOINT.format(i=i) for i in range(endpoints // 2))
+
+
+def measure(source: str) -> tuple:
+    """(peak bytes, retained bytes) ของการ parse source หนึ่งครั้ง"""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    ast = parse(source)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert ast is not None and ast.endpoints, "generated source did not parse"
+    return peak - base, retained - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AST memory per 1,000 endpoints")
+    parser.add_argument("--endpoints", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args()
+
+    parse(make_source(2))  # warm up: load tables before measuring
+
+    print(f"{'endpoints':>10} {'peak KiB/1k':>12} {'retained KiB/1k':>16}")
+    for n in args.endpoints:
+        peak, retained = measure(make_source(n))
+        scale = 1000 / n / 1024
+        print(f"{n:>10} {peak * scale:>12.1f} {retained * scale:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+==============================================================================
+BENCH_AST_SERIALIZE.PY - เก็บ/โหลด AST เทียบกับ parse ใหม่
+==============================================================================
+ใช้ API สังเคราะห์เดียวกับ bench_ast_memory.py (n endpoints) แล้ววัด:
+    - parse      : parse() จาก source
+    - serialize  : dukpyra.serialize dumps / loads (ที่ .dukpyra/cache ใช้)
+    - pickle     : pickle.dumps / pickle.loads (HIGHEST_PROTOCOL) เพื่อเทียบ
+
+รายงานเวลาเป็น ms, ขนาดเป็น KiB และเวลา load เป็น % ของเวลา parse
+ทุกขนาดตรวจว่า loads(dumps(ast)) == ast
+
+การรัน:
+    python benchmarks/bench_ast_serialize.py
+    python benchmarks/bench_ast_serialize.py --endpoints 100 1000 --runs 10
+==============================================================================
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra import serialize  # noqa: E402
+from dukpyra.parser import parse  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_ast_memory import make_source  # noqa: E402
+
+
+def best_of(runs: int, func, *args) -> tuple:
+    """(เวลาที่ดีที่สุด ms, ผลลัพธ์)"""
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AST store/load time vs re-parsing")
+    parser.add_argument("--endpoints", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--runs", type=int, default=5, help="repetitions (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"{'endpoints':>10} {'codec':>10} {'dump ms':>9} {'load ms':>9} {'KiB':>8} {'load/parse':>11}")
+    for n in args.endpoints:
+        source = make_source(n)
+        parse_ms, ast = best_of(args.runs, parse, source)
+        print(f"{n:>10} {'parse':>10} {'':>9} {parse_ms:>9.2f}")
+
+        codecs = (
+            ("serialize", serialize.dumps, serialize.loads),
+            ("pickle", lambda tree: pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        )
+        for name, dumps, loads in codecs:
+            dump_ms, data = best_of(args.runs, dumps, ast)
+            load_ms, loaded = best_of(args.runs, loads, data)
+            if loaded != ast:
+                sys.exit(f"FAIL: {name} round trip changed the AST ({n} endpoints)")
+            print(f"{'':>10} {name:>10} {dump_ms:>9.2f} {load_ms:>9.2f} "
+                  f"{len(data) / 1024:>8.1f} {load_ms / parse_ms:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+==============================================================================
+BENCH_FIRST_PARSE.PY - เวลาตั้งแต่ import parser จนถึง parse แรกเสร็จ
+==============================================================================
+รันแต่ละ mode ใน interpreter ใหม่ (cold start จริง) แล้ววัด
+import lexer + parser + parse ไฟล์ตัวอย่างหนึ่งไฟล์
+
+Modes:
+    prebuilt       : วิธีปัจจุบัน - lextab.py (optimize=1) + parsetab.py ผ่าน LRTable
+                     ไม่ reflect grammar และไม่เขียนไฟล์
+    yacc-cached    : วิธีเดิม - lex.lex() + yacc.yacc() ที่เจอ parsetab.py ตรง
+                     signature: validate token rules และ grammar (อ่าน source
+                     ของ module) ทุกครั้งที่ import
+    yacc-cold      : วิธีเดิมตอน parsetab.py ไม่มีหรือไม่ตรง (install ใหม่,
+                     read-only dir): สร้าง LALR tables ทั้งหมดแล้วเขียน
+                     parsetab.py + parser.out
+
+yacc-* รันจากสำเนาของ package ใน temp dir ที่แก้สองบรรทัดกลับเป็นแบบเดิม
+
+การรัน:
+    python benchmarks/bench_first_parse.py
+    python benchmarks/bench_first_parse.py --runs 11
+==============================================================================
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE = '''import dukpyra
+app = dukpyra.app()
+
+class CreateUser:
+    name: str
+    age: int
+
+@app.get("/users/{user_id}")
+def get_user(user_id: int):
+    return {"id": user_id, "name": "Ann", "tags": [1, 2, 3]}
+
+@app.post("/users")
+def create_user(body: CreateUser):
+    return {"name": body.name, "active": True}
+'''
+
+# เวลาวัดภายใน process (ไม่รวม interpreter startup) พิมพ์ออกมาเป็น ms
+CODE = """
+import time
+t = time.perf_counter()
+from dukpyra.parser import parse
+ast = parse(SOURCE)
+assert ast is not None
+print((time.perf_counter() - t) * 1000)
+"""
+
+# วิธีเดิมของ lexer.py / parser.py (ก่อนใช้ prebuilt tables)
+LEGACY_LEXER = ("from . import lextab as _lextab", "raise ImportError")
+LEGACY_PARSER = ("parser = _load_parser()", "parser = yacc.yacc()")
+
+
+def legacy_package(dest: str) -> str:
+    """สำเนาของ package ที่ lexer/parser สร้างตัวเองด้วย lex.lex() / yacc.yacc()"""
+    package = os.path.join(dest, "dukpyra")
+    shutil.copytree(os.path.join(ROOT, "dukpyra"), package,
+                    ignore=shutil.ignore_patterns("__pycache__", "lextab.py", "parser.out"))
+    for name, (old, new) in (("lexer.py", LEGACY_LEXER), ("parser.py", LEGACY_PARSER)):
+        path = os.path.join(package, name)
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        assert old in text, f"{name}: {old!r} not found"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text.replace(old, new))
+    return package
+
+
+def run(pythonpath: str) -> float:
+    env = dict(os.environ, PYTHONPATH=pythonpath, PYTHONDONTWRITEBYTECODE="1")
+    # cwd ก็อยู่ใน sys.path ของ "python -c" จึงต้องรันจาก pythonpath ด้วย
+    proc = subprocess.run([sys.executable, "-c", f"SOURCE = {SOURCE!r}\n" + CODE], env=env,
+                          cwd=pythonpath, capture_output=True, text=True, check=True)
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first parse (import + parse)")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per mode")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'mode':<12} {'median ms':>10} {'min ms':>8}")
+    with tempfile.TemporaryDirectory() as legacy_root:
+        legacy = legacy_package(legacy_root)
+        for name in ("prebuilt", "yacc-cached", "yacc-cold"):
+            times = []
+            for _ in range(args.runs):
+                if name == "yacc-cold":
+                    # yacc.yacc() เขียน parsetab.py + parser.out ทุกรอบที่ไม่มี tables
+                    for leftover in ("parsetab.py", "parser.out"):
+                        path = os.path.join(legacy, leftover)
+                        if os.path.exists(path):
+                            os.remove(path)
+                times.append(run(ROOT if name == "prebuilt" else legacy_root))
+            # เทียบด้วยค่า min: median ของ cold start แกว่งตามโหลดของเครื่อง
+            results[name] = min(times)
+            print(f"{name:<12} {statistics.median(times):>10.1f} {min(times):>8.1f}")
+
+    print()
+    for name in ("yacc-cached", "yacc-cold"):
+        print(f"prebuilt is {results[name] / results['prebuilt']:.1f}x faster than {name}")
+
+
+if __name__ == "__main__":
+    main()
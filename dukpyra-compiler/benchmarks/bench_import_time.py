@@ -0,0 +1,107 @@
+"""
+==============================================================================
+BENCH_IMPORT_TIME.PY - เวลา import ของ dukpyra (python -X importtime)
+==============================================================================
+รันแต่ละ scenario ใน interpreter ใหม่ด้วย -X importtime แล้ววัด:
+    - import ms  : ผลรวม self time ของ module ที่ scenario import เพิ่ม
+                   (ไม่นับ module ที่ interpreter โหลดตอน startup เอง)
+    - modules    : จำนวน module ที่ import เพิ่ม
+    - slowest    : module ที่ self time สูงสุด
+
+Scenarios:
+    import      : import dukpyra
+    runtime     : import dukpyra; dukpyra.app  (โค้ดผู้ใช้ - ไม่สร้าง app)
+    cli-help    : dukpyra --help
+
+Regression gate: scenario ต้องไม่ import module ต้องห้าม (parser tables,
+Jinja2, FastAPI, watchdog) และ import ms ต้องไม่เกิน --max-ms
+
+การรัน:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 11 --max-ms 80
+==============================================================================
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ชื่อ → (โค้ดที่รัน, prefix ของ module ที่ห้าม import)
+SCENARIOS = {
+    "import": ("import dukpyra",
+               ("dukpyra.parser", "ply", "jinja2", "fastapi", "watchdog")),
+    "runtime": ("import dukpyra; dukpyra.app",
+                ("dukpyra.parser", "dukpyra.codegen", "ply", "jinja2", "fastapi", "watchdog")),
+    "cli-help": ("import sys; sys.argv = ['dukpyra', '--help']\n"
+                 "from dukpyra.cli import main\n"
+                 "try:\n    main()\nexcept SystemExit:\n    pass",
+                 ("dukpyra.parser", "ply", "jinja2", "fastapi", "watchdog")),
+}
+
+
+def import_times(code: str) -> Dict[str, int]:
+    """module → self time (µs) จาก -X importtime ของการรัน code หนึ่งครั้ง"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def measure(code: str, runs: int, startup: set) -> Tuple[float, Dict[str, int]]:
+    """(ค่ามัธยฐานของ import ms, self time ของแต่ละ module จากรอบสุดท้าย)"""
+    totals = []
+    for _ in range(runs):
+        times = {name: us for name, us in import_times(code).items() if name not in startup}
+        totals.append(sum(times.values()) / 1000)
+    return statistics.median(totals), times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the dukpyra package")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--max-ms", type=float, default=100.0,
+                        help="fail when a scenario's import time exceeds this")
+    args = parser.parse_args()
+
+    # module ที่ interpreter โหลดเองตอน startup (site, encodings, .pth ของ environment)
+    startup = set(import_times("pass"))
+
+    failures: List[str] = []
+    print(f"{'scenario':<10} {'import ms':>10} {'modules':>8}  slowest")
+    for name in args.scenarios:
+        code, forbidden = SCENARIOS[name]
+        ms, times = measure(code, args.runs, startup)
+        slowest = sorted(times.items(), key=lambda item: -item[1])[:3]
+        print(f"{name:<10} {ms:>10.1f} {len(times):>8}  "
+              + ", ".join(f"{module} {us / 1000:.1f}" for module, us in slowest))
+
+        leaked = sorted(m for m in times if m.startswith(forbidden))
+        if leaked:
+            failures.append(f"{name} imports {', '.join(leaked[:5])}")
+        if ms > args.max_ms:
+            failures.append(f"{name}: {ms:.1f} ms > {args.max_ms:.0f} ms")
+
+    print()
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"OK: no eager compiler/server imports, all scenarios under {args.max_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
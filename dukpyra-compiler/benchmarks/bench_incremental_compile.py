@@ -0,0 +1,110 @@
+"""
+==============================================================================
+BENCH_INCREMENTAL_COMPILE.PY - compile_project กับ .dukpyra/cache
+==============================================================================
+โปรเจกต์สังเคราะห์ 500 endpoints (--modules × 4) สองแบบ:
+    files   : --modules ไฟล์ ไฟล์ละ 4 endpoints (cache ระดับไฟล์)
+    single  : main.py ไฟล์เดียว 500 endpoints (reparse ระดับ block)
+
+วัดเวลา compile_project (jobs=1) ใน 4 สถานการณ์:
+    no-cache    : use_cache=False (แบบเดิม - compile ทุกไฟล์)
+    cold        : cache ว่าง (compile ทุกไฟล์ + เขียน cache)
+    warm        : ไม่มีไฟล์เปลี่ยน (stat pre-check อย่างเดียว)
+    one-edit    : แก้หนึ่งบรรทัด (ใน endpoint หนึ่งตัว)
+
+และตรวจว่า Program.cs ของทุกสถานการณ์ตรงกับการ compile ใหม่ทั้งหมด
+
+การรัน:
+    python benchmarks/bench_incremental_compile.py
+    python benchmarks/bench_incremental_compile.py --modules 250
+==============================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.cli import DukpyraCompiler  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_parallel_compile import MODULE, make_project  # noqa: E402
+
+
+def make_single_file(root: Path, modules: int) -> None:
+    """main.py เดียวที่มี class และ endpoint เดียวกับ make_project"""
+    classes, endpoints = [], []
+    for i in range(modules):
+        body = MODULE.format(i=i).split("\n", 3)[3]  # ตัด preamble
+        class_part, endpoint_part = body.split("@", 1)
+        classes.append(class_part)
+        endpoints.append("@" + endpoint_part)
+    source = "import dukpyra\napp = dukpyra.app()\n\n" + "".join(classes) + "".join(endpoints)
+    (root / "main.py").write_text(source, encoding="utf-8")
+
+
+def compile_once(root: Path, use_cache: bool) -> tuple:
+    """(วินาที, Program.cs, จำนวนไฟล์ที่ compile ใหม่)"""
+    compiler = DukpyraCompiler(root, jobs=1, use_cache=use_cache)
+    compiler.ensure_structure()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert compiler.compile_project(), "compilation failed"
+    elapsed = time.perf_counter() - start
+    compiled = compiler.cache.misses if compiler.cache else len(compiler.find_python_files())
+    return elapsed, (compiler.compiled_dir / "Program.cs").read_text(encoding="utf-8"), compiled
+
+
+def run_layout(layout: str, modules: int) -> list:
+    """[(scenario, วินาที, Program.cs, จำนวนไฟล์ที่ compile ใหม่)] ของหนึ่ง layout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        if layout == "files":
+            make_project(root, modules)
+            edited = root / "module_0007.py"
+        else:
+            make_single_file(root, modules)
+            edited = root / "main.py"
+        # ไฟล์เก่ากว่า racy window เหมือนโปรเจกต์จริง
+        for path in root.glob("*.py"):
+            os.utime(path, (1_000_000_000, 1_000_000_000))
+        # warm up: import compiler pipeline
+        compile_once(root, use_cache=False)
+
+        rows = [("no-cache",) + compile_once(root, use_cache=False)]
+        rows.append(("cold",) + compile_once(root, use_cache=True))
+        rows.append(("warm",) + compile_once(root, use_cache=True))
+
+        text = edited.read_text()
+        edited.write_text(text.replace('"module": 7, "tags"', '"module": 7, "tags2"', 1))
+        rows.append(("one-edit",) + compile_once(root, use_cache=True))
+
+        _, reference, _ = compile_once(root, use_cache=False)
+    if rows[-1][2] != reference:
+        sys.exit(f"FAIL: {layout}: cached output differs from a full recompile")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental compilation with .dukpyra/cache")
+    parser.add_argument("--modules", type=int, default=125, help="modules (4 endpoints each)")
+    args = parser.parse_args()
+
+    print(f"{args.modules * 4} endpoints")
+    print(f"{'layout':<7} {'scenario':<10} {'seconds':>8} {'compiled':>9}")
+    for layout in ("files", "single"):
+        rows = run_layout(layout, args.modules)
+        for name, seconds, _, compiled in rows:
+            print(f"{layout:<7} {name:<10} {seconds:>8.3f} {compiled:>9}")
+        print(f"{layout:<7} one-edit is {rows[0][1] / rows[-1][1]:.0f}x faster than no-cache; "
+              "output identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+==============================================================================
+BENCH_PARALLEL_COMPILE.PY - compile_project แบบทีละไฟล์ vs process pool
+==============================================================================
+สร้างโปรเจกต์สังเคราะห์ขนาด 10 / 100 / 1000 modules (แต่ละ module มี
+request model + endpoints หลายตัว) ใน temp dir แล้ววัดเวลา compile_project:
+    - sequential : jobs=1
+    - parallel   : jobs=--jobs (default = จำนวน CPU)
+
+ทุกขนาดตรวจว่า Program.cs ของทั้งสองแบบเหมือนกันทุก byte
+
+หมายเหตุ: speedup ขึ้นกับจำนวน core จริง บนเครื่อง 1 core ตัวเลขนี้
+แสดงแค่ overhead ของ pool (import compiler ใน worker + ส่งผลลัพธ์กลับ)
+
+การรัน:
+    python benchmarks/bench_parallel_compile.py
+    python benchmarks/bench_parallel_compile.py --modules 10 100 --jobs 4
+==============================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.cli import DukpyraCompiler  # noqa: E402
+
+MODULE = '''import dukpyra
+app = dukpyra.app()
+
+class CreateItem{i}:
+    name: str
+    price: float
+    quantity: int
+
+@app.get("/m{i}/items/{{item_id}}")
+def get_item_{i}(item_id: int):
+    return {{"id": item_id, "module": {i}, "tags": ["a", "b"], "active": True}}
+
+@app.get("/m{i}/items")
+def list_items_{i}():
+    return [{{"id": n, "module": {i}}} for n in [1, 2, 3] if n > 1]
+
+@app.post("/m{i}/items")
+def create_item_{i}(body: CreateItem{i}):
+    return {{"name": body.name, "price": body.price, "quantity": body.quantity}}
+
+@app.delete("/m{i}/items/{{item_id}}")
+def delete_item_{i}(item_id: int):
+    return {{"deleted": item_id, "ok": True}}
+'''
+
+
+def make_project(root: Path, modules: int) -> None:
+    for i in range(modules):
+        (root / f"module_{i:04d}.py").write_text(MODULE.format(i=i), encoding="utf-8")
+
+
+def compile_once(root: Path, jobs: int) -> tuple:
+    """(วินาที, Program.cs bytes) ของ compile_project หนึ่งครั้ง"""
+    compiler = DukpyraCompiler(root, jobs=jobs, use_cache=False)
+    compiler.ensure_structure()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = compiler.compile_project()
+    elapsed = time.perf_counter() - start
+    assert ok, "compilation failed"
+    return elapsed, (compiler.compiled_dir / "Program.cs").read_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs process-pool project compilation")
+    parser.add_argument("--modules", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for the parallel run")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions (best time is reported)")
+    args = parser.parse_args()
+
+    # Warm up: import the compiler pipeline in this process before timing
+    with tempfile.TemporaryDirectory() as tmp:
+        make_project(Path(tmp), 1)
+        compile_once(Path(tmp), 1)
+
+    print(f"CPUs: {os.cpu_count()}, parallel jobs: {args.jobs}")
+    print(f"{'modules':>8} {'sequential s':>13} {'parallel s':>11} {'speedup':>8}  identical")
+    for modules in args.modules:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_project(root, modules)
+            sequential = [compile_once(root, 1) for _ in range(args.runs)]
+            parallel = [compile_once(root, args.jobs) for _ in range(args.runs)]
+        seq_best = min(t for t, _ in sequential)
+        par_best = min(t for t, _ in parallel)
+        identical = len({out for _, out in sequential + parallel}) == 1
+        print(f"{modules:>8} {seq_best:>13.3f} {par_best:>11.3f} {seq_best / par_best:>7.2f}x  {identical}")
+        if not identical:
+            sys.exit(f"FAIL: parallel output differs from sequential for {modules} modules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+==============================================================================
+BENCH_PARSER_SCALING.PY - เวลา parse เทียบกับขนาด input (ต้องเป็น O(n))
+==============================================================================
+สร้าง input สังเคราะห์ที่มี sequence ยาว n แล้ววัดเวลา parse() ต่อ element:
+    list       : return [0, 1, 2, ...]                  (list_items)
+    dict       : return {"k0": 0, "k1": 1, ...}         (dict_items)
+    params     : def f(p0: int, p1: int, ...)           (params)
+    endpoints  : n endpoints ในไฟล์เดียว                (endpoints)
+    classes    : n classes ในไฟล์เดียว                  (class_definitions)
+    properties : class เดียวที่มี n properties           (class_properties)
+
+ถ้าการสร้าง sequence เป็น linear เวลาต่อ element จะคงที่เมื่อ n โตขึ้น
+ถ้าเป็น quadratic (เช่น [p[1]] + p[3]) เวลาต่อ element จะโตตาม n
+
+Regression gate: เวลาต่อ element ของ n ใหญ่สุด ต้องไม่เกิน --max-ratio เท่า
+ของ n เล็กสุด
+
+การรัน:
+    python benchmarks/bench_parser_scaling.py
+    python benchmarks/bench_parser_scaling.py --sizes 1000 5000 20000 --max-ratio 1.5
+==============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.parser import parse  # noqa: E402
+
+PREAMBLE = "import dukpyra\napp = dukpyra.app()\n\n"
+
+
+def endpoint(name: str, body: str, params: str = "") -> str:
+    return f'@app.get("/{name}")\ndef {name}({params}):\n    return {body}\n\n'
+
+
+GENERATORS = {
+    "list": lambda n: PREAMBLE + endpoint(
+        "items", "[" + ", ".join(str(i) for i in range(n)) + "]"),
+    "dict": lambda n: PREAMBLE + endpoint(
+        "items", "{" + ", ".join(f'"k{i}": {i}' for i in range(n)) + "}"),
+    "params": lambda n: PREAMBLE + endpoint(
+        "items", "None", ", ".join(f"p{i}: int" for i in range(n))),
+    "endpoints": lambda n: PREAMBLE + "".join(
+        endpoint(f"e{i}", '{"id": ' + str(i) + "}") for i in range(n)),
+    "classes": lambda n: PREAMBLE + "".join(
+        f"class Model{i}:\n    name: str\n\n" for i in range(n)) + endpoint("items", "None"),
+    "properties": lambda n: PREAMBLE + "class Model:\n" + "".join(
+        f"    field{i}: int\n" for i in range(n)) + "\n" + endpoint("items", "None"),
+}
+
+
+def time_parse(source: str, runs: int) -> float:
+    """เวลา parse ที่ดีที่สุด (วินาที)"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        ast = parse(source)
+        best = min(best, time.perf_counter() - start)
+    assert ast is not None, "generated source did not parse"
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse time scaling with sequence length")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000, 20000])
+    parser.add_argument("--cases", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--runs", type=int, default=3, help="repetitions (best time is reported)")
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="fail when µs/element at the largest size exceeds this "
+                             "multiple of the smallest size")
+    args = parser.parse_args()
+    sizes = sorted(args.sizes)
+
+    print(f"{'case':<11}" + "".join(f"{n:>10}" for n in sizes) + "   ratio   (µs per element)")
+    failures = []
+    for case in args.cases:
+        per_element = [time_parse(GENERATORS[case](n), args.runs) / n * 1e6 for n in sizes]
+        ratio = per_element[-1] / per_element[0]
+        print(f"{case:<11}" + "".join(f"{us:>10.2f}" for us in per_element) + f"   {ratio:5.2f}")
+        if ratio > args.max_ratio:
+            failures.append(f"{case} {ratio:.2f}x")
+
+    print()
+    if failures:
+        print(f"FAIL: not linear (> {args.max_ratio}x): " + ", ".join(failures))
+        sys.exit(1)
+    print(f"OK: parse time per element within {args.max_ratio}x from n={sizes[0]} to n={sizes[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+==============================================================================
+BENCH_RUNTIME_OVERHEAD.PY - Overhead ของ DukpyraRuntime ต่อ request (ASGI in-process)
+==============================================================================
+ยิง request เข้า FastAPI app ผ่าน ASGI interface โดยตรง (ไม่มี network,
+ไม่มี uvicorn, ไม่มี sleep) แล้ววัด:
+    - ns/call      : เวลาต่อ request (ค่าต่ำสุดจากหลายรอบ)
+    - alloc KiB    : peak memory ที่ถูกจองระหว่าง request หนึ่งครั้ง (tracemalloc)
+    - retained B   : memory ที่ค้างอยู่ต่อ request หลังรันหลายรอบ (จับ profile ที่โตไม่หยุด)
+
+Variants:
+    raw        : FastAPI app เปล่า (handler ไม่ถูก wrap)
+    wrapped    : DukpyraRuntime ค่า default (เก็บ type + stats ทุก request)
+    no-stats   : เก็บ type อย่างเดียว (collect_stats = False)
+    sampled    : SamplingPolicy(rate=0.1)
+    budget     : SamplingPolicy(budget=100)
+    off        : SamplingPolicy(enabled=False) - handler ไม่ถูก wrap
+    lite       : DukpyraRuntime(lite=True) - LiteApp แทน FastAPI (เก็บ type + stats)
+
+Shapes: scalar (path + query) จนถึง nested list 10,000 ตัว
+
+การรัน:
+    python benchmarks/bench_runtime_overhead.py
+    python benchmarks/bench_runtime_overhead.py --calls 200 --shapes scalar nested-10k
+    python benchmarks/bench_runtime_overhead.py --json baseline.json
+    python benchmarks/bench_runtime_overhead.py --baseline baseline.json --tolerance 0.1
+    python benchmarks/bench_runtime_overhead.py --cold-start
+
+Exit code 1 ถ้า overhead ของ variant ใดเทียบกับ raw เกิน --max-overhead
+หรือ (เมื่อให้ --baseline) เพิ่มขึ้นจาก baseline เกิน --tolerance
+(ใช้เป็น regression gate ใน CI ได้)
+==============================================================================
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from fastapi import FastAPI
+except ImportError:
+    sys.exit("fastapi is required: pip install -r requirements.txt")
+
+from dukpyra.runtime import DukpyraRuntime, SamplingPolicy
+
+
+# ==============================================================================
+# Handlers และ Argument Shapes
+# ==============================================================================
+# ใช้ async def: sync handler ถูกส่งไป threadpool ซึ่ง noise ของการสลับ thread
+# จะกลบ overhead ที่ต้องการวัด
+
+async def get_item(item_id: int, q: str = ""):
+    return {"item_id": item_id, "q": q}
+
+
+async def sum_ints(values: List[int]):
+    return {"n": len(values)}
+
+
+async def matrix(rows: List[List[int]]):
+    return {"rows": len(rows)}
+
+
+async def records(items: List[Dict[str, Any]]):
+    return {"n": len(items)}
+
+
+def _body(value) -> bytes:
+    return json.dumps(value).encode()
+
+
+# name → (handler, method, route path, request path, query string, body)
+SHAPES = {
+    "scalar": (get_item, "GET", "/items/{item_id}", "/items/42", b"q=abc", b""),
+    "list-100": (sum_ints, "POST", "/ints", "/ints", b"", _body(list(range(100)))),
+    "records-100": (records, "POST", "/records", "/records", b"",
+                    _body([{"id": i, "name": f"user{i}", "tags": ["a", "b"]} for i in range(100)])),
+    "flat-10k": (sum_ints, "POST", "/ints", "/ints", b"", _body(list(range(10_000)))),
+    "nested-10k": (matrix, "POST", "/matrix", "/matrix", b"",
+                   _body([list(range(100)) for _ in range(100)])),
+}
+
+VARIANTS = ["raw", "wrapped", "no-stats", "sampled", "budget", "off", "lite"]
+
+
+# ==============================================================================
+# App Construction
+# ==============================================================================
+
+def build_app(variant: str, shape: str, tmp: Path):
+    """สร้าง ASGI app ของ variant หนึ่งที่มี handler ของ shape หนึ่ง"""
+    handler, method, route, *_ = SHAPES[shape]
+
+    if variant == "raw":
+        app = FastAPI()
+        getattr(app, method.lower())(route)(handler)
+        return app, None
+
+    policy = {
+        "lite": SamplingPolicy(),
+        "wrapped": SamplingPolicy(),
+        "no-stats": SamplingPolicy(),
+        "sampled": SamplingPolicy(rate=0.1),
+        "budget": SamplingPolicy(budget=100),
+        "off": SamplingPolicy(enabled=False),
+    }[variant]
+    runtime = DukpyraRuntime(flush_interval=3600, sampling=policy, lite=variant == "lite")
+    runtime.types_file = tmp / variant / shape / "types.json"
+    if variant == "no-stats":
+        runtime.collect_stats = False
+    getattr(runtime, method.lower())(route)(handler)
+    return runtime.app, runtime
+
+
+# ==============================================================================
+# ASGI Driver
+# ==============================================================================
+
+def make_request(app, shape: str):
+    """สร้าง coroutine function ที่ส่ง request หนึ่งครั้งเข้า app"""
+    _, method, _, path, query, body = SHAPES[shape]
+    headers = [
+        (b"host", b"bench"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    scope_template = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": headers,
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    request_message = {"type": "http.request", "body": body, "more_body": False}
+    disconnect_message = {"type": "http.disconnect"}
+
+    async def request():
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                return disconnect_message
+            received = True
+            return request_message
+
+        status = 0
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(dict(scope_template), receive, send)
+        if status != 200:
+            raise RuntimeError(f"{method} {path} returned {status}")
+
+    return request
+
+
+async def time_calls(requests: Dict[str, Any], calls: int, repeat: int) -> Dict[str, float]:
+    """
+    ns/call ที่ดีที่สุดจาก repeat รอบ รอบละ calls request ของแต่ละ variant
+    
+    สลับ variant ในแต่ละรอบ (ไม่รันทีละ variant จนจบ) เพื่อให้ความแกว่งของ
+    เครื่อง (CPU frequency, process อื่น) กระทบทุก variant เท่าๆ กัน
+    และปิด GC ระหว่างจับเวลาเหมือน timeit
+    """
+    for request in requests.values():  # warm-up
+        for _ in range(max(1, calls // 10)):
+            await request()
+    best = dict.fromkeys(requests, float("inf"))
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for variant, request in requests.items():
+                start = time.perf_counter_ns()
+                for _ in range(calls):
+                    await request()
+                best[variant] = min(best[variant], (time.perf_counter_ns() - start) / calls)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+async def measure_memory(request, calls: int):
+    """(peak bytes ต่อ request, bytes ที่ค้างต่อ request)"""
+    tracemalloc.start()
+    try:
+        await request()  # สร้าง state ครั้งแรก (เช่น profile entry) ก่อนวัด
+        peaks = []
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await request()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks), (after - before) / calls
+
+
+def measure_cold_start(runs: int = 5) -> Dict[str, float]:
+    """
+    ms ตั้งแต่เริ่ม interpreter จน `import dukpyra` เสร็จ (ค่ามัธยฐาน)
+    
+    รันใน subprocess ใหม่ทุกครั้ง (module cache ของ process นี้ไม่มีผล)
+    dukpyra สร้าง global runtime ตอน import → รวมเวลาสร้าง app ด้วย
+    """
+    import statistics
+    import subprocess
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import dukpyra"
+    results = {}
+    for name, lite in (("fastapi", "0"), ("lite", "1")):
+        env = dict(os.environ, DUKPYRA_LITE=lite, PYTHONPATH=root)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], env=env, check=True)
+            times.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(times)
+    return results
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+
+async def run(shapes, variants, calls, repeat, mem_calls, tmp: Path) -> Dict[str, Dict[str, dict]]:
+    results = {}
+    for shape in shapes:
+        requests = {}
+        runtimes = []
+        for variant in variants:
+            app, runtime = build_app(variant, shape, tmp)
+            requests[variant] = make_request(app, shape)
+            if runtime is not None:
+                runtimes.append(runtime)
+
+        timings = await time_calls(requests, calls, repeat)
+        results[shape] = {}
+        for variant, request in requests.items():
+            alloc, retained = await measure_memory(request, mem_calls)
+            results[shape][variant] = {"ns": timings[variant], "alloc": alloc, "retained": retained}
+
+        for runtime in runtimes:
+            runtime.close()
+    return results
+
+
+def report(results, max_overhead: float, baseline=None, tolerance: float = 0.1) -> List[str]:
+    """
+    พิมพ์ตารางผล และคืนรายการ variant ที่ไม่ผ่าน gate
+    
+    ไม่ผ่านเมื่อ overhead เกิน max_overhead หรือ (ถ้ามี baseline)
+    overhead เพิ่มจากค่าใน baseline เกิน tolerance
+    """
+    baseline = baseline or {}
+    failures = []
+    print(f"{'shape':<12} {'variant':<9} {'ns/call':>10} {'overhead':>9} "
+          f"{'alloc KiB':>10} {'retained B':>11}")
+    for shape, variants in results.items():
+        raw = variants.get("raw", {}).get("ns")
+        for variant, r in variants.items():
+            overhead = (r["ns"] / raw - 1) if raw else 0.0
+            r["overhead"] = overhead
+            flag = ""
+            before = baseline.get(shape, {}).get(variant, {}).get("overhead")
+            if raw and variant != "raw":
+                if overhead > max_overhead:
+                    failures.append(f"{shape}/{variant}: {overhead:+.1%}")
+                    flag = "  !"
+                elif before is not None and overhead - before > tolerance:
+                    failures.append(f"{shape}/{variant}: {overhead:+.1%} (baseline {before:+.1%})")
+                    flag = "  !"
+            print(f"{shape:<12} {variant:<9} {r['ns']:>10.0f} {overhead:>+9.1%} "
+                  f"{r['alloc'] / 1024:>10.1f} {r['retained']:>11.1f}{flag}")
+        print()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request overhead of DukpyraRuntime")
+    parser.add_argument("--calls", type=int, default=200, help="requests per timing round")
+    parser.add_argument("--repeat", type=int, default=7, help="timing rounds (best is reported)")
+    parser.add_argument("--mem-calls", type=int, default=50, help="requests traced for memory")
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=VARIANTS)
+    parser.add_argument("--max-overhead", type=float, default=0.75,
+                        help="fail when a variant is slower than raw by more than this fraction")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="JSON from an earlier --json run to compare overheads against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed overhead increase over --baseline (fraction of raw)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="also time `import dukpyra` in a fresh process, FastAPI vs lite")
+    args = parser.parse_args()
+
+    variants = args.variants if "raw" in args.variants else ["raw"] + args.variants
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args.shapes, variants, args.calls, args.repeat,
+                                  args.mem_calls, Path(tmp)))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures = report(results, args.max_overhead, baseline, args.tolerance)
+    if args.cold_start:
+        cold = measure_cold_start()
+        print("cold start: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in cold.items()))
+        print()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        print("FAIL: overhead regression: " + ", ".join(failures))
+        sys.exit(1)
+    print(f"OK: all variants within {args.max_overhead:.0%} of raw")
+
+
+if __name__ == "__main__":
+    main()
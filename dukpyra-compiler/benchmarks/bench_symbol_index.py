@@ -0,0 +1,98 @@
+"""
+==============================================================================
+BENCH_SYMBOL_INDEX.PY - ตรวจชื่อซ้ำข้ามไฟล์ต่อ watcher event (ProjectSymbolIndex)
+==============================================================================
+สร้าง FileSymbols ของโปรเจกต์ n modules (แต่ละไฟล์เหมือน bench_parallel_compile:
+1 class + 4 endpoints + 1 response record) แล้ววัด:
+    rebuild : สร้าง index ใหม่ทั้งโปรเจกต์ + errors()  (ตรวจแบบไม่ incremental)
+    patch   : update() ไฟล์ที่แก้ 1 ไฟล์ + errors()   (สิ่งที่ watcher event ทำ)
+
+ถ้า patch เป็น O(delta) เวลาต่อ event จะคงที่ไม่ว่าโปรเจกต์ใหญ่แค่ไหน
+
+Regression gate: เวลา patch ที่ n ใหญ่สุดต้องไม่เกิน --max-ratio เท่าของ n เล็กสุด
+
+การรัน:
+    python benchmarks/bench_symbol_index.py
+    python benchmarks/bench_symbol_index.py --modules 100 10000 --max-ratio 2
+==============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.analyzer import FileSymbols, ProjectSymbolIndex  # noqa: E402
+
+
+def module_symbols(i: int, version: int = 0) -> FileSymbols:
+    """symbols ของ module_{i} (version เปลี่ยน path ของ endpoint หนึ่งตัว)"""
+    return FileSymbols(
+        classes=((f"CreateItem{i}", 4),),
+        endpoints=(
+            (f"GET /m{i}/items/{{item_id}}", 9),
+            (f"GET /m{i}/items", 13),
+            (f"POST /m{i}/items/v{version}", 17),
+            (f"DELETE /m{i}/items/{{item_id}}", 21),
+        ),
+        records=((f"Module{i}GetItemResponse", 9),),
+    )
+
+
+def build(modules: int) -> ProjectSymbolIndex:
+    index = ProjectSymbolIndex()
+    for i in range(modules):
+        index.update(f"module_{i:05d}.py", "v0", module_symbols(i))
+    assert index.errors() == []
+    return index
+
+
+def best_of(runs: int, func) -> float:
+    """เวลาที่ดีที่สุด (วินาที)"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project symbol index: rebuild vs per-event patch")
+    parser.add_argument("--modules", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=20, help="repetitions (best time is reported)")
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="fail when a patch at the largest project costs more than this "
+                             "multiple of the smallest")
+    args = parser.parse_args()
+    sizes = sorted(args.modules)
+
+    print(f"{'modules':>8} {'rebuild ms':>11} {'patch µs':>9} {'speedup':>8}")
+    patches = []
+    for n in sizes:
+        rebuild = best_of(max(1, args.runs // 10), lambda: build(n))
+        index = build(n)
+        edited = f"module_{n // 2:05d}.py"
+        versions = iter(range(1, 10 ** 9))
+
+        def patch():
+            version = next(versions)
+            index.update(edited, f"v{version}", module_symbols(n // 2, version))
+            assert index.errors() == []
+
+        patch_time = best_of(args.runs, patch)
+        patches.append(patch_time)
+        print(f"{n:>8} {rebuild * 1e3:>11.2f} {patch_time * 1e6:>9.1f} {rebuild / patch_time:>7.0f}x")
+
+    ratio = patches[-1] / patches[0]
+    print()
+    if ratio > args.max_ratio:
+        print(f"FAIL: patch time grows with project size ({ratio:.2f}x > {args.max_ratio}x)")
+        sys.exit(1)
+    print(f"OK: patch time {ratio:.2f}x from {sizes[0]} to {sizes[-1]} modules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+==============================================================================
+BENCH_VISITOR_DEPTH.PY - pass ต่างๆ บน expression tree ที่ลึกมาก / กว้างมาก
+==============================================================================
+สร้าง endpoint เดียวที่ return expression ขนาด n แล้ววัดเวลาต่อ level/element
+ของทุก pass ที่เดิน AST (ใช้ Visitor ใน visitor.py):
+    analyze    : analyze(program)                 (Visitor.walk)
+    codegen    : CSharpCodeGenerator.visit_expression(body)   (Visitor.fold)
+    to_dict    : ast_to_dict(program)             (Visitor.fold)
+    serialize  : serialize.loads(serialize.dumps(program))
+
+รูปของ tree:
+    deep_list   [[[ ... n ... ]]]             deep_dict   {"k": {"k": ...}}
+    deep_binop  n * n * ... * n               deep_comp   [[x for x in [1]] ...]
+    wide_list   [0, 1, ..., n]                wide_dict   {"k0": 0, ..., "kn": n}
+
+pass แบบ recursive ล้มด้วย RecursionError ที่ความลึกราวๆ 1000/(frames ต่อ
+level) และแสดงเป็น "recursion" ในตาราง
+
+Regression gate: ทุก pass ต้องผ่านทุกขนาด และเวลาต่อ level ของ n ใหญ่สุด
+ต้องไม่เกิน --max-ratio เท่าของ n เล็กสุด
+(codegen ของ deep_list/deep_comp โตขึ้นบ้าง: แต่ละ level copy string C# ของ
+level ข้างในทั้งก้อน รวม O(n²) bytes แต่เป็น memcpy จึงยังอยู่ใน 3 เท่า)
+
+เทียบกับ tree อื่น (เช่น checkout ก่อนมี visitor.py):
+    python benchmarks/bench_visitor_depth.py --tree /path/to/old/dukpyra-compiler
+(codegen เก่า visit items ของ list ซ้ำ 2 รอบ = 2^n บน deep_list: ใช้ --sizes เล็กๆ)
+
+การรัน:
+    python benchmarks/bench_visitor_depth.py
+    python benchmarks/bench_visitor_depth.py --sizes 100 1000 10000 --runs 5
+==============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PREAMBLE = 'import dukpyra\napp = dukpyra.app()\n\n@app.get("/a")\ndef a(n: int):\n    return '
+
+SHAPES = {
+    "deep_list": lambda n: "[" * n + "n" + "]" * n,
+    "deep_dict": lambda n: '{"k": ' * n + "n" + "}" * n,
+    "deep_binop": lambda n: " * ".join(["n"] * n),
+    "deep_comp": lambda n: "[" * n + "x" + " for x in [1]]" * n,
+    "wide_list": lambda n: "[" + ", ".join(str(i) for i in range(n)) + "]",
+    "wide_dict": lambda n: "{" + ", ".join(f'"k{i}": n' for i in range(n)) + "}",
+}
+
+
+def load_passes(tree: str) -> dict:
+    """import dukpyra จาก tree ที่เลือก; pass ที่ tree นั้นไม่มีจะไม่ถูกวัด"""
+    sys.path.insert(0, tree)
+    from dukpyra.analyzer import analyze
+    from dukpyra.ast import ast_to_dict
+    from dukpyra.codegen import CSharpCodeGenerator
+    from dukpyra.parser import parse
+
+    passes = {
+        "analyze": analyze,
+        "codegen": lambda program: CSharpCodeGenerator().visit_expression(
+            program.endpoints[0].handler.body),
+        "to_dict": ast_to_dict,
+    }
+    try:
+        from dukpyra import serialize
+    except ImportError:
+        pass
+    else:
+        passes["serialize"] = lambda program: serialize.loads(serialize.dumps(program))
+    return parse, passes
+
+
+def best_of(runs: int, func, *args) -> float:
+    """เวลาที่ดีที่สุด (วินาที)"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    default_tree = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="AST pass time on deep and wide expression trees")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--runs", type=int, default=3, help="repetitions (best time is reported)")
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="fail when µs/level at the largest size exceeds this "
+                             "multiple of the smallest size")
+    parser.add_argument("--tree", default=default_tree,
+                        help="dukpyra-compiler directory to import dukpyra from")
+    args = parser.parse_args()
+    sizes = sorted(args.sizes)
+    parse, passes = load_passes(args.tree)
+
+    print(f"{'shape':<11} {'pass':<10}" + "".join(f"{n:>11}" for n in sizes) + "   ratio   (µs per level)")
+    failures = []
+    for shape in args.shapes:
+        programs = []
+        for n in sizes:
+            program = parse(PREAMBLE + SHAPES[shape](n) + "\n")
+            assert program is not None, f"{shape} ({n}) did not parse"
+            programs.append(program)
+        for name, run in passes.items():
+            cells, per_level = [], []
+            for n, program in zip(sizes, programs):
+                try:
+                    us = best_of(args.runs, run, program) / n * 1e6
+                except RecursionError:
+                    cells.append(f"{'recursion':>11}")
+                    failures.append(f"{shape}/{name} RecursionError at {n}")
+                    continue
+                cells.append(f"{us:>11.2f}")
+                per_level.append(us)
+            ratio = ""
+            if len(per_level) == len(sizes):
+                value = per_level[-1] / per_level[0]
+                ratio = f"{value:5.2f}"
+                if value > args.max_ratio:
+                    failures.append(f"{shape}/{name} {value:.2f}x")
+            print(f"{shape:<11} {name:<10}" + "".join(cells) + f"   {ratio}")
+
+    print()
+    if failures:
+        print("FAIL: " + ", ".join(failures))
+        sys.exit(1)
+    print(f"OK: every pass handles depth {sizes[-1]}, time per level within {args.max_ratio}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+==============================================================================
+BENCH_WRAP_HANDLER.PY - Per-call overhead ของ DukpyraRuntime._wrap_handler
+==============================================================================
+วัดเวลาต่อ call (ns) ของ:
+    1. raw      : เรียก handler function ตรงๆ (แบบที่ FastAPI เรียก)
+    2. legacy   : wrapper แบบเดิม (inspect.signature + sig.bind ทุก call)
+    3. wrapped  : wrapper ปัจจุบัน (precompiled binder)
+
+การรัน:
+    python benchmarks/bench_wrap_handler.py
+    python benchmarks/bench_wrap_handler.py --calls 200000
+==============================================================================
+"""
+
+import argparse
+import asyncio
+import inspect
+import os
+import sys
+import tempfile
+import time
+from functools import wraps
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dukpyra.runtime import DukpyraRuntime
+
+
+def get_user(user_id: int, verbose: bool = False, fields: str = "all"):
+    return {"user_id": user_id, "verbose": verbose, "fields": fields}
+
+
+def legacy_wrap(runtime, func):
+    """Wrapper แบบก่อน precompiled binder (ไว้เปรียบเทียบ)"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        sig = inspect.signature(func)
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        for name, value in bound.arguments.items():
+            runtime._collect_type(func.__name__, name, value)
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+async def _drive(handler, calls):
+    """เรียก handler แบบเดียวกับ FastAPI (keyword arguments) แล้วคืน ns/call"""
+    is_async = inspect.iscoroutinefunction(handler)
+    start = time.perf_counter_ns()
+    if is_async:
+        for i in range(calls):
+            await handler(user_id=i, verbose=True)
+    else:
+        for i in range(calls):
+            handler(user_id=i, verbose=True)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of _wrap_handler")
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runtime = DukpyraRuntime(flush_interval=3600)
+        runtime.types_file = Path(tmp) / "types.json"
+
+        cases = [
+            ("raw", get_user),
+            ("legacy", legacy_wrap(runtime, get_user)),
+            ("wrapped", runtime._wrap_handler(get_user)),
+        ]
+
+        results = {}
+        for name, handler in cases:
+            asyncio.run(_drive(handler, 1000))  # warm-up
+            results[name] = asyncio.run(_drive(handler, args.calls))
+        runtime.close()
+
+    raw = results["raw"]
+    print(f"{'handler':<10} {'ns/call':>10} {'overhead':>10}")
+    for name, ns in results.items():
+        print(f"{name:<10} {ns:>10.0f} {ns - raw:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
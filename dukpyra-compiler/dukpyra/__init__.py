@@ -50,72 +50,96 @@ __author__ = "Rock"    # Project author
 
 
 # ==============================================================================
-# ส่วนที่ 0.2: IMPORTS - Compiler Components
+# ส่วนที่ 0.2: LAZY IMPORTS - Compiler Components
 # ==============================================================================
 """
-Import components ที่จำเป็นสำหรับ package API
+Components ของ package ถูก import เมื่อถูกใช้ครั้งแรก (PEP 562 module __getattr__)
 
-โครงสร้าง: แต่ละ module มีหน้าที่เฉพาะตาม compiler pipeline
-"""
+เหตุผล: import แต่ละ module มีต้นทุนที่ผู้ใช้ส่วนใหญ่ไม่ต้องจ่าย
+    - lexer.py  → lex.lex() สร้าง lexer (จาก lextab.py)
+    - parser.py → โหลด LALR tables จาก parsetab.py
+    - codegen.py → โหลด Jinja2 templates
+    - runtime.py → สร้าง FastAPI app (ตอน dukpyra.app() ครั้งแรก)
+โค้ดผู้ใช้ที่ทำแค่ `import dukpyra; app = dukpyra.app()` จึงไม่แตะ parser เลย
+และ `dukpyra --help` ไม่ต้องโหลด compiler
 
-# ========== ส่วนที่ 0.2.1: Lexer (Tokenization) ==========
-from .lexer import lexer
-"""
-lexer object สำหรับแยกโค้ดเป็น tokens
-ใช้โดย: parser, debugging, testing
+โครงสร้าง: ชื่อที่ export → module ที่มีชื่อนั้น (ตาม compiler pipeline)
 """
+_LAZY_ATTRIBUTES = {
+    # ========== ส่วนที่ 0.2.1: Lexer (Tokenization) ==========
+    # lexer object สำหรับแยกโค้ดเป็น tokens
+    'lexer': '.lexer',
+    
+    # ========== ส่วนที่ 0.2.2: Parser (AST Construction) ==========
+    # parse(source_code) → ProgramNode
+    'parse': '.parser',
+    # ParseSession().parse(source_code): lexer/parser state ต่อ compilation unit
+    'ParseSession': '.parser',
+    
+    # ========== ส่วนที่ 0.2.3: AST Node Definitions ==========
+    'ProgramNode': '.ast',
+    'EndpointNode': '.ast',
+    'FunctionDefNode': '.ast',
+    'ClassDefNode': '.ast',
+    
+    # ========== ส่วนที่ 0.2.4: Semantic Analyzer ==========
+    # analyze(ast) → AnalysisResult
+    'analyze': '.analyzer',
+    'SemanticAnalyzer': '.analyzer',
+    'SemanticError': '.analyzer',
+    'SemanticWarning': '.analyzer',
+    # ProjectSymbolIndex: classes/endpoints ของทุกไฟล์ในโปรเจกต์ (ตรวจชื่อซ้ำข้ามไฟล์)
+    'ProjectSymbolIndex': '.analyzer',
+    
+    # ========== ส่วนที่ 0.2.5: Code Generator ==========
+    # generate_csharp(ast) → C# source code string
+    'generate_csharp': '.codegen',
+    'CSharpCodeGenerator': '.codegen',
+    
+    # ========== ส่วนที่ 0.3: Runtime Components ==========
+    # app(): Factory function ที่ return DukpyraRuntime instance
+    # raw_csharp(code): Decorator สำหรับ inject C# code
+    # _runtime: Global runtime instance (internal use)
+    'app': '.runtime',
+    'raw_csharp': '.runtime',
+    '_runtime': '.runtime',
+}
 
-# ========== ส่วนที่ 0.2.2: Parser (AST Construction) ==========
-from .parser import parse
-"""
-parse(source_code) → ProgramNode
-แปลง source code เป็น Abstract Syntax Tree
-"""
 
-# ========== ส่วนที่ 0.2.3: AST Node Definitions ==========
-from .ast import ProgramNode, EndpointNode, FunctionDefNode, ClassDefNode
-"""
-Export AST node types ที่สำคัญ
-ใช้โดย: testing, analysis tools, code generators
-"""
+def __getattr__(name):
+    """Import module ที่มี name เมื่อถูกเข้าถึงครั้งแรก แล้ว cache ไว้ใน globals()"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-# ========== ส่วนที่ 0.2.4: Semantic Analyzer ==========
-from .analyzer import analyze, SemanticAnalyzer, SemanticError, SemanticWarning
-"""
-analyze(ast) → AnalysisResult
-ตรวจสอบความถูกต้องของ AST ก่อน codegen
 
-SemanticError: ข้อผิดพลาดที่ต้องแก้ไข
-SemanticWarning: คำเตือนที่ไม่ block compilation
-"""
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
-# ========== ส่วนที่ 0.2.5: Code Generator ==========
-from .codegen import generate_csharp, CSharpCodeGenerator
-"""
-generate_csharp(ast) → C# source code string
-แปลง AST เป็นโค้ด C# ASP.NET Core
-"""
 
+import sys as _sys
+import types as _types
 
-# ==============================================================================
-# ส่วนที่ 0.3: IMPORTS - Runtime Components
-# ==============================================================================
-"""
-Export runtime components สำหรับผู้ใช้
 
-ส่วนนี้ทำให้ผู้ใช้สามารถเขียนโค้ดแบบนี้ได้:
-    import dukpyra
-    app = dukpyra.app()
-    @app.get("/")
-    def home():
-        return {"message": "Hello"}
-"""
-from .runtime import app, raw_csharp, _runtime
-"""
-app(): Factory function ที่ return DukpyraRuntime instance
-raw_csharp(code): Decorator สำหรับ inject C# code
-_runtime: Global runtime instance (internal use)
-"""
+class _Package(_types.ModuleType):
+    """
+    ชื่อ dukpyra.lexer ต้องเป็น lexer object (ไม่ใช่ submodule dukpyra/lexer.py)
+    
+    การ import submodule จะ setattr(dukpyra, "lexer", <module>) ซึ่งตอน import
+    แบบ eager ถูกทับด้วย object ทันที - แบบ lazy ต้องไม่ให้ module ทับตั้งแต่แรก
+    (submodule ยังอยู่ใน sys.modules["dukpyra.lexer"] ตามปกติ)
+    """
+    def __setattr__(self, name, value):
+        if name == 'lexer' and isinstance(value, _types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _Package
 
 
 # ==============================================================================
@@ -150,6 +174,7 @@ __all__ = [
     
     # Parser
     'parse',           # parse(source) → AST
+    'ParseSession',    # Per-unit lexer/parser state (thread-safe)
     
     # AST Nodes (สำหรับ type checking และ testing)
     'ProgramNode',     # Root AST node
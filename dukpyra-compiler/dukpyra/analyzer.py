@@ -7,6 +7,10 @@ This module validates the AST before code generation, catching errors like:
 - Duplicate class or endpoint definitions
 - Invalid type hints
 
+analyze() checks one module. ProjectSymbolIndex checks what only shows
+across modules (a class, response record or endpoint defined in two of
+them), and is patched per changed module instead of being rebuilt.
+
 Architecture:
     Source → Lexer → Parser → AST → Analyzer → CodeGen → C#
                                     ^^^^^^^^^^
@@ -14,7 +18,7 @@ Architecture:
 """
 
 from dataclasses import dataclass, field
-from typing import List, Set, Dict, Optional
+from typing import List, Set, Dict, Optional, Tuple
 import re
 
 from .ast import (
@@ -32,13 +36,11 @@ from .ast import (
     NoneExpr,
     IdentifierExpr,
     MemberAccessExpr,
-    DictExpr,
     DictItemNode,
-    ListExpr,
     GenericEndpointNode,
     ListCompNode,
-    BinaryOpExpr,
 )
+from .visitor import Visitor
 
 
 # ==============================================================================
@@ -118,14 +120,23 @@ class SymbolTable:
     builtin_types: Set[str] = field(default_factory=lambda: {"int", "str", "float", "bool", "list", "dict"})
 
 
+def endpoint_key(endpoint: GenericEndpointNode) -> str:
+    """Symbol of an endpoint: "METHOD /path" (e.g. "GET /users/{id}")."""
+    return f"{endpoint.method.upper()} {endpoint.path}"
+
+
 # ==============================================================================
 # Semantic Analyzer
 # ==============================================================================
 
-class SemanticAnalyzer:
+class SemanticAnalyzer(Visitor):
     """
     Validates AST and catches semantic errors before code generation.
     
+    Expression bodies are walked top-down (Visitor.walk) with the set of
+    names in scope as context; dict, list and binary-op nodes just pass it
+    on to their children.
+    
     Usage:
         analyzer = SemanticAnalyzer()
         result = analyzer.analyze(ast)
@@ -134,6 +145,12 @@ class SemanticAnalyzer:
                 print(error)
     """
     
+    handlers = {
+        IdentifierExpr: "visit_identifier",
+        MemberAccessExpr: "visit_member_access",
+        ListCompNode: "visit_list_comp",
+    }
+    
     def __init__(self):
         self.symbols = SymbolTable()
         self.errors: List[SemanticError] = []
@@ -188,9 +205,7 @@ class SemanticAnalyzer:
     def _collect_endpoints(self, endpoints: List[GenericEndpointNode]) -> None:
         """Collect all endpoints and check for duplicates."""
         for endpoint in endpoints:
-            method = endpoint.method.upper()
-            path = endpoint.path
-            key = f"{method} {path}"
+            key = endpoint_key(endpoint)
             
             if key in self.symbols.endpoints:
                 self._error(
@@ -280,49 +295,38 @@ class SemanticAnalyzer:
                 )
     
     def _validate_expression(self, expr: ExpressionNode, scope: Set[str]) -> None:
-        """Validate expression references."""
-        if isinstance(expr, IdentifierExpr):
-            if expr.name not in scope:
-                self._error(
-                    f"Undefined variable '{expr.name}'",
-                    expr.lineno,
-                    "E020"
-                )
-        
-        elif isinstance(expr, MemberAccessExpr):
-            # Check object exists
-            if expr.object_name not in scope:
-                self._error(
-                    f"Undefined variable '{expr.object_name}'",
-                    expr.lineno,
-                    "E020"
-                )
-            # Note: We could also check if member exists on the type
-        
-        elif isinstance(expr, DictExpr):
-            for item in expr.items:
-                self._validate_expression(item.value, scope)
-        
-        elif isinstance(expr, ListExpr):
-            for item in expr.items:
-                self._validate_expression(item, scope)
-
-        elif isinstance(expr, BinaryOpExpr):
-            self._validate_expression(expr.left, scope)
-            self._validate_expression(expr.right, scope)
-
-        elif isinstance(expr, ListCompNode):
-            # [expr for target in iterable if condition]
-            # Validate iterable in CURRENT scope
-            self._validate_expression(expr.iterable, scope)
-            
-            # Create NEW scope for expression and condition (includes target)
-            inner_scope = scope.copy()
-            inner_scope.add(expr.target)
-            
-            self._validate_expression(expr.expression, inner_scope)
-            if expr.condition:
-                self._validate_expression(expr.condition, inner_scope)
+        """Validate expression references (Visitor.walk, scope as context)."""
+        self.walk(expr, scope)
+    
+    def visit_identifier(self, expr: IdentifierExpr, scope: Set[str]) -> None:
+        if expr.name not in scope:
+            self._error(
+                f"Undefined variable '{expr.name}'",
+                expr.lineno,
+                "E020"
+            )
+    
+    def visit_member_access(self, expr: MemberAccessExpr, scope: Set[str]) -> None:
+        # Check object exists
+        if expr.object_name not in scope:
+            self._error(
+                f"Undefined variable '{expr.object_name}'",
+                expr.lineno,
+                "E020"
+            )
+        # Note: We could also check if member exists on the type
+    
+    def visit_list_comp(self, expr: ListCompNode, scope: Set[str]):
+        # [expr for target in iterable if condition]
+        # Create NEW scope for expression and condition (includes target);
+        # the iterable is validated in CURRENT scope
+        inner_scope = scope.copy()
+        inner_scope.add(expr.target)
+        return [
+            (expr.iterable, scope),
+            (expr.expression, inner_scope),
+            (expr.condition, inner_scope),
+        ]
     
     # ==========================================================================
     # Helper Methods
@@ -355,6 +359,155 @@ class SemanticAnalyzer:
         self.warnings.append(SemanticWarning(message=message, line=line, code=code))
 
 
+# ==============================================================================
+# Project Symbol Index
+# ==============================================================================
+
+@dataclass(frozen=True)
+class FileSymbols:
+    """
+    What one module contributes to the project symbol index.
+    
+    Plain tuples only: they are cached with the module's compiled output
+    (cache.py), so an unchanged module is indexed without its AST.
+    """
+    classes: Tuple[Tuple[str, int], ...] = ()     # (class name, line)
+    endpoints: Tuple[Tuple[str, int], ...] = ()   # ("METHOD /path", line)
+    records: Tuple[Tuple[str, int], ...] = ()     # (response record name, line of its endpoint)
+
+
+def collect_symbols(program: ProgramNode,
+                    records: Tuple[Tuple[str, int], ...] = ()) -> FileSymbols:
+    """
+    The classes and endpoints of a module.
+    
+    Response records depend on the profile, not only on the source, so
+    they come from CodeGen (CSharpCodeGenerator.record_symbols).
+    """
+    if program is None:
+        return FileSymbols(records=tuple(records))
+    return FileSymbols(
+        classes=tuple((cls.name, cls.lineno) for cls in program.classes),
+        endpoints=tuple((endpoint_key(endpoint), endpoint.lineno) for endpoint in program.endpoints),
+        records=tuple(records),
+    )
+
+
+class ProjectSymbolIndex:
+    """
+    Classes, response records and endpoints of every module in a project.
+    
+    Program.cs holds the records and routes of all modules, so a class,
+    response record or endpoint defined in two modules is an error even
+    though each module passes analyze() on its own. Classes and response
+    records are both C# types, so a class in one module also collides with
+    a response record of the same name in another. The index is kept
+    between compiles (one per DukpyraCompiler) and patched per module:
+    
+        index = ProjectSymbolIndex()
+        index.update("users.py", digest, collect_symbols(ast))
+        index.remove("old.py")
+        for module, error in index.errors():
+            print(module, error)
+    
+    update() does nothing when the module's source hash and symbols are
+    unchanged (a profile change can add a record to an unchanged source)
+    and otherwise touches only that module's symbols; the modules defining
+    the same name are tracked as they change, so errors() costs
+    O(conflicts), not O(project).
+    """
+    
+    # Tables whose names share one namespace in Program.cs
+    NAMESPACES = {
+        "classes": ("classes", "records"),
+        "records": ("classes", "records"),
+        "endpoints": ("endpoints",),
+    }
+    KINDS = {"classes": "class", "records": "response record"}
+    
+    def __init__(self):
+        # module → (source hash, symbols) it was indexed with
+        self.modules: Dict[str, Tuple[str, FileSymbols]] = {}
+        # class / record name / "METHOD /path" → {module: line of its definition}
+        self.classes: Dict[str, Dict[str, int]] = {}
+        self.records: Dict[str, Dict[str, int]] = {}
+        self.endpoints: Dict[str, Dict[str, int]] = {}
+        # (namespace, key) defined in more than one module
+        self._conflicts: Set[Tuple[Tuple[str, ...], str]] = set()
+    
+    def update(self, module: str, digest: str, symbols: FileSymbols) -> bool:
+        """(Re-)index a module; False when it is indexed with these symbols already."""
+        if self.modules.get(module) == (digest, symbols):
+            return False
+        self.remove(module)
+        self.modules[module] = (digest, symbols)
+        for table in ("classes", "records", "endpoints"):
+            for key, line in getattr(symbols, table):
+                self._define(table, key, module, line)
+        return True
+    
+    def remove(self, module: str) -> None:
+        """Drop a module (deleted, or no longer parses)."""
+        current = self.modules.pop(module, None)
+        if current is None:
+            return
+        symbols = current[1]
+        for table in ("classes", "records", "endpoints"):
+            for key, _ in getattr(symbols, table):
+                self._undefine(table, key, module)
+    
+    def errors(self) -> List[Tuple[str, SemanticError]]:
+        """
+        (module, error) for every class, response record or endpoint name
+        another module defines too; the module first by name keeps it.
+        """
+        found = []
+        for namespace, key in self._conflicts:
+            definitions = self._definitions(namespace, key)
+            first, first_line, first_table = definitions[0]
+            for module, line, table in definitions[1:]:
+                if module == first:
+                    continue
+                if table == "endpoints":
+                    message, code = f"Duplicate endpoint: {key}", "E002"
+                    message += f" (already defined in {first} line {first_line})"
+                elif table == first_table == "classes":
+                    message, code = f"Duplicate class definition: '{key}'", "E001"
+                    message += f" (already defined in {first} line {first_line})"
+                else:
+                    message = f"Duplicate type name: {self.KINDS[table]} '{key}'"
+                    message += (f" (already defined as a {self.KINDS[first_table]}"
+                                f" in {first} line {first_line})")
+                    code = "E005"
+                found.append((module, SemanticError(message=message, line=line, code=code)))
+        found.sort(key=lambda item: (item[0], item[1].line, item[1].message))
+        return found
+    
+    def _definitions(self, namespace: Tuple[str, ...], key: str) -> List[Tuple[str, int, str]]:
+        """(module, line, table) of every definition of key, sorted by module."""
+        return sorted((module, line, table) for table in namespace
+                      for module, line in getattr(self, table).get(key, {}).items())
+    
+    def _define(self, table: str, key: str, module: str, line: int) -> None:
+        modules = getattr(self, table).setdefault(key, {})
+        # Repeats within one module are analyze()'s E001/E002
+        modules.setdefault(module, line)
+        namespace = self.NAMESPACES[table]
+        if len({module for module, _, _ in self._definitions(namespace, key)}) > 1:
+            self._conflicts.add((namespace, key))
+    
+    def _undefine(self, table: str, key: str, module: str) -> None:
+        definitions = getattr(self, table)
+        modules = definitions.get(key)
+        if modules is None or modules.pop(module, None) is None:
+            return  # listed twice in the module: removed already
+        if not modules:
+            del definitions[key]
+        namespace = self.NAMESPACES[table]
+        if len({module for module, _, _ in self._definitions(namespace, key)}) < 2:
+            self._conflicts.discard((namespace, key))
+
+
 # ==============================================================================
 # Convenience Function
 # ==============================================================================
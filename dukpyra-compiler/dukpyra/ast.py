@@ -43,15 +43,47 @@ Design Pattern: Composite Pattern (Node เป็น base, อื่นๆ inher
 # ==============================================================================
 # ส่วนที่ 2.0: IMPORTS
 # ==============================================================================
-from dataclasses import dataclass, field  # สำหรับสร้าง class ง่ายๆ ที่เก็บข้อมูล
+from dataclasses import dataclass, field, fields  # สำหรับสร้าง class ง่ายๆ ที่เก็บข้อมูล
 from typing import List, Optional, Union, Any  # Type hints
 
 
+def node(cls):
+    """
+    ส่วนที่ 2.0.1: @dataclass ที่เก็บ fields ใน __slots__ แทน __dict__
+
+    เท่ากับ @dataclass(slots=True) ของ Python 3.10+ แต่ใช้ได้กับ 3.8:
+    สร้าง dataclass ตามปกติ แล้วสร้าง class ใหม่ที่มี __slots__ เฉพาะ fields
+    ที่ class นี้เพิ่มเอง (fields ของ base class อยู่ใน slots ของ base แล้ว)
+
+    ข้อดี:
+        - ไม่มี __dict__ ต่อ instance → AST ใหญ่ๆ ใช้หน่วยความจำน้อยลงมาก
+        - อ่าน attribute เร็วขึ้นเล็กน้อย (slot descriptor)
+
+    ข้อควรระวัง:
+        - ตั้ง attribute ที่ไม่ได้ประกาศเป็น field ไม่ได้ (AttributeError)
+        - วน fields ด้วย dataclasses.fields(node) ไม่ใช่ node.__dict__
+    """
+    cls = dataclass(cls)
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    own = tuple(f.name for f in fields(cls) if f.name not in inherited)
+
+    namespace = dict(cls.__dict__)
+    for name in own:
+        namespace.pop(name, None)  # ค่า default อยู่ใน __init__ แล้ว
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = own
+
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
 # ==============================================================================
 # ส่วนที่ 2.1: BASE NODE (Node พื้นฐาน)
 # ==============================================================================
 
-@dataclass
+@node
 class Node:
     """
     ส่วนที่ 2.1.1: Base class สำหรับ AST nodes ทั้งหมด
@@ -70,7 +102,7 @@ class Node:
         - ตัวอย่าง: "Error at line 5: Duplicate endpoint"
     
     หมายเหตุ:
-        - @dataclass ทำให้ Python สร้าง __init__, __repr__ ให้อัตโนมัติ
+        - @node (= @dataclass + __slots__) ทำให้ Python สร้าง __init__, __repr__ ให้อัตโนมัติ
         - lineno = 0 เป็นค่า default
     """
     lineno: int = 0  # Line number ในโค้ด source (1-indexed)
@@ -80,7 +112,7 @@ class Node:
 # ส่วนที่ 2.2: PROGRAM STRUCTURE (โครงสร้างโปรแกรม)
 # ==============================================================================
 
-@dataclass
+@node
 class ProgramNode(Node):
     """
     ส่วนที่ 2.2.1: Root Node ของ AST ทั้งต้น
@@ -128,7 +160,7 @@ class ProgramNode(Node):
     endpoints: List['GenericEndpointNode'] = field(default_factory=list)
 
 
-@dataclass
+@node
 class ImportNode(Node):
     """
     ส่วนที่ 2.2.2: Import Statement
@@ -150,7 +182,7 @@ class ImportNode(Node):
     module_name: str = ""
 
 
-@dataclass
+@node
 class AppCreationNode(Node):
     """
     ส่วนที่ 2.2.3: App Creation Statement
@@ -188,7 +220,7 @@ class AppCreationNode(Node):
 # ส่วนที่ 2.3: CLASS DEFINITIONS (คำนิยาม Class)
 # ==============================================================================
 
-@dataclass
+@node
 class ClassDefNode(Node):
     """
     ส่วนที่ 2.3.1: Class Definition
@@ -237,7 +269,7 @@ class ClassDefNode(Node):
     properties: List['ClassPropertyNode'] = field(default_factory=list)
 
 
-@dataclass
+@node
 class ClassPropertyNode(Node):
     """
     ส่วนที่ 2.3.2: Class Property
@@ -273,7 +305,7 @@ class ClassPropertyNode(Node):
 # ส่วนที่ 2.4: ENDPOINT DEFINITIONS (คำนิยาม API Endpoints)
 # ==============================================================================
 
-@dataclass
+@node
 class EndpointNode(Node):
     """
     ส่วนที่ 2.4.1: Endpoint Node (Legacy)
@@ -295,7 +327,7 @@ class EndpointNode(Node):
     raw_csharp: Optional[str] = None
 
 
-@dataclass
+@node
 class GenericEndpointNode(Node):
     """
     ส่วนที่ 2.4.2: Generic Endpoint Node (Modern)
@@ -353,7 +385,7 @@ class GenericEndpointNode(Node):
     handler: 'FunctionDefNode' = None   # Handler function
 
 
-@dataclass  
+@node
 class DecoratorNode(Node):
     """
     ส่วนที่ 2.4.3: Decorator Node
@@ -378,7 +410,7 @@ class DecoratorNode(Node):
     path: str = ""
 
 
-@dataclass
+@node
 class FunctionDefNode(Node):
     """
     ส่วนที่ 2.4.4: Function Definition
@@ -422,7 +454,7 @@ class FunctionDefNode(Node):
     body: 'ExpressionNode' = None  # Expression ที่ return
 
 
-@dataclass
+@node
 class ParameterNode(Node):
     """
     ส่วนที่ 2.4.5: Function Parameter
@@ -459,7 +491,7 @@ class ParameterNode(Node):
 # ส่วนที่ 2.5: EXPRESSIONS (นิพจน์)
 # ==============================================================================
 
-@dataclass
+@node
 class ExpressionNode(Node):
     """
     ส่วนที่ 2.5.0: Base Expression Node
@@ -487,7 +519,7 @@ class ExpressionNode(Node):
 
 # ========== ส่วนที่ 2.5.1: Literal Expressions (ค่าคงที่) ==========
 
-@dataclass
+@node
 class StringExpr(ExpressionNode):
     """
     String literal: "hello" หรือ 'world'
@@ -508,7 +540,7 @@ class StringExpr(ExpressionNode):
     value: str = ""
 
 
-@dataclass
+@node
 class NumberExpr(ExpressionNode):
     """
     Number literal: 42 หรือ 3.14
@@ -536,7 +568,7 @@ class NumberExpr(ExpressionNode):
     value: Union[int, float] = 0
 
 
-@dataclass
+@node
 class BoolExpr(ExpressionNode):
     """
     Boolean literal: True หรือ False
@@ -561,7 +593,7 @@ class BoolExpr(ExpressionNode):
     value: bool = False
 
 
-@dataclass
+@node
 class NoneExpr(ExpressionNode):
     """
     None literal: None
@@ -583,7 +615,7 @@ class NoneExpr(ExpressionNode):
 
 # ========== ส่วนที่ 2.5.2: Reference Expressions (การอ้างอิง) ==========
 
-@dataclass
+@node
 class IdentifierExpr(ExpressionNode):
     """
     Identifier: การอ้างถึงตัวแปร
@@ -607,7 +639,7 @@ class IdentifierExpr(ExpressionNode):
     name: str = ""
 
 
-@dataclass
+@node
 class MemberAccessExpr(ExpressionNode):
     """
     Member Access: object.member
@@ -636,7 +668,7 @@ class MemberAccessExpr(ExpressionNode):
 
 # ========== ส่วนที่ 2.5.3: Collection Expressions (คอลเลกชัน) ==========
 
-@dataclass
+@node
 class DictExpr(ExpressionNode):
     """
     Dictionary Literal: {"key": "value", "count": 42}
@@ -673,7 +705,7 @@ class DictExpr(ExpressionNode):
     items: List['DictItemNode'] = field(default_factory=list)
 
 
-@dataclass
+@node
 class DictItemNode(Node):
     """
     Dictionary Item: key-value pair
@@ -695,7 +727,7 @@ class DictItemNode(Node):
     value: ExpressionNode = None    # Value (any expression)
 
 
-@dataclass
+@node
 class ListExpr(ExpressionNode):
     """
     List Literal: [1, 2, 3] หรือ ["a", "b"]
@@ -721,7 +753,7 @@ class ListExpr(ExpressionNode):
 
 # ========== ส่วนที่ 2.5.4: Advanced Expressions ==========
 
-@dataclass
+@node
 class ListCompNode(ExpressionNode):
     """
     List Comprehension: [expr for target in iterable if condition]
@@ -769,7 +801,7 @@ class ListCompNode(ExpressionNode):
     condition: Optional[ExpressionNode] = None  # Optional filter
 
 
-@dataclass
+@node
 class BinaryOpExpr(ExpressionNode):
     """
     Binary Operation: left op right
@@ -820,6 +852,7 @@ def ast_to_dict(node: Node) -> dict:
         - Debugging: print(ast_to_dict(ast))
         - Testing: เปรียบเทียบ AST ที่ได้กับที่คาดหวัง
         - Serialization: บันทึก AST เป็น JSON
+          (สำหรับเก็บ/โหลด AST ระหว่าง compile ใช้ serialize.py ซึ่งเร็วกว่ามาก)
     
     Parameters:
         node: AST Node ที่ต้องการแปลง
@@ -850,40 +883,41 @@ def ast_to_dict(node: Node) -> dict:
         # }
     
     เทคนิค:
-        - ใช้ recursion สำหรับ nested nodes
+        - ใช้ Visitor.fold (visitor.py) แทน recursion: tree ที่ซ้อนลึก
+          เกิน recursion limit ของ Python ก็แปลงได้
         - เพิ่ม "_type" เพื่อระบุชนิดของ node
         - Skip attributes ที่ขึ้นต้นด้วย "_" (internal use)
     """
-    # Base cases
-    if node is None:
-        return None
-    
-    if isinstance(node, list):
-        # แปลง list ของ nodes
-        return [ast_to_dict(item) for item in node]
-    
-    if not isinstance(node, Node):
-        # Primitive value (str, int, etc.)
-        return node
-    
-    # สร้าง dict representation
-    result = {"_type": type(node).__name__}  # เริ่มด้วย type name
-    
-    # วนลูป attributes
-    for field_name, field_value in node.__dict__.items():
-        # Skip internal fields
-        if field_name.startswith("_"):
-            continue
-        
-        # แปลง nested nodes
-        if isinstance(field_value, Node):
-            result[field_name] = ast_to_dict(field_value)
-        elif isinstance(field_value, list):
-            result[field_name] = [ast_to_dict(item) for item in field_value]
-        else:
-            result[field_name] = field_value
-    
-    return result
+    return _dict_visitor().fold(node)
+
+
+_DICT_VISITOR = None
+
+
+def _dict_visitor():
+    """
+    สร้าง Visitor ของ ast_to_dict() ครั้งแรกที่ใช้
+    (import ภายในฟังก์ชัน เพราะ visitor.py import ไฟล์นี้)
+    """
+    global _DICT_VISITOR
+    if _DICT_VISITOR is None:
+        from .visitor import TREE, Visitor, field_kinds
+
+        class DictVisitor(Visitor):
+            handlers = {Node: "visit_node"}
+
+            def visit_node(self, node, *children):
+                # children = ผลของ fields ที่เป็น node/list ตามลำดับ field
+                result = {"_type": type(node).__name__}  # เริ่มด้วย type name
+                children = iter(children)
+                for name, kind in field_kinds(type(node)):
+                    value = next(children) if kind >= TREE else getattr(node, name)
+                    if not name.startswith("_"):  # Skip internal fields
+                        result[name] = value
+                return result
+
+        _DICT_VISITOR = DictVisitor()
+    return _DICT_VISITOR
 
 
 def print_ast(node: Node, indent: int = 0) -> None:
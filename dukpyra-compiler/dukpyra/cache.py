@@ -0,0 +1,319 @@
+"""
+Dukpyra Cache - Incremental Compilation Cache in .dukpyra/cache
+
+`dukpyra run`, `dukpyra build` and every watcher event compile the whole
+project. Most files have not changed since the last compile, so their AST
+and C# fragment are kept on disk and reused:
+
+    .dukpyra/cache/<file name>.cache     one CacheEntry per source file
+
+Entries are written with the AST codec in serialize.py (a flat table of tagged
+node tuples and a string table), which stores and loads an AST in a small
+fraction of the time it takes to parse the file again.
+
+An entry that is outdated because the file was edited still provides the
+file's block ASTs and endpoint fragments (incremental.py), so only the
+edited blocks are parsed and generated again.
+
+An entry is reused only when everything its output depends on is unchanged:
+
+    - the source text (SHA-256), checked only when mtime or size moved
+    - the compiler: Dukpyra version, templates and compiler modules
+    - the slice of the type profile that names the file's handlers
+
+The stat pre-check makes a hit cost one os.stat() call; a file touched but
+not edited costs one read and hash. Like git's index, a stat recorded
+within RACY_WINDOW_NS of the file's mtime is not trusted, because a later
+edit in the same clock tick could leave mtime and size unchanged.
+
+Architecture:
+    compile_project → CompileCache.lookup → miss → compile → CompileCache.store
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import __version__
+from .profile_store import load_profile, load_types
+from .serialize import Decoder, Encoder
+
+# Files whose content changes the generated code besides the source itself
+COMPILER_FILES = ("ast.py", "lexer.py", "parser.py", "parsetab.py", "analyzer.py",
+                  "codegen.py", "incremental.py", "serialize.py", "visitor.py",
+                  "cache.py", "profile_store.py")
+
+# Stats recorded this close to the file's mtime are re-hashed next time
+RACY_WINDOW_NS = 2_000_000_000
+
+CACHE_FORMAT = 5
+
+
+def source_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def compiler_hash() -> str:
+    """Hash of the Dukpyra version, the templates and the compiler modules."""
+    package = Path(__file__).resolve().parent
+    digest = hashlib.sha256(f"{__version__}:{CACHE_FORMAT}".encode())
+    paths = [package / name for name in COMPILER_FILES]
+    paths.extend(sorted((package / "templates").glob("*")))
+    for path in paths:
+        digest.update(path.name.encode())
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
+
+
+def handler_names(ast: Any) -> List[str]:
+    """Names of the endpoint handlers in an AST (the profile keys it reads)."""
+    if ast is None:
+        return []
+    return sorted({endpoint.handler.name for endpoint in ast.endpoints
+                   if getattr(endpoint, "handler", None) is not None})
+
+
+@dataclass
+class CacheEntry:
+    """Compiled output of one source file and what it was derived from."""
+
+    source_hash: str
+    compiler_hash: str
+    profile_hash: str
+    handlers: List[str]
+    ast: Any
+    csharp: str
+    messages: List[str] = field(default_factory=list)
+    # (st_mtime_ns, st_size) of the source, None when it was racily recent
+    stat: Optional[Tuple[int, int]] = None
+    # Block ASTs and endpoint fragments (incremental.IncrementalState)
+    state: Any = None
+    # Classes/endpoints/types for the project index (analyzer.FileSymbols)
+    symbols: Any = None
+
+
+def _encode_entry(entry: CacheEntry) -> bytes:
+    """
+    One serialize stream: the entry's plain fields, its AST and the block
+    ASTs of its incremental state (nodes shared with the AST stored once).
+    """
+    encoder = Encoder()
+    ast = encoder.encode(entry.ast)
+    state = None
+    if entry.state is not None:
+        blocks = [(text, block.start, encoder.encode(block.nodes))
+                  for text, block in entry.state.blocks.items()]
+        state = (blocks, entry.state.fragments)
+    symbols = None
+    if entry.symbols is not None:
+        symbols = (entry.symbols.classes, entry.symbols.endpoints, entry.symbols.records)
+    return encoder.dumps((
+        entry.source_hash, entry.compiler_hash, entry.profile_hash, entry.handlers,
+        ast, entry.csharp, entry.messages, entry.stat, state, symbols,
+    ))
+
+
+def _decode_entry(data: bytes, trees: bool = True) -> CacheEntry:
+    """
+    Inverse of _encode_entry (ValueError for streams of another version).
+    With trees=False the AST and the incremental state are not decoded.
+    """
+    decoder = Decoder(data)
+    (digest, compiler, profile, handlers, ast, csharp, messages, stat,
+     state, symbols) = decoder.payload
+    if symbols is not None:
+        from .analyzer import FileSymbols
+
+        symbols = FileSymbols(*symbols)
+    entry = CacheEntry(
+        source_hash=digest,
+        compiler_hash=compiler,
+        profile_hash=profile,
+        handlers=handlers,
+        ast=decoder.decode(ast) if trees else None,
+        csharp=csharp,
+        messages=messages,
+        stat=stat,
+        symbols=symbols,
+    )
+    if trees and state is not None:
+        from .incremental import IncrementalState, ParsedBlock
+
+        blocks, fragments = state
+        entry.state = IncrementalState(
+            blocks={text: ParsedBlock(start, decoder.decode(nodes))
+                    for text, start, nodes in blocks},
+            fragments=fragments,
+        )
+    return entry
+
+
+class CompileCache:
+    """
+    Per-file compilation cache for one project.
+
+        cache = CompileCache(project_root / ".dukpyra")
+        entry = cache.lookup(path)            # CacheEntry or None
+        ...
+        cache.store(path, digest, ast, csharp, messages)
+    """
+
+    def __init__(self, hidden_dir: Path):
+        self.cache_dir = Path(hidden_dir) / "cache"
+        self.profile_path = Path(hidden_dir) / "types.json"
+        self.compiler_hash = compiler_hash()
+        self._profile: Optional[Tuple[dict, dict]] = None
+        # Outdated entries (undecoded) found by lookup(), for previous_state()
+        self._stale: Dict[Path, bytes] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------- profile slice --------------------------
+
+    def _load_profile(self) -> Tuple[dict, dict]:
+        """(types, stats) exactly as CodeGen reads them (loaded once per compile)."""
+        if self._profile is None:
+            types, stats = {}, {}
+            if self.profile_path.exists():
+                try:
+                    types = load_types(self.profile_path)
+                    stats = load_profile(self.profile_path)[1]
+                except Exception:
+                    types, stats = {}, {}  # CodeGen ignores unreadable profiles too
+            self._profile = (types, stats)
+        return self._profile
+
+    def profile_hash(self, handlers: List[str]) -> str:
+        """Hash of the profile entries that CodeGen reads for these handlers."""
+        types, stats = self._load_profile()
+        relevant = {name: [types.get(name), stats.get(name)] for name in handlers}
+        text = json.dumps(relevant, sort_keys=True, default=repr)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    # -------------------------- entries --------------------------
+
+    def _entry_path(self, source: Path) -> Path:
+        return self.cache_dir / f"{source.name}.cache"
+
+    def lookup(self, source: Path) -> Optional[CacheEntry]:
+        """
+        The cached output of source, or None when anything it depends on changed.
+
+        A hit only needs csharp and messages, so the entry's ast and state
+        are left undecoded (None).
+        """
+        data = self._read(source)
+        try:
+            entry = _decode_entry(data, trees=False) if data is not None else None
+        except Exception:
+            entry = None  # truncated or written by an incompatible version
+        if entry is None or entry.compiler_hash != self.compiler_hash:
+            self.misses += 1
+            return None
+
+        try:
+            st = os.stat(source)
+        except OSError:
+            self.misses += 1
+            return None
+        if entry.stat != (st.st_mtime_ns, st.st_size):
+            # Touched, checked out again or edited: compare the content
+            with open(source, "rb") as f:
+                if source_hash(f.read()) != entry.source_hash:
+                    self.misses += 1
+                    self._stale[source] = data
+                    return None
+            trusted = self._trusted_stat(st)
+            if trusted is not None:
+                full = _decode_entry(data)
+                full.stat = trusted
+                self._write(source, full)  # next lookup is stat-only again
+
+        if entry.profile_hash != self.profile_hash(entry.handlers):
+            self.misses += 1
+            self._stale[source] = data
+            return None
+        self.hits += 1
+        return entry
+
+    def previous_state(self, source: Path) -> Any:
+        """
+        Incremental state of the outdated entry lookup() rejected for source
+        (blocks of a file that was edited), or None.
+        """
+        data = self._stale.pop(source, None)
+        if data is None:
+            return None
+        try:
+            return _decode_entry(data).state
+        except Exception:
+            return None  # compile the whole file instead
+
+    def store(self, source: Path, digest: str, ast: Any, csharp: str,
+              messages: List[str], st: Optional[os.stat_result] = None,
+              state: Any = None, symbols: Any = None) -> CacheEntry:
+        """
+        Record the output compiled from a source whose content hashed to digest.
+
+        st is the stat taken before the source was read; without it the
+        entry keeps no stat and the next lookup hashes the source.
+        """
+        handlers = handler_names(ast)
+        entry = CacheEntry(
+            source_hash=digest,
+            compiler_hash=self.compiler_hash,
+            profile_hash=self.profile_hash(handlers),
+            handlers=handlers,
+            ast=ast,
+            csharp=csharp,
+            messages=list(messages),
+            stat=self._trusted_stat(st) if st is not None else None,
+            state=state,
+            symbols=symbols,
+        )
+        self._write(source, entry)
+        return entry
+
+    @staticmethod
+    def _trusted_stat(st: os.stat_result) -> Optional[Tuple[int, int]]:
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self, source: Path) -> Optional[bytes]:
+        try:
+            with open(self._entry_path(source), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, source: Path, entry: CacheEntry) -> None:
+        """Atomically replace the entry of source (concurrent compiles never see half a file)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_encode_entry(entry))
+            os.replace(tmp, self._entry_path(source))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def prune(self, sources: List[Path]) -> None:
+        """Remove the entries of files that are no longer part of the project."""
+        keep = {self._entry_path(source).name for source in sources}
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.cache"):
+                if path.name not in keep:
+                    path.unlink()
@@ -10,28 +10,110 @@ import subprocess
 import sys
 import time
 from pathlib import Path
+from typing import Any, List, NamedTuple, Optional
 
 import click
-from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
 
-# Import จาก modules อื่นใน package
-try:
-    from .parser import parse
-    from .analyzer import analyze
-    from .codegen import generate_csharp
-except ImportError:
-    # ถ้ารันโดยตรงไม่ผ่าน package
-    parse = None
-    analyze = None
-    generate_csharp = None
+# Compiler pipeline (parser / analyzer / codegen) และ watchdog ถูก import
+# ในคำสั่งที่ใช้จริงเท่านั้น: การ import parser สร้าง LALR tables และ codegen
+# โหลด Jinja2 → คำสั่งอย่าง `dukpyra --help` / `dukpyra info` ไม่ต้องจ่าย
+
+
+# จำนวนไฟล์ขั้นต่ำที่คุ้มค่าจะใช้ process pool
+PARALLEL_MIN_FILES = 8
+
+
+class CompiledFile(NamedTuple):
+    """ผลการ compile ไฟล์เดียว (ส่งกลับจาก worker process ได้)"""
+    csharp: str                 # C# code หรือ "" ถ้าล้มเหลว
+    messages: List[str]         # ข้อความ warning/error สำหรับ stderr
+    ast: Any                    # ProgramNode (None ถ้า parse ไม่ผ่าน)
+    source_hash: str            # SHA-256 ของ source ที่ compile จริง
+    stat: Optional[os.stat_result]  # stat ก่อนอ่านไฟล์ (สำหรับ cache)
+    state: Any = None           # IncrementalState สำหรับ compile ครั้งถัดไป
+    symbols: Any = None         # FileSymbols สำหรับ ProjectSymbolIndex (None ถ้า parse ไม่ผ่าน)
+
+
+def compile_source_file(path: str, previous: Any = None) -> CompiledFile:
+    """
+    Source → Parser → AST → Analyzer → CodeGen สำหรับไฟล์เดียว
+    
+    previous: IncrementalState จาก compile ครั้งก่อนของไฟล์นี้ (ถ้ามี)
+    → parse/generate ใหม่เฉพาะ class/endpoint block ที่แก้ไข
+    
+    เป็นฟังก์ชันระดับ module และไม่ print เอง เพื่อให้รันใน worker process
+    ได้ แล้วให้ process หลักแสดงข้อความตามลำดับไฟล์
+    """
+    from .incremental import IncrementalParser, IncrementalState
+    from .analyzer import analyze, collect_symbols
+    from .codegen import CSharpCodeGenerator, EndpointFragments
+    from .cache import source_hash
+
+    name = Path(path).name
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = source_hash(data)
+    # universal newlines เหมือน open(path, "r")
+    python_code = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    messages = []
+    ast = None
+    try:
+        # Step 1: Parse source code into AST
+        parser = IncrementalParser(previous)
+        ast = parser.parse(python_code)
+        
+        if ast is None:
+            messages.append(f"❌ Failed to parse {name}")
+            return CompiledFile("", messages, ast, digest, st)
+        
+        # Step 2: Semantic Analysis (ภายในไฟล์; ข้ามไฟล์ใช้ symbols ใน compile_project)
+        symbols = collect_symbols(ast)
+        result = analyze(ast)
+        
+        # Display warnings (don't stop compilation)
+        for warning in result.warnings:
+            messages.append(f"⚠️  {warning}")
+        
+        # Display errors and stop if any
+        if result.has_errors:
+            for error in result.errors:
+                messages.append(f"❌ {error}")
+            return CompiledFile("", messages, ast, digest, st, symbols=symbols)
+        
+        # Step 3: Generate C# code from AST
+        fragments = None
+        if parser.endpoint_keys is not None:
+            fragments = EndpointFragments(parser.endpoint_keys, parser.previous.fragments)
+        generator = CSharpCodeGenerator()
+        csharp_code = generator.generate(ast, fragments, module=name)
+        # response record ขึ้นกับ profile ด้วย จึงได้มาหลัง generate
+        symbols = collect_symbols(ast, generator.record_symbols(ast))
+        
+        state = IncrementalState(parser.state.blocks, fragments.current if fragments else {})
+        return CompiledFile(csharp_code if csharp_code else "", messages, ast, digest, st, state,
+                            symbols)
+    except Exception as e:
+        import traceback
+        messages.append(f"❌ Error compiling {name}: {e}")
+        messages.append(traceback.format_exc().rstrip("\n"))
+        return CompiledFile("", messages, ast, digest, st)
 
 
 class DukpyraCompiler:
     """หัวใจของ Compiler - แปลง Python เป็น C#"""
 
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, jobs: Optional[int] = None, use_cache: bool = True):
         self.project_root = project_root
+        # จำนวน worker process ตอน compile (None = จำนวน CPU, 1 = ทีละไฟล์)
+        self.jobs = jobs
+        # ใช้ผลที่ compile ไว้แล้วใน .dukpyra/cache สำหรับไฟล์ที่ไม่เปลี่ยน
+        self.use_cache = use_cache
+        self.cache = None  # CompileCache ของการ compile ครั้งล่าสุด
+        # ProjectSymbolIndex: สร้างตอน compile ครั้งแรก แล้ว patch เฉพาะไฟล์
+        # ที่เปลี่ยน (watcher ใช้ compiler ตัวเดิมทุก event)
+        self.symbols = None
         self.hidden_dir = project_root / ".dukpyra"
         self.compiled_dir = self.hidden_dir / "compiled"
         self.bin_dir = self.hidden_dir / "bin"
@@ -59,46 +141,18 @@ class DukpyraCompiler:
         
         Pipeline: Source → Parser → AST → Analyzer → CodeGen → C#
         """
-        with open(python_file, "r", encoding="utf-8") as f:
-            python_code = f.read()
+        result = compile_source_file(str(python_file))
+        for message in result.messages:
+            click.echo(message, err=True)
+        return result.csharp
 
-        try:
-            # Step 1: Parse source code into AST
-            ast = parse(python_code)
-            
-            if ast is None:
-                click.echo(f"❌ Failed to parse {python_file.name}", err=True)
-                return ""
-            
-            # Step 2: Semantic Analysis
-            result = analyze(ast)
-            
-            # Display warnings (don't stop compilation)
-            for warning in result.warnings:
-                click.echo(f"⚠️  {warning}", err=True)
-            
-            # Display errors and stop if any
-            if result.has_errors:
-                for error in result.errors:
-                    click.echo(f"❌ {error}", err=True)
-                return ""
-            
-            # Step 3: Generate C# code from AST
-            csharp_code = generate_csharp(ast)
-            
-            return csharp_code if csharp_code else ""
-        except Exception as e:
-            click.echo(f"❌ Error compiling {python_file.name}: {e}", err=True)
-            import traceback
-            traceback.print_exc()
-            return ""
-
-    def compile_project(self) -> bool:
-        """Compile ทั้งโปรเจกต์"""
-        # Silent compilation - only show critical errors
+    def find_python_files(self) -> List[Path]:
+        """
+        ไฟล์ API ของโปรเจกต์ เรียงตามชื่อ (ลำดับเดียวกันทุกเครื่อง/ทุกครั้ง)
         
-        # หา Python files ในโฟลเดอร์หลักเท่านั้น (ไม่รวม subdirectories)
-        # ยกเว้นไฟล์ที่ไม่ใช่ API เช่น tests, setup.py, conftest.py
+        หา Python files ในโฟลเดอร์หลักเท่านั้น (ไม่รวม subdirectories)
+        ยกเว้นไฟล์ที่ไม่ใช่ API เช่น tests, setup.py, conftest.py
+        """
         excluded_files = {'setup.py', 'conftest.py', '__init__.py'}
         excluded_prefixes = ('test_',)
         
@@ -110,6 +164,101 @@ class DukpyraCompiler:
                 continue
             if ".dukpyra" not in str(py_file):
                 python_files.append(py_file)
+        return sorted(python_files)
+
+    def compile_files(self, python_files: List[Path]) -> List[str]:
+        """
+        compile_file ของทุกไฟล์ → C# ตามลำดับของ python_files
+        
+        ไฟล์ที่ไม่เปลี่ยนตั้งแต่ครั้งก่อน (source, compiler, profile ส่วนที่
+        เกี่ยวข้อง) ใช้ผลจาก .dukpyra/cache ที่เหลือ compile ใหม่
+        
+        ไฟล์ไม่ขึ้นต่อกัน จึงแจก parse/analyze/codegen ให้ process pool
+        เมื่อมีไฟล์มากพอ (ต้นทุนสร้าง worker ~ import compiler หนึ่งครั้ง)
+        ผลลัพธ์และข้อความ error/warning ถูกรวมตามลำดับไฟล์เสมอ
+        → Program.cs เหมือนกันทุก byte กับการ compile ทีละไฟล์
+        """
+        cache = None
+        if self.use_cache:
+            from .cache import CompileCache
+            cache = CompileCache(self.hidden_dir)
+            cache.prune(python_files)
+        self.cache = cache
+        
+        # (C# code, messages) และ (source hash, FileSymbols) ของแต่ละไฟล์
+        outputs: List[Any] = [None] * len(python_files)
+        symbols: List[Any] = [None] * len(python_files)
+        pending = []
+        for index, py_file in enumerate(python_files):
+            entry = cache.lookup(py_file) if cache is not None else None
+            if entry is not None:
+                outputs[index] = (entry.csharp, entry.messages)
+                symbols[index] = (entry.source_hash, entry.symbols)
+            else:
+                pending.append(index)
+        
+        # ไฟล์ที่เคย compile แล้วส่ง block/fragment เดิมไปให้ใช้ซ้ำ
+        previous = [cache.previous_state(python_files[index]) if cache is not None else None
+                    for index in pending]
+        results = self._compile_paths([str(python_files[index]) for index in pending], previous)
+        for index, result in zip(pending, results):
+            if cache is not None and result.csharp:
+                cache.store(python_files[index], result.source_hash, result.ast,
+                            result.csharp, result.messages, result.stat, result.state,
+                            result.symbols)
+            outputs[index] = (result.csharp, result.messages)
+            symbols[index] = (result.source_hash, result.symbols)
+        self._update_symbols(python_files, symbols)
+        
+        csharp_codes = []
+        for csharp_code, messages in outputs:
+            for message in messages:
+                click.echo(message, err=True)
+            csharp_codes.append(csharp_code)
+        return csharp_codes
+
+    def _update_symbols(self, python_files: List[Path], symbols: List[Any]) -> None:
+        """
+        patch ProjectSymbolIndex ด้วย (source hash, FileSymbols) ของทุกไฟล์
+        
+        ไฟล์ที่ hash เท่าเดิมไม่ถูกแตะ ไฟล์ที่หายไปหรือ parse ไม่ผ่านถูกลบ
+        → งานต่อ watcher event เท่ากับจำนวนไฟล์ที่เปลี่ยน
+        """
+        from .analyzer import ProjectSymbolIndex
+        
+        if self.symbols is None:
+            self.symbols = ProjectSymbolIndex()
+        index = self.symbols
+        names = [py_file.name for py_file in python_files]
+        for name in set(index.modules).difference(names):
+            index.remove(name)
+        for name, (digest, file_symbols) in zip(names, symbols):
+            if file_symbols is None:
+                index.remove(name)
+            else:
+                index.update(name, digest, file_symbols)
+
+    def _compile_paths(self, paths: List[str], previous: List[Any]) -> List[CompiledFile]:
+        """compile_source_file ของทุก path ตามลำดับ (process pool ถ้าคุ้ม)"""
+        jobs = min(self.jobs or os.cpu_count() or 1, len(paths))
+        if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+            
+            # แบ่งเป็นก้อนละหลายไฟล์ ลด overhead ของการส่งงานข้าม process
+            chunksize = max(1, len(paths) // (jobs * 4))
+            try:
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    return list(pool.map(compile_source_file, paths, previous,
+                                         chunksize=chunksize))
+            except (OSError, NotImplementedError, BrokenProcessPool):
+                pass  # ไม่มี multiprocessing (sandbox) → compile ทีละไฟล์
+        return [compile_source_file(path, state) for path, state in zip(paths, previous)]
+
+    def compile_project(self) -> bool:
+        """Compile ทั้งโปรเจกต์"""
+        # Silent compilation - only show critical errors
+        python_files = self.find_python_files()
 
         if not python_files:
             click.echo("❌ No Python files found!", err=True)
@@ -119,20 +268,30 @@ class DukpyraCompiler:
         all_routes = []
         has_critical_error = False
         
-        for py_file in python_files:
-            csharp_code = self.compile_file(py_file)
+        for csharp_code in self.compile_files(python_files):
             if csharp_code:
                 all_routes.append(csharp_code)
             else:
                 # Critical error - compilation completely failed
                 has_critical_error = True
+        
+        # class/endpoint ที่ซ้ำข้ามไฟล์ (แต่ละไฟล์ผ่าน analyze เองได้ แต่
+        # Program.cs จะมี record/route ซ้ำ)
+        for module, error in self.symbols.errors():
+            click.echo(f"❌ {module}: {error}", err=True)
+            has_critical_error = True
 
         if has_critical_error or not all_routes:
             click.echo("❌ Compilation failed", err=True)
             return False
 
         # สร้าง Program.cs
-        program_cs_content = self._merge_compiled_code(all_routes)
+        try:
+            program_cs_content = self._merge_compiled_code(all_routes)
+        except ValueError as e:
+            click.echo(f"❌ {e}", err=True)
+            click.echo("❌ Compilation failed", err=True)
+            return False
         program_cs_path = self.compiled_dir / "Program.cs"
 
         with open(program_cs_path, "w", encoding="utf-8") as f:
@@ -141,25 +300,44 @@ class DukpyraCompiler:
         # สร้าง .csproj
         self._create_csproj()
 
-        click.echo(f"✅ Compiled {len(all_routes)} module(s)")
+        cached = f" ({self.cache.hits} cached)" if self.cache and self.cache.hits else ""
+        click.echo(f"✅ Compiled {len(all_routes)} module(s){cached}")
         return True
 
     def _merge_compiled_code(self, routes: list) -> str:
-        """รวมโค้ด C# จากหลายๆ ไฟล์เป็นไฟล์เดียว"""
+        """
+        รวมโค้ด C# จากหลายๆ ไฟล์เป็นไฟล์เดียว
+        
+        route ไม่ซ้ำกันข้ามไฟล์: compile_project ตรวจด้วย ProjectSymbolIndex
+        ก่อนเรียก ส่วน record ที่ชื่อซ้ำกัน: ถ้านิยามเหมือนกันทุกตัวอักษรจะเก็บ
+        ไว้ตัวเดียว ถ้าต่างกันจะ raise ValueError (C# ไม่ยอมให้ type ชื่อซ้ำ)
+        """
         
         all_record_blocks = []
+        record_definitions = {}  # ชื่อ record → นิยามที่ใส่ไว้แล้ว
         all_route_blocks = []
+        all_serializable = []
         
         for route_output in routes:
             lines = route_output.split('\n')
             in_routes = False
-            record_lines = []
             route_lines = []
             
             for line in lines:
                 # Collect record definitions (public record ...) before routes
                 if line.strip().startswith("public record"):
-                    record_lines.append(line)
+                    record = line.strip()
+                    record_name = record[len("public record"):].split("(", 1)[0].strip()
+                    defined = record_definitions.setdefault(record_name, record)
+                    if defined is record:
+                        all_record_blocks.append(line)
+                    elif defined != record:
+                        raise ValueError(f"Conflicting definitions of record '{record_name}'")
+                    continue
+                # Response records registered for source-generated JSON
+                if line.startswith("[System.Text.Json.Serialization.JsonSerializable("):
+                    if line not in all_serializable:
+                        all_serializable.append(line)
                     continue
                     
                 if "// --- Dukpyra Generated Routes ---" in line:
@@ -171,8 +349,6 @@ class DukpyraCompiler:
                 if in_routes:
                     route_lines.append(line)
             
-            if record_lines:
-                all_record_blocks.extend(record_lines)
             if route_lines:
                 all_route_blocks.append('\n'.join(route_lines).strip())
         
@@ -181,6 +357,9 @@ class DukpyraCompiler:
         
         # Add ASP.NET Core boilerplate first (top-level statements)
         parts.append("var builder = WebApplication.CreateBuilder(args);")
+        if all_serializable:
+            parts.append("builder.Services.ConfigureHttpJsonOptions(options =>")
+            parts.append("    options.SerializerOptions.TypeInfoResolverChain.Insert(0, DukpyraJsonContext.Default));")
         parts.append("var app = builder.Build();")
         parts.append("")
         parts.append("// ===== Dukpyra Generated Routes =====")
@@ -201,6 +380,11 @@ class DukpyraCompiler:
             parts.append("// ===== Request/Response Models =====")
             parts.append('\n'.join(all_record_blocks))
         
+        if all_serializable:
+            parts.append("")
+            parts.extend(all_serializable)
+            parts.append("internal partial class DukpyraJsonContext : System.Text.Json.Serialization.JsonSerializerContext { }")
+        
         return '\n'.join(parts)
 
     def _create_csproj(self):
@@ -220,27 +404,38 @@ class DukpyraCompiler:
             f.write(csproj_content)
 
 
-class FileWatcher(FileSystemEventHandler):
-    """ดูการเปลี่ยนแปลงของไฟล์ Python"""
+def make_file_watcher(compiler: DukpyraCompiler, restart_callback):
+    """
+    สร้าง watchdog event handler ที่ดูการเปลี่ยนแปลงของไฟล์ Python
+
+    class ถูกสร้างในฟังก์ชันนี้เพราะ base class มาจาก watchdog
+    (import เฉพาะตอน `dukpyra run --watch`)
+    """
+    from watchdog.events import FileSystemEventHandler
+
+    class FileWatcher(FileSystemEventHandler):
+        """ดูการเปลี่ยนแปลงของไฟล์ Python"""
+
+        def __init__(self):
+            self.compiler = compiler
+            self.restart_callback = restart_callback
+            self.last_compile = 0
 
-    def __init__(self, compiler: DukpyraCompiler, restart_callback):
-        self.compiler = compiler
-        self.restart_callback = restart_callback
-        self.last_compile = 0
+        def on_modified(self, event):
+            if event.src_path.endswith(".py") and ".dukpyra" not in event.src_path:
+                # Debounce (ป้องกันการ compile ซ้ำเร็วเกินไป)
+                current_time = time.time()
+                if current_time - self.last_compile < 1:
+                    return
 
-    def on_modified(self, event):
-        if event.src_path.endswith(".py") and ".dukpyra" not in event.src_path:
-            # Debounce (ป้องกันการ compile ซ้ำเร็วเกินไป)
-            current_time = time.time()
-            if current_time - self.last_compile < 1:
-                return
+                self.last_compile = current_time
 
-            self.last_compile = current_time
+                click.echo(f"\n🔄 File changed: {Path(event.src_path).name}")
+                if self.compiler.compile_project():
+                    click.echo("🚀 Restarting server...\n")
+                    self.restart_callback()
 
-            click.echo(f"\n🔄 File changed: {Path(event.src_path).name}")
-            if self.compiler.compile_project():
-                click.echo("🚀 Restarting server...\n")
-                self.restart_callback()
+    return FileWatcher()
 
 
 
@@ -263,15 +458,77 @@ def cli():
     pass
 
 
-@cli.command()
+@cli.group(invoke_without_command=True)
 @click.option("--port", default=8000, help="Port to run profiling server")
-def profile(port):
+@click.option("--sample-rate", type=click.FloatRange(0.0, 1.0), default=None,
+              help="Fraction of calls whose argument types are recorded")
+@click.option("--budget", type=int, default=None,
+              help="Stop profiling an endpoint after N samples with no new type")
+@click.option("--adaptive", is_flag=True, default=False,
+              help="Back off the sample rate once an endpoint's types are stable")
+@click.option("--workers", type=click.IntRange(1), default=1,
+              help="Number of server processes (each writes its own profile shard)")
+@click.option("--shard", is_flag=True, default=False,
+              help="Write a per-process shard even with one worker (multi-host profiling)")
+@click.option("--capture", type=click.Path(dir_okay=False), default=None,
+              help="Record every request into this corpus file for --replay (one worker only)")
+@click.option("--replay", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Profile by replaying a captured corpus in-process (no server, "
+                   "every call sampled)")
+@click.option("--concurrency", type=click.IntRange(1), default=16,
+              help="Requests in flight during --replay")
+@click.option("--lite", is_flag=True, default=False,
+              help="Serve with Dukpyra's minimal ASGI router instead of FastAPI")
+@click.pass_context
+def profile(ctx, port, sample_rate, budget, adaptive, workers, shard, capture, replay,
+            concurrency, lite):
     """
     Run the project in Python mode for Type Collection.
     
     This runs your API using FastAPI/Uvicorn to collect runtime argument types.
     Send requests to this server to improve C# compilation accuracy.
+
+    With --workers N (or --shard) every process writes
+    .dukpyra/shards/types-<host>-<pid>.json; combine them with
+    `dukpyra profile merge`.
+
+    With --capture FILE the server also records its traffic; later,
+    `dukpyra profile --replay FILE` re-profiles the project from that
+    corpus in seconds, without uvicorn or sockets. Replay samples every
+    call, so the same corpus always gives the same profile. --capture
+    needs a single worker: worker processes cannot share one corpus file.
+
+    --lite skips FastAPI: a built-in router handles routing, path/query
+    conversion and JSON responses, which is all profiling needs.
     """
+    if ctx.invoked_subcommand is not None:
+        return
+    if capture and replay:
+        raise click.UsageError("--capture and --replay cannot be used together")
+    if capture and workers > 1:
+        # แต่ละ worker มี buffer ของตัวเอง → บรรทัดของ corpus ปนกัน/ขาดกลาง
+        raise click.UsageError("--capture records from a single process; drop --workers")
+    if replay and (sample_rate is not None or budget is not None or adaptive):
+        raise click.UsageError("--replay samples every call; --sample-rate, --budget and "
+                               "--adaptive only apply to live profiling")
+
+    # The runtime is created at import time inside the uvicorn worker, so the
+    # sampling policy is handed over through the environment
+    # (see SamplingPolicy.from_env).
+    if sample_rate is not None:
+        os.environ["DUKPYRA_SAMPLE_RATE"] = str(sample_rate)
+        click.echo(f"   Sampling {sample_rate:.0%} of calls")
+    if budget is not None:
+        os.environ["DUKPYRA_SAMPLE_BUDGET"] = str(budget)
+    if adaptive:
+        os.environ["DUKPYRA_SAMPLE_ADAPTIVE"] = "1"
+    if lite:
+        os.environ["DUKPYRA_LITE"] = "1"
+
+    if replay:
+        _replay_profile(Path(replay), concurrency)
+        return
+
     click.echo("🕵️ Starting Dukpyra Profiler...")
     click.echo("   Send requests to your API to collect types.")
     
@@ -280,18 +537,120 @@ def profile(port):
     except ImportError:
         click.echo("❌ 'uvicorn' not found. Please install requirements.", err=True)
         return
+    
+    if capture:
+        os.environ["DUKPYRA_CAPTURE"] = str(Path(capture).resolve())
+        click.echo(f"   Capturing requests to {capture}")
+    if workers > 1 or shard:
+        # Several processes writing one types.json would overwrite each other
+        os.environ["DUKPYRA_PROFILE_SHARD"] = "1"
+        click.echo(f"   Writing per-process shards to .dukpyra/shards/ ({workers} worker(s))")
         
     # Assume main.py:app structure. The user's code will call dukpyra.app()
     # which returns our Runtime wrapper. Our wrapper has .app property which is the FastAPI app.
     
-    click.echo(f"   Running 'main:app.app' on port {port}")
+    click.echo(f"   Running 'main:app.app' on port {port}" + (" (lite router)" if lite else ""))
     click.echo("   Press Ctrl+C to stop profiling.\n")
     
     try:
         # We need to target the internal FastAPI app inside our wrapper
-        uvicorn.run("main:app.app", host="0.0.0.0", port=port, reload=True)
+        # uvicorn cannot combine reload with multiple workers
+        if workers > 1:
+            uvicorn.run("main:app.app", host="0.0.0.0", port=port, workers=workers)
+        else:
+            uvicorn.run("main:app.app", host="0.0.0.0", port=port, reload=True)
     except Exception as e:
         click.echo(f"❌ Profiler error: {e}", err=True)
+    
+    if workers > 1 or shard:
+        click.echo("\n   Run 'dukpyra profile merge' to combine the shards.")
+
+
+def _replay_profile(corpus: Path, concurrency: int):
+    """Import main.py in this process and push a captured corpus through its app."""
+    import importlib.util
+
+    from .replay import replay_corpus
+    from .runtime import DukpyraRuntime, SamplingPolicy, _runtime
+
+    main_py = Path.cwd() / "main.py"
+    if not main_py.exists():
+        click.echo("❌ main.py not found in the current directory", err=True)
+        sys.exit(1)
+
+    # _runtime is created on first use, normally right here; if something
+    # created it earlier, pick up --lite before main.py decorates its
+    # handlers. Replay samples every call (ignoring DUKPYRA_SAMPLE_* and
+    # DUKPYRA_PROFILE): with a lower rate, a budget or adaptive backoff the
+    # profile would depend on chance and on request order.
+    _runtime.sampling = SamplingPolicy()
+    if os.environ.get("DUKPYRA_LITE") == "1" and not _runtime.lite:
+        _runtime._create_app(lite=True)
+
+    spec = importlib.util.spec_from_file_location("main", main_py)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception as e:
+        click.echo(f"❌ Could not import main.py: {e}", err=True)
+        sys.exit(1)
+
+    runtime = getattr(module, "app", None)
+    if not isinstance(runtime, DukpyraRuntime) or runtime.app is None:
+        click.echo("❌ main.py must define app = dukpyra.app() (and FastAPI must be installed)",
+                   err=True)
+        sys.exit(1)
+
+    click.echo(f"🔁 Replaying {corpus} ({concurrency} in flight)...")
+    start = time.perf_counter()
+    statuses = replay_corpus(runtime.app, corpus, concurrency)
+    runtime.close()
+    elapsed = time.perf_counter() - start
+
+    total = sum(statuses.values())
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+    click.echo(f"✅ Replayed {total} request(s) in {elapsed:.2f}s ({summary or 'none'})")
+    click.echo(f"   Types written to {runtime.types_file}")
+
+
+@profile.command("merge")
+@click.argument("shards", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option("--shard-dir", default=".dukpyra/shards", type=click.Path(file_okay=False),
+              help="Directory searched for shards when none are given")
+@click.option("-o", "--output", default=".dukpyra/types.json", type=click.Path(dir_okay=False),
+              help="Merged profile file")
+@click.option("--clean", is_flag=True, default=False,
+              help="Delete the shard files and their logs after a successful merge")
+def profile_merge(shards, shard_dir, output, clean):
+    """
+    Merge profile shards into a single types.json.
+
+    Observed types are unioned and their counts added up; each argument
+    resolves to its most frequently observed type. Shards are folded one
+    at a time, so any number of them can be merged.
+
+    Example: dukpyra profile merge host-a/*.json host-b/*.json
+    """
+    from .profile_store import find_shards, merge_profiles, remove_profile
+
+    paths = [Path(p) for p in shards] or find_shards(Path(shard_dir))
+    if not paths:
+        click.echo(f"❌ No shards found in {shard_dir}", err=True)
+        sys.exit(1)
+
+    try:
+        count = merge_profiles(paths, Path(output))
+    except (OSError, ValueError) as e:
+        click.echo(f"❌ Merge failed: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(f"✅ Merged {count} shard(s) into {output}")
+
+    if clean:
+        # รวม log ของ shard ด้วย: shard ใหม่ที่ได้ host/pid เดิม (เช่น pid 1
+        # ใน container) จะอ่าน record เก่าจาก log ที่ค้างอยู่
+        for path in paths:
+            remove_profile(path)
 
 
 
@@ -383,7 +742,11 @@ def find_available_port(start_port=5000, max_attempts=10):
 @cli.command()
 @click.option("--port", default=5000, help="Port to run on")
 @click.option("--watch/--no-watch", default=True, help="Enable file watching")
-def run(port, watch):
+@click.option("--jobs", "-j", type=click.IntRange(1), default=None,
+              help="Compile worker processes (default: CPU count)")
+@click.option("--no-cache", is_flag=True, default=False,
+              help="Recompile every file instead of reusing .dukpyra/cache")
+def run(port, watch, jobs, no_cache):
     """
     Run the Dukpyra project (compile + execute)
 
@@ -419,7 +782,7 @@ def run(port, watch):
     click.echo("╚═══════════════════════════════════════════════════════════════╝")
     click.echo("")
 
-    compiler = DukpyraCompiler(project_dir)
+    compiler = DukpyraCompiler(project_dir, jobs=jobs, use_cache=not no_cache)
     compiler.ensure_structure()
 
     # Compile silently
@@ -532,7 +895,9 @@ def run(port, watch):
 
     if watch:
         # เริ่ม watch mode
-        event_handler = FileWatcher(compiler, start_server)
+        from watchdog.observers import Observer
+
+        event_handler = make_file_watcher(compiler, start_server)
         observer = Observer()
         observer.schedule(event_handler, str(project_dir), recursive=True)
         observer.start()
@@ -608,14 +973,18 @@ def clean():
 
 @cli.command()
 @click.option("--output", "-o", default="./dist", help="Output directory")
-def build(output):
+@click.option("--jobs", "-j", type=click.IntRange(1), default=None,
+              help="Compile worker processes (default: CPU count)")
+@click.option("--no-cache", is_flag=True, default=False,
+              help="Recompile every file instead of reusing .dukpyra/cache")
+def build(output, jobs, no_cache):
     """
     Build a production-ready binary
 
     This creates a standalone executable
     """
     project_dir = Path.cwd()
-    compiler = DukpyraCompiler(project_dir)
+    compiler = DukpyraCompiler(project_dir, jobs=jobs, use_cache=not no_cache)
 
     click.echo("🏗️  Building production binary...")
 
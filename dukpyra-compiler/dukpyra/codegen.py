@@ -8,9 +8,11 @@ Architecture:
     Source Code → Lexer → Parser → AST → CodeGen → C# Code (via Templates)
 """
 
-import json
+import functools
 import os
+import re
 from pathlib import Path
+from typing import Dict, List, Optional
 from jinja2 import Environment, FileSystemLoader
 
 from .ast import (
@@ -38,48 +40,117 @@ from .ast import (
     ListCompNode,
     BinaryOpExpr,
 )
+from .profile_store import load_stats, load_types
+from .visitor import Visitor
 
-class CSharpCodeGenerator:
+# C# int range; profiled values outside it need long
+INT32_MIN = -2**31
+INT32_MAX = 2**31 - 1
+# double holds every integer up to this magnitude exactly
+DOUBLE_EXACT_MAX = 2**53
+
+@functools.lru_cache(maxsize=None)
+def _program_template():
+    """Program.cs.j2, compiled once: every file and every watcher recompile renders it."""
+    template_dir = os.path.join(os.path.dirname(__file__), 'templates')
+    env = Environment(loader=FileSystemLoader(template_dir))
+    return env.get_template('Program.cs.j2')
+
+
+class EndpointFragments:
+    """
+    Endpoint C# from an earlier compile of the same file, for reuse.
+    
+    keys holds the source text of each endpoint (parallel to
+    program.endpoints, see incremental.py). A fragment is reused when the
+    text, the handler's profile entries and the response-record name
+    collisions are all unchanged; `current` holds the fragments of this
+    compile for the next one.
+    """
+    
+    def __init__(self, keys: List[str], previous: Optional[dict] = None):
+        self.keys = keys
+        self.previous = previous or {}
+        self.current = {}
+        self.reused = 0
+
+
+class CSharpCodeGenerator(Visitor):
     """
     Generates C# ASP.NET Core Minimal API code from Dukpyra AST.
     
     Uses the Visitor pattern to prepare data for Jinja2 templates.
+    Expressions are folded bottom-up (Visitor.fold): each visit_* method
+    below gets the C# of its child expressions, so nesting depth is not
+    limited by Python's recursion limit.
     """
     
+    handlers = {
+        StringExpr: "visit_string",
+        NumberExpr: "visit_number",
+        BoolExpr: "visit_bool",
+        NoneExpr: "visit_none",
+        IdentifierExpr: "visit_identifier",
+        MemberAccessExpr: "visit_member_access",
+        DictExpr: "visit_dict",
+        DictItemNode: "visit_dict_item",
+        ListExpr: "visit_list",
+        ListCompNode: "visit_list_comp",
+        BinaryOpExpr: "visit_binary_op",
+    }
+    
     def __init__(self):
-        # Setup Jinja2 environment
-        template_dir = os.path.join(os.path.dirname(__file__), 'templates')
-        self.env = Environment(loader=FileSystemLoader(template_dir))
-        self.template = self.env.get_template('Program.cs.j2')
+        # Setup Jinja2 environment (compiled once per process)
+        self.template = _program_template()
         
-        # Load Runtime Types if available
+        # Load Runtime Types (and value statistics) if available
         self.collected_types = {}
+        self.value_stats = {}
         types_path = Path(".dukpyra/types.json")
         if types_path.exists():
             try:
-                with open(types_path, "r") as f:
-                    self.collected_types = json.load(f)
+                self.collected_types = load_types(types_path)
+                self.value_stats = load_stats(types_path)
             except Exception:
                 pass # Ignore load errors
+        self.response_prefix = ""
 
-    def generate(self, program: ProgramNode) -> str:
+    def generate(self, program: ProgramNode,
+                 fragments: Optional[EndpointFragments] = None,
+                 module: str = "") -> str:
         # ... (same as before) ...
         """
         Generate complete C# code from a ProgramNode.
         
+        module is the source file name when compiling a project. Response
+        records are prefixed with it (orders.py → OrdersGetItemResponse),
+        so handlers with the same name in different files do not emit the
+        same record into the merged Program.cs.
+        
         Returns a complete Program.cs file content.
         """
         if program is None:
             return ""
         
+        self.response_prefix = self.pascal_case(Path(module).stem) if module else ""
         # Prepare data for template
+        # (visit_endpoint registers response records for profiled handlers)
+        self.response_types = []
+        self.response_names = set()
         classes = [self.visit_class(c) for c in program.classes]
-        endpoints = [self.visit_endpoint(e) for e in program.endpoints]
+        self.class_names = {c.name for c in program.classes}
+        if fragments is None:
+            endpoints = [self.visit_endpoint(e) for e in program.endpoints]
+        else:
+            endpoints = [self.reuse_endpoint(e, key, fragments)
+                         for e, key in zip(program.endpoints, fragments.keys)]
+        classes.extend(record for _, record in self.response_types)
         
         # Render template
         return self.template.render(
             classes=classes,
-            endpoints=endpoints
+            endpoints=endpoints,
+            response_types=[name for name, _ in self.response_types],
         )
     
     def visit_class(self, node: ClassDefNode) -> str:
@@ -117,6 +188,30 @@ class CSharpCodeGenerator:
             "body": body
         }
     
+    def reuse_endpoint(self, node: GenericEndpointNode, source: str,
+                       fragments: EndpointFragments) -> Dict[str, str]:
+        """visit_endpoint, or its result from an earlier compile when nothing it reads changed."""
+        func_name = node.handler.name
+        response_name = self.response_name(func_name)
+        key = (
+            source,
+            repr(self.collected_types.get(func_name)),
+            repr(self.value_stats.get(func_name)),
+            response_name in self.class_names,
+            response_name in self.response_names,
+        )
+        fragment = fragments.previous.get(key)
+        if fragment is None:
+            registered = len(self.response_types)
+            fragment = (self.visit_endpoint(node), tuple(self.response_types[registered:]))
+        else:
+            fragments.reused += 1
+            for name, record in fragment[1]:
+                self.response_types.append((name, record))
+                self.response_names.add(name)
+        fragments.current[key] = fragment
+        return fragment[0]
+    
     def visit_params(self, params: list, func_name: str = "") -> str:
         """
         Generate C# lambda parameter list string.
@@ -126,13 +221,17 @@ class CSharpCodeGenerator:
         
         param_strs = []
         for param in params:
-            csharp_type = self.python_type_to_csharp(param.type_hint)
+            python_type = param.type_hint
+            csharp_type = self.python_type_to_csharp(python_type)
             
             # If type is dynamic (unknown), try to find it in collected types
             if csharp_type == "dynamic" and func_name in self.collected_types:
                 collected = self.collected_types[func_name].get(param.name)
                 if collected:
+                    python_type = collected
                     csharp_type = self.python_type_to_csharp(collected)
+            
+            csharp_type = self.refine_with_stats(csharp_type, func_name, param.name, python_type)
 
             param_strs.append(f"{csharp_type} {param.name}")
         
@@ -141,6 +240,9 @@ class CSharpCodeGenerator:
     def python_type_to_csharp(self, python_type: str) -> str:
         """
         Convert Python type hint to C# type.
+        
+        Also understands the generic type strings written by the runtime
+        profiler: List[T], Dict[K, V], Optional[T] and Union[...].
         """
         type_map = {
             "int": "int",
@@ -149,49 +251,178 @@ class CSharpCodeGenerator:
             "bool": "bool",
             "list": "List<dynamic>",
             "dict": "Dictionary<string, dynamic>",
+            "None": "dynamic",
         }
         
         if python_type is None:
             return "dynamic"
         
+        if python_type.endswith("]") and "[" in python_type:
+            name, _, inner = python_type[:-1].partition("[")
+            args = [self.python_type_to_csharp(a) for a in self._split_type_args(inner)]
+            if name == "List" and len(args) == 1:
+                return f"List<{args[0]}>"
+            if name == "Dict" and len(args) == 2:
+                return f"Dictionary<{args[0]}, {args[1]}>"
+            if name == "Optional" and len(args) == 1:
+                return args[0] if args[0] == "dynamic" else f"{args[0]}?"
+            # Union and anything unrecognised has no static C# equivalent
+            return "dynamic"
+        
         return type_map.get(python_type, python_type)
     
+    def refine_with_stats(self, csharp_type: str, func_name: str, name: str,
+                          python_type: Optional[str] = None) -> str:
+        """
+        Adjust a C# type using the value statistics collected at runtime.
+        
+        - Python ints are unbounded: when profiled values fall outside the
+          C# int range, int becomes long.
+        - A profiled mix of ints and floats (Union[float, int], which has no
+          static C# type) becomes the value type double instead of dynamic
+          when every observed value is within ±2**53, where double still
+          holds integers exactly.
+        
+        Types are only ever widened. A profile is a sample, so a type
+        narrowed to the observed range (short, byte) would reject requests
+        the sample missed. Nullability comes from the profiled type
+        (Optional[T] → T?), because the stats do not count None values.
+        Collection sizes are not used: parameters are bound by ASP.NET Core
+        and response collections are literals, so there is nothing to
+        pre-size.
+        """
+        stats = self.value_stats.get(func_name, {}).get(name)
+        if not stats:
+            return csharp_type
+        if csharp_type in ("int", "int?"):
+            if stats.get("min", 0) < INT32_MIN or stats.get("max", 0) > INT32_MAX:
+                return "long" + csharp_type[3:]
+        if csharp_type == "dynamic" and "min" in stats and python_type:
+            nullable = python_type.startswith("Optional[")
+            inner = python_type[len("Optional["):-1] if nullable else python_type
+            if (inner.startswith("Union[")
+                    and set(self._split_type_args(inner[len("Union["):-1])) <= {"int", "float"}
+                    and -DOUBLE_EXACT_MAX <= stats["min"] and stats["max"] <= DOUBLE_EXACT_MAX):
+                return "double?" if nullable else "double"
+        return csharp_type
+    
+    @staticmethod
+    def _split_type_args(inner: str) -> list:
+        """Split "str, List[int]" into ["str", "List[int]"] (bracket-aware)."""
+        args = []
+        depth = 0
+        start = 0
+        for i, ch in enumerate(inner):
+            if ch == "[":
+                depth += 1
+            elif ch == "]":
+                depth -= 1
+            elif ch == "," and depth == 0:
+                args.append(inner[start:i].strip())
+                start = i + 1
+        args.append(inner[start:].strip())
+        return args
+    
     def visit_function_body(self, node: FunctionDefNode) -> str:
         """
         Generate C# code for function body.
+        
+        Handlers whose return value was profiled get a named response record
+        and TypedResults.Ok(); everything else returns an anonymous object.
         """
         if node.body is None:
             return "return Results.Ok();"
         
+        response = self.visit_response(node)
+        if response is not None:
+            return f"return TypedResults.Ok({response});"
+        
         expr = self.visit_expression(node.body)
         return f"return Results.Ok({expr});"
     
+    def visit_response(self, node: FunctionDefNode):
+        """
+        Generate a response record constructor for a dict-returning handler.
+        
+        Uses the "return.<key>" field types collected by the runtime, so the
+        record (unlike an anonymous type) can be registered with the
+        source-generated JSON serializer context.
+        
+        Returns None when the handler's return value was never profiled.
+        """
+        body = node.body
+        profile = self.collected_types.get(node.name, {})
+        if not isinstance(body, DictExpr) or not body.items:
+            return None
+        if not any(key.startswith("return.") for key in profile):
+            return None
+        
+        name = self.response_name(node.name)
+        if name in self.class_names or name in self.response_names:
+            return None
+        
+        fields = []
+        values = []
+        for item in body.items:
+            csharp_type = self.response_field_type(item.value, profile.get(f"return.{item.key}"))
+            csharp_type = self.refine_with_stats(csharp_type, node.name, f"return.{item.key}",
+                                                 profile.get(f"return.{item.key}"))
+            fields.append(f"{csharp_type} {item.key}")
+            values.append(self.visit_expression(item.value))
+        
+        self.response_types.append((name, f"public record {name}({', '.join(fields)});"))
+        self.response_names.add(name)
+        return f"new {name}({', '.join(values)})"
+    
+    def response_name(self, func_name: str) -> str:
+        """Name of the response record of a handler: get_user → GetUserResponse"""
+        return self.response_prefix + self.pascal_case(func_name) + "Response"
+    
+    def record_symbols(self, program: ProgramNode) -> tuple:
+        """
+        (record name, line of its endpoint) of the response records emitted
+        by the last generate(), for the project symbol index.
+        """
+        records = {}
+        for endpoint in program.endpoints:
+            name = self.response_name(endpoint.handler.name)
+            if name in self.response_names:
+                records.setdefault(name, endpoint.lineno)
+        return tuple(records.items())
+    
+    @staticmethod
+    def pascal_case(name: str) -> str:
+        """get_user → GetUser (other non-identifier characters also split words)"""
+        return "".join(part[:1].upper() + part[1:] for part in re.split(r"[^0-9A-Za-z]+", name))
+    
+    def response_field_type(self, value: ExpressionNode, profiled: str) -> str:
+        """
+        C# type of a response record field.
+        
+        A literal always has its own static type: the profile only saw the
+        values it produced, so it cannot be more precise. Nested dict/list
+        literals become anonymous objects and arrays in C#, which no
+        profiled collection type can hold, so they stay object. The
+        profile types every other expression.
+        """
+        if isinstance(value, (DictExpr, ListExpr)):
+            return "object"
+        if isinstance(value, StringExpr):
+            return "string"
+        if isinstance(value, BoolExpr):
+            return "bool"
+        if isinstance(value, NumberExpr):
+            return "double" if isinstance(value.value, float) else "int"
+        return self.python_type_to_csharp(profiled)
+    
     def visit_expression(self, node: ExpressionNode) -> str:
         """
-        Dispatch to the appropriate expression visitor.
+        C# of an expression (dispatched through `handlers`).
         """
-        if isinstance(node, StringExpr):
-            return self.visit_string(node)
-        elif isinstance(node, NumberExpr):
-            return self.visit_number(node)
-        elif isinstance(node, BoolExpr):
-            return self.visit_bool(node)
-        elif isinstance(node, NoneExpr):
-            return self.visit_none(node)
-        elif isinstance(node, IdentifierExpr):
-            return self.visit_identifier(node)
-        elif isinstance(node, MemberAccessExpr):
-            return self.visit_member_access(node)
-        elif isinstance(node, DictExpr):
-            return self.visit_dict(node)
-        elif isinstance(node, ListExpr):
-            return self.visit_list(node)
-        elif isinstance(node, ListCompNode):
-            return self.visit_list_comp(node)
-        elif isinstance(node, BinaryOpExpr):
-            return self.visit_binary_op(node)
-        else:
-            raise ValueError(f"Unknown expression type: {type(node)}")
+        return self.fold(node)
+    
+    def generic_visit(self, node, *children):
+        raise ValueError(f"Unknown expression type: {type(node)}")
     
     def visit_string(self, node: StringExpr) -> str:
         # Escape special characters for C#
@@ -213,33 +444,28 @@ class CSharpCodeGenerator:
     def visit_member_access(self, node: MemberAccessExpr) -> str:
         return f"{node.object_name}.{node.member_name}"
     
-    def visit_dict(self, node: DictExpr) -> str:
-        if not node.items:
+    def visit_dict(self, node: DictExpr, items: List[str]) -> str:
+        if not items:
             return "new { }"
         
-        items = []
-        for item in node.items:
-            key = item.key
-            value = self.visit_expression(item.value)
-            items.append(f"{key} = {value}")
-        
         return "new { " + ", ".join(items) + " }"
     
-    def visit_list(self, node: ListExpr) -> str:
-        if not node.items:
+    def visit_dict_item(self, node: DictItemNode, value: str) -> str:
+        return f"{node.key} = {value}"
+    
+    def visit_list(self, node: ListExpr, items: List[str]) -> str:
+        if not items:
             return "Array.Empty<object>()"
         
-        items = [self.visit_expression(item) for item in node.items]
-        items = [self.visit_expression(item) for item in node.items]
         return "new[] { " + ", ".join(items) + " }"
 
-    def visit_list_comp(self, node: ListCompNode) -> str:
+    def visit_list_comp(self, node: ListCompNode, select_expr: str, iterable: str,
+                        condition_expr: Optional[str]) -> str:
         """
         Generate LINQ expression for list comprehension.
         Python: [expr for target in iterable if condition]
         C#: iterable.Where(target => condition).Select(target => expr).ToList()
         """
-        iterable = self.visit_expression(node.iterable)
         target = node.target
         
         # Start LINQ chain
@@ -247,11 +473,9 @@ class CSharpCodeGenerator:
         
         # Add .Where(...) if condition exists
         if node.condition:
-            condition_expr = self.visit_expression(node.condition)
             linq += f".Where({target} => {condition_expr})"
             
         # Add .Select(...)
-        select_expr = self.visit_expression(node.expression)
         linq += f".Select({target} => {select_expr})"
         
         # Finalize
@@ -259,12 +483,10 @@ class CSharpCodeGenerator:
         
         return linq
 
-    def visit_binary_op(self, node: BinaryOpExpr) -> str:
+    def visit_binary_op(self, node: BinaryOpExpr, left: str, right: str) -> str:
         """
         Generate C# binary operation string.
         """
-        left = self.visit_expression(node.left)
-        right = self.visit_expression(node.right)
         return f"{left} {node.op} {right}"
 
 
@@ -0,0 +1,233 @@
+"""
+Dukpyra Incremental - Block-level Reparse of a Changed File
+
+The per-file cache (cache.py) skips unchanged files, but one edit in a
+large main.py still re-lexes and re-parses the whole file. A Dukpyra
+program is a flat sequence of top-level blocks:
+
+    preamble     import dukpyra / app = dukpyra.app()
+    class        class CreateUser: ...          (zero or more)
+    endpoint     @app.get(...) / def ...: ...   (one or more)
+
+so the file is split at column-0 `class` and `@` lines and each block is
+parsed on its own. Blocks whose text is unchanged since the previous
+compile reuse their AST nodes (line numbers shifted when lines were
+added or removed above them); only edited blocks go through the parser.
+CodeGen does the same for endpoint C# fragments (see EndpointFragments
+in codegen.py). The analyzer still checks the assembled program, so
+diagnostics are those of a full compile.
+
+Whenever the block structure cannot be trusted - a block fails to parse
+on its own, blocks are out of grammar order, or a string literal spans a
+block boundary - the whole file is parsed instead, so the AST is always
+identical to parse(source).
+
+Architecture:
+    source → split_blocks → reuse / ParseSession(block) → ProgramNode
+"""
+
+import dataclasses
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast import ProgramNode
+from .parser import ParseSession
+
+# A block starts at a top-level decorator or class statement
+_BOUNDARY = re.compile(r"^(?:@|class\b)", re.M)
+
+# Comments and string literals, scanned the way the lexer does, to find
+# string literals that continue over a line break
+_STRING_OR_COMMENT = re.compile(
+    r"#[^\n]*"
+    r"|\"[^\"\\]*(?:\\.[^\"\\]*)*\""
+    r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+)
+
+# Makes a preamble or class block a complete program for the grammar,
+# which requires at least one endpoint
+_SENTINEL = '@app.get("/")\ndef dukpyra_block():\n    return None\n'
+
+_ORDER = {"preamble": 0, "class": 1, "endpoint": 2}
+
+
+@dataclass
+class Block:
+    """One top-level block of a source file."""
+
+    kind: str    # "preamble", "class" or "endpoint"
+    text: str
+    start: int   # line number of the first line
+
+
+@dataclass
+class ParsedBlock:
+    """AST nodes of a block, with line numbers for a block starting at start."""
+
+    start: int
+    nodes: List[Any]
+
+
+@dataclass
+class IncrementalState:
+    """What the next compile of the same file can reuse (stored in the cache)."""
+
+    # block text → parsed nodes
+    blocks: Dict[str, ParsedBlock] = field(default_factory=dict)
+    # CodeGen endpoint fragments (see codegen.EndpointFragments)
+    fragments: Dict[tuple, tuple] = field(default_factory=dict)
+
+
+def split_blocks(source: str) -> Optional[List[Block]]:
+    """
+    Top-level blocks of source (the first is always the preamble, possibly
+    empty), or None when a string literal spans a would-be block boundary.
+    """
+    boundaries = []
+    for match in _BOUNDARY.finditer(source):
+        pos = match.start()
+        # Stacked decorators belong to the block of the first one
+        if pos > 0 and source.startswith("@", pos):
+            if source.startswith("@", source.rfind("\n", 0, pos - 1) + 1):
+                continue
+        boundaries.append(pos)
+
+    if boundaries and ("'" in source or '"' in source):
+        for m in _STRING_OR_COMMENT.finditer(source):
+            if "\n" in m.group() and any(m.start() < pos < m.end() for pos in boundaries):
+                return None
+
+    blocks = []
+    edges = [0] + boundaries + [len(source)]
+    line = 1
+    for index, (low, high) in enumerate(zip(edges, edges[1:])):
+        text = source[low:high]
+        if index == 0:
+            kind = "preamble"
+        else:
+            kind = "class" if text.startswith("class") else "endpoint"
+        blocks.append(Block(kind, text, line))
+        line += text.count("\n")
+    return blocks
+
+
+def shift_lines(node: Any, delta: int) -> None:
+    """Add delta to the line numbers of node and every node below it (in place)."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif dataclasses.is_dataclass(current):
+            if current.lineno:  # 0 = no position recorded
+                current.lineno += delta
+            for f in dataclasses.fields(current):
+                value = getattr(current, f.name)
+                if isinstance(value, list) or dataclasses.is_dataclass(value):
+                    stack.append(value)
+
+
+class IncrementalParser:
+    """
+    Parses a file block by block, reusing the blocks of a previous state.
+
+        parser = IncrementalParser(previous_state)
+        ast = parser.parse(source)          # == parse(source)
+        parser.state                        # store for the next compile
+        parser.endpoint_keys                # block text of each endpoint
+    """
+
+    def __init__(self, previous: Optional[IncrementalState] = None):
+        self.previous = previous or IncrementalState()
+        self.state = IncrementalState()
+        self.endpoint_keys: Optional[List[str]] = None
+        self.reparsed = 0
+        self.reused = 0
+        self._session = ParseSession()
+
+    def parse(self, source: str) -> Optional[ProgramNode]:
+        if not source.endswith("\n"):
+            source += "\n"
+        program = self._parse_blocks(source)
+        if program is None:
+            # Not splittable: one parse of the whole file, nothing to reuse
+            self.state = IncrementalState()
+            self.endpoint_keys = None
+            self.reparsed += 1
+            program = self._session.parse(source)
+        return program
+
+    def _parse_blocks(self, source: str) -> Optional[ProgramNode]:
+        blocks = split_blocks(source)
+        if blocks is None:
+            return None
+        kinds = [_ORDER[block.kind] for block in blocks]
+        if kinds != sorted(kinds) or kinds[-1] != _ORDER["endpoint"]:
+            return None
+
+        imports, app_creation = [], None
+        classes, endpoints, endpoint_keys = [], [], []
+        for block in blocks:
+            nodes = self._block_nodes(block)
+            if nodes is None:
+                return None
+            if block.kind == "preamble":
+                imports, app_creation = nodes
+            elif block.kind == "class":
+                classes.extend(nodes)
+            else:
+                endpoints.extend(nodes)
+                endpoint_keys.append(block.text)
+
+        self.endpoint_keys = endpoint_keys
+        return ProgramNode(imports=imports, app_creation=app_creation,
+                           classes=classes, endpoints=endpoints, lineno=1)
+
+    def _block_nodes(self, block: Block) -> Optional[List[Any]]:
+        duplicate = block.text in self.state.blocks
+        # A block repeated in one file needs its own nodes for each copy
+        parsed = None if duplicate else self.previous.blocks.get(block.text)
+        if parsed is not None:
+            if parsed.start != block.start:
+                shift_lines(parsed.nodes, block.start - parsed.start)
+                parsed.start = block.start
+            self.reused += 1
+        else:
+            parsed = self._parse_block(block)
+            if parsed is None:
+                return None
+            self.reparsed += 1
+        if not duplicate:
+            self.state.blocks[block.text] = parsed
+        return parsed.nodes
+
+    def _parse_block(self, block: Block) -> Optional[ParsedBlock]:
+        text = block.text if block.kind == "endpoint" else block.text + _SENTINEL
+        program = self._session.parse(text, lineno=block.start)
+        if program is None:
+            return None
+        if len(program.endpoints) != 1:
+            return None
+        if block.kind == "preamble":
+            if program.classes:
+                return None
+            nodes = [program.imports, program.app_creation]
+        elif program.imports or program.app_creation is not None:
+            return None
+        elif block.kind == "class":
+            if len(program.classes) != 1:
+                return None
+            nodes = program.classes
+        else:
+            if program.classes:
+                return None
+            nodes = program.endpoints
+        return ParsedBlock(block.start, nodes)
+
+
+def parse_incremental(source: str, previous: Optional[IncrementalState] = None
+                      ) -> Tuple[Optional[ProgramNode], IncrementalParser]:
+    """Parse source reusing previous; returns (AST, parser with the new state)."""
+    parser = IncrementalParser(previous)
+    return parser.parse(source), parser
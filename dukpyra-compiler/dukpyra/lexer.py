@@ -33,6 +33,7 @@ Tokens: [AT, ID("app"), DOT, GET, LPAREN, STRING("/users"), RPAREN]
 # ส่วนที่ 1.0: IMPORTS
 # ==============================================================================
 import ply.lex as lex  # PLY Lexer library
+import sys  # sys.intern สำหรับชื่อ identifier
 
 
 # ==============================================================================
@@ -316,6 +317,9 @@ def t_ID(t):
     # ตรวจสอบว่าเป็น reserved word หรือไม่
     # ถ้าไม่ใช่ ให้เป็น ID ธรรมดา
     t.type = reserved.get(t.value, "ID")
+    # Intern: ชื่อเดียวกัน (เช่น "item_id", "CreateItem") ที่ปรากฏหลายพันครั้ง
+    # ใน AST จะชี้ไปที่ string object เดียวกัน แทนที่จะเป็นสำเนาแยกกัน
+    t.value = sys.intern(t.value)
     return t
 
 
@@ -494,7 +498,21 @@ lex.lex() จะ:
   - สามารถใช้ lexer แยกเพื่อ debug ได้
 
 Optimization:
-  - อาจเพิ่ม optimize=1 สำหรับ production
-  - อาจเพิ่ม debuglog สำหรับ debugging
+  - ใช้ lextab.py ที่สร้างไว้ตอน build (python -m dukpyra.tables) กับ optimize=1
+    → PLY อ่าน master regex ที่รวมไว้แล้วจาก lextab ไม่ต้อง validate
+      และ compile regex ของทุก rule ทีละตัวตอน import
+  - ถ้าไม่มี lextab, สร้างด้วย PLY คนละ version หรือ tokens ไม่ตรง
+    → สร้าง lexer แบบปกติ
+    (ไม่เขียนไฟล์ลง package directory)
 """
-lexer = lex.lex()  # สร้าง Lexer object พร้อมใช้งาน
+try:
+    from . import lextab as _lextab
+except ImportError:
+    _lextab = None
+
+if (_lextab is not None
+        and getattr(_lextab, '_tabversion', None) == lex.__tabversion__
+        and _lextab._lextokens == set(tokens)):
+    lexer = lex.lex(optimize=1, lextab=_lextab)  # สร้าง Lexer object จาก table
+else:
+    lexer = lex.lex()  # สร้าง Lexer object พร้อมใช้งาน
@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AT', 'CLASS', 'COLON', 'COMMA', 'DEF', 'DELETE', 'DOT', 'EQ', 'EQUALS', 'FALSE', 'FOR', 'GE', 'GET', 'GT', 'ID', 'IF', 'IMPORT', 'IN', 'LBRACE', 'LBRACKET', 'LE', 'LPAREN', 'LT', 'NE', 'NEWLINE', 'NONE', 'NUMBER', 'PATCH', 'POST', 'PUT', 'RBRACE', 'RBRACKET', 'RETURN', 'RPAREN', 'STAR', 'STRING', 'TRUE', 'TYPE_BOOL', 'TYPE_FLOAT', 'TYPE_INT', 'TYPE_STR'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_COMMENT>\\#.*)|(?P<t_ID>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_NUMBER>\\d+\\.?\\d*)|(?P<t_STRING>(\\"[^\\"\\\\]*(?:\\\\.[^\\"\\\\]*)*\\"|\'[^\'\\\\]*(?:\\\\.[^\'\\\\]*)*\'))|(?P<t_NEWLINE>\\n+)|(?P<t_DOT>\\.)|(?P<t_EQ>==)|(?P<t_GE>>=)|(?P<t_LBRACE>\\{)|(?P<t_LBRACKET>\\[)|(?P<t_LE><=)|(?P<t_LPAREN>\\()|(?P<t_NE>!=)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_STAR>\\*)|(?P<t_AT>@)|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_EQUALS>=)|(?P<t_GT>>)|(?P<t_LT><)', [None, ('t_COMMENT', 'COMMENT'), ('t_ID', 'ID'), ('t_NUMBER', 'NUMBER'), ('t_STRING', 'STRING'), None, ('t_NEWLINE', 'NEWLINE'), (None, 'DOT'), (None, 'EQ'), (None, 'GE'), (None, 'LBRACE'), (None, 'LBRACKET'), (None, 'LE'), (None, 'LPAREN'), (None, 'NE'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'STAR'), (None, 'AT'), (None, 'COLON'), (None, 'COMMA'), (None, 'EQUALS'), (None, 'GT'), (None, 'LT')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
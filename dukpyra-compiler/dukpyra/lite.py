@@ -0,0 +1,348 @@
+"""
+Dukpyra Lite - Minimal ASGI App for Profiling Without FastAPI
+
+Profiling only needs requests to reach the handlers with correctly typed
+arguments. FastAPI does that too, but importing FastAPI/Starlette/Pydantic
+and compiling its routes dominates cold start, and its per-request
+machinery (dependency solving, validation, response serialization) is
+several times the cost of the handler itself.
+
+LiteApp implements just what the runtime shim uses:
+
+    - routing on method + path template ("/users/{user_id}", "{rest:path}")
+    - path and query parameters converted by annotation (int, float, bool, str,
+      Optional[...] of those)
+    - any other parameter is read from the JSON body: the whole body when
+      there is one such parameter, otherwise body[name]; annotated classes
+      are instantiated from the body dict
+    - JSON responses (dict, list, scalars, objects via vars())
+    - sync handlers run in the default executor so they never block the loop
+    - lifespan shutdown handlers and add_middleware(), for capture
+
+Select it with DukpyraRuntime(lite=True), DUKPYRA_LITE=1, or
+`dukpyra profile --lite`.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import re
+import typing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+
+class HTTPError(Exception):
+    """Request that cannot be dispatched (turned into a JSON error response)."""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+# ==============================================================================
+# Parameter Conversion
+# ==============================================================================
+
+_TRUE = ("1", "true", "on", "yes")
+_FALSE = ("0", "false", "off", "no")
+
+
+def _to_bool(text: str) -> bool:
+    lowered = text.lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {text!r}")
+
+
+_SCALARS = {int: int, float: float, bool: _to_bool, str: str}
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    """Optional[X] → X (other annotations are returned unchanged)."""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _scalar_converter(annotation: Any) -> Optional[Callable[[str], Any]]:
+    """Converter for a path/query parameter, None when it comes from the body."""
+    if annotation is inspect.Parameter.empty or annotation is Any:
+        return str
+    return _SCALARS.get(_unwrap_optional(annotation))
+
+
+def _body_converter(annotation: Any) -> Callable[[Any], Any]:
+    """Converter for a body value: instantiate annotated classes from a dict."""
+    cls = _unwrap_optional(annotation)
+    if not isinstance(cls, type) or cls.__module__ == "builtins":
+        return lambda value: value
+
+    def convert(value):
+        if not isinstance(value, dict):
+            return value
+        try:
+            return cls(**value)
+        except TypeError:
+            # Plain annotated class without a matching __init__
+            obj = cls.__new__(cls)
+            obj.__dict__.update(value)
+            return obj
+
+    return convert
+
+
+# ==============================================================================
+# Routes
+# ==============================================================================
+
+_PARAM = re.compile(r"{(\w+)(?::path)?}")
+
+# Argument not present in the request (None is a valid JSON body value)
+_MISSING = object()
+
+
+class Route:
+    """One handler with its compiled path pattern and argument plan."""
+
+    __slots__ = ("method", "path", "pattern", "endpoint", "is_async", "plan", "body_params")
+
+    def __init__(self, method: str, path: str, endpoint: Callable):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint
+        self.is_async = inspect.iscoroutinefunction(endpoint)
+
+        path_params = set(_PARAM.findall(path))
+        self.pattern = None
+        if path_params:
+            regex = ""
+            last = 0
+            for match in _PARAM.finditer(path):
+                regex += re.escape(path[last:match.start()])
+                regex += f"(?P<{match.group(1)}>{'.*' if ':path}' in match.group(0) else '[^/]+'})"
+                last = match.end()
+            regex += re.escape(path[last:])
+            self.pattern = re.compile(f"^{regex}$")
+
+        try:
+            hints = typing.get_type_hints(endpoint)
+        except Exception:
+            hints = {}
+
+        # (name, source, converter, default): source is "path", "query" or "body"
+        self.plan: List[Tuple[str, str, Callable, Any]] = []
+        for param in inspect.signature(endpoint).parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            annotation = hints.get(param.name, param.annotation)
+            scalar = _scalar_converter(annotation)
+            if param.name in path_params:
+                source = "path"
+                convert = scalar or str
+            elif scalar is not None:
+                source, convert = "query", scalar
+            else:
+                source, convert = "body", _body_converter(annotation)
+            self.plan.append((param.name, source, convert, param.default))
+        self.body_params = sum(1 for _, source, _, _ in self.plan if source == "body")
+
+    def arguments(self, path_values: Dict[str, str], query: Dict[str, str], body: Any) -> dict:
+        """Handler keyword arguments (body is _MISSING when the request has none)."""
+        kwargs = {}
+        for name, source, convert, default in self.plan:
+            if source == "path":
+                raw = path_values.get(name, _MISSING)
+            elif source == "query":
+                raw = query.get(name, _MISSING)
+            elif body is _MISSING:
+                raw = _MISSING
+            elif self.body_params == 1:
+                raw = body
+            else:
+                raw = body.get(name, _MISSING) if isinstance(body, dict) else _MISSING
+            if raw is _MISSING:
+                if default is inspect.Parameter.empty:
+                    raise HTTPError(422, f"missing {source} parameter: {name}")
+                kwargs[name] = default
+                continue
+            try:
+                kwargs[name] = convert(raw)
+            except (TypeError, ValueError) as e:
+                raise HTTPError(422, f"invalid {source} parameter {name}: {e}")
+        return kwargs
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# ==============================================================================
+# App
+# ==============================================================================
+
+class LiteApp:
+    """
+    ASGI application with the decorator surface DukpyraRuntime uses.
+
+        app = LiteApp()
+
+        @app.get("/users/{user_id}")
+        def get_user(user_id: int):
+            return {"id": user_id}
+    """
+
+    def __init__(self, on_shutdown: Optional[List[Callable]] = None):
+        self.on_shutdown = list(on_shutdown or [])
+        self._static: Dict[Tuple[str, str], Route] = {}
+        self._dynamic: List[Route] = []
+        self._middleware: List[Tuple[type, dict]] = []
+        self._stack: Optional[Callable] = None
+
+    # -------------------------- registration --------------------------
+
+    def add_route(self, method: str, path: str, endpoint: Callable) -> None:
+        route = Route(method, path, endpoint)
+        if route.pattern is None:
+            self._static[(method, path)] = route
+        else:
+            self._dynamic.append(route)
+
+    def route(self, method: str, path: str):
+        def decorator(func):
+            self.add_route(method, path, func)
+            return func
+        return decorator
+
+    def get(self, path: str):
+        return self.route("GET", path)
+
+    def post(self, path: str):
+        return self.route("POST", path)
+
+    def put(self, path: str):
+        return self.route("PUT", path)
+
+    def delete(self, path: str):
+        return self.route("DELETE", path)
+
+    def patch(self, path: str):
+        return self.route("PATCH", path)
+
+    def add_middleware(self, middleware_class: type, **options) -> None:
+        """Wrap the app in an ASGI middleware (outermost = added last, as in Starlette)."""
+        self._middleware.append((middleware_class, options))
+        self._stack = None
+
+    # -------------------------- dispatch --------------------------
+
+    async def __call__(self, scope, receive, send):
+        if self._stack is None:
+            stack = self._app
+            for middleware_class, options in self._middleware:
+                stack = middleware_class(stack, **options)
+            self._stack = stack
+        await self._stack(scope, receive, send)
+
+    async def _app(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            route, path_values = self._match(scope["method"], scope["path"])
+            body = await self._read_body(route, receive)
+            query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"),
+                                   keep_blank_values=True))
+            kwargs = route.arguments(path_values, query, body)
+            if route.is_async:
+                result = await route.endpoint(**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    None, functools.partial(route.endpoint, **kwargs))
+            status, payload = 200, result
+        except HTTPError as e:
+            status, payload = e.status, {"detail": e.detail}
+        except Exception as e:
+            status, payload = 500, {"detail": f"{type(e).__name__}: {e}"}
+
+        await self._send_json(send, status, payload)
+
+    def _match(self, method: str, path: str) -> Tuple[Route, Dict[str, str]]:
+        route = self._static.get((method, path))
+        if route is not None:
+            return route, {}
+        allowed = False
+        for route in self._dynamic:
+            match = route.pattern.match(path)
+            if match is None:
+                continue
+            if route.method == method:
+                return route, match.groupdict()
+            allowed = True
+        if allowed or any(p == path for _, p in self._static):
+            raise HTTPError(405, "Method Not Allowed")
+        raise HTTPError(404, "Not Found")
+
+    @staticmethod
+    async def _read_body(route: Route, receive) -> Any:
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        if not route.body_params:
+            return _MISSING
+        raw = b"".join(chunks)
+        if not raw:
+            return _MISSING
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            raise HTTPError(422, f"invalid JSON body: {e}")
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Any) -> None:
+        try:
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            status = 500
+            body = json.dumps({"detail": f"response is not JSON serializable: {e}"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for handler in self.on_shutdown:
+                    result = handler()
+                    if inspect.isawaitable(result):
+                        await result
+                await send({"type": "lifespan.shutdown.complete"})
+                return
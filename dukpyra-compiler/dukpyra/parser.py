@@ -10,6 +10,10 @@ Architecture:
                           This module
 """
 
+import copy
+import sys
+import types
+
 import ply.yacc as yacc
 
 # Import tokens and lexer from lexer module
@@ -122,9 +126,14 @@ def p_optional_newlines_some(p):
 # 2.1.5 Class Definitions (for Request/Response Bodies)
 # ==============================================================================
 
+# Sequences (classes, properties, endpoints, params, list/dict items) are
+# left-recursive and append in place, so a sequence of n items is built in
+# O(n); right recursion with [p[1]] + p[3] copied the tail on every
+# reduction (O(n^2)) and kept all n items on the parser stack.
 def p_class_definitions_multiple(p):
-    """class_definitions : class_definition class_definitions"""
-    p[0] = [p[1]] + (p[2] if p[2] else [])
+    """class_definitions : class_definitions class_definition"""
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_class_definitions_empty(p):
@@ -142,8 +151,9 @@ def p_class_definition(p):
 
 
 def p_class_properties_multiple(p):
-    """class_properties : class_property class_properties"""
-    p[0] = [p[1]] + (p[2] if p[2] else [])
+    """class_properties : class_properties class_property"""
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_class_properties_single(p):
@@ -162,8 +172,9 @@ def p_class_property(p):
 
 # 2.2 Endpoints: one or more endpoint definitions
 def p_endpoints_multiple(p):
-    """endpoints : endpoint endpoints"""
-    p[0] = [p[1]] + (p[2] if p[2] else [])
+    """endpoints : endpoints endpoint"""
+    p[1].append(p[2])
+    p[0] = p[1]
 
 
 def p_endpoints_single(p):
@@ -244,8 +255,9 @@ def p_function_def_no_params(p):
 
 # 2.5.1 Parameters: comma-separated list of typed parameters
 def p_params_multiple(p):
-    """params : param COMMA params"""
-    p[0] = [p[1]] + p[3]
+    """params : params COMMA param"""
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_params_single(p):
@@ -367,8 +379,9 @@ def p_expression_empty_list(p):
 
 
 def p_list_items_multiple(p):
-    """list_items : expression COMMA list_items"""
-    p[0] = [p[1]] + p[3]
+    """list_items : list_items COMMA expression"""
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_list_items_single(p):
@@ -408,8 +421,9 @@ def p_expression_none(p):
 
 # 2.6.1 Dictionary Items
 def p_dict_items_multiple(p):
-    """dict_items : dict_item COMMA dict_items"""
-    p[0] = [p[1]] + p[3]
+    """dict_items : dict_items COMMA dict_item"""
+    p[1].append(p[3])
+    p[0] = p[1]
 
 
 def p_dict_items_single(p):
@@ -419,7 +433,8 @@ def p_dict_items_single(p):
 
 def p_dict_item(p):
     """dict_item : STRING COLON expression"""
-    p[0] = DictItemNode(key=p[1], value=p[3], lineno=p.lineno(1))
+    # Keys repeat across endpoints ("id", "name", ...): share one string each
+    p[0] = DictItemNode(key=sys.intern(p[1]), value=p[3], lineno=p.lineno(1))
 
 
 # ==============================================================================
@@ -449,7 +464,88 @@ precedence = (
     ('left', 'STAR'),
 )
 
-parser = yacc.yacc()
+
+
+def grammar_signature() -> str:
+    """
+    Signature of this grammar, computed the way PLY does (start symbol,
+    precedence, tokens, then every rule docstring in source order).
+    
+    Only reads attributes of this module - unlike yacc.yacc() it does not
+    reflect on the module source, so it is cheap enough to run at import.
+    """
+    rules = sorted(
+        (func.__code__.co_firstlineno, name, func.__doc__)
+        for name, func in globals().items()
+        if name.startswith('p_') and name != 'p_error' and isinstance(func, types.FunctionType)
+    )
+    parts = [''.join(''.join(level) for level in precedence), ' '.join(sorted(tokens))]
+    parts.extend(doc for _, _, doc in rules if doc)
+    return ''.join(parts)
+
+
+def _load_parser() -> yacc.LRParser:
+    """
+    Load the prebuilt LALR tables in dukpyra/parsetab.py.
+    
+    The tables are generated at build time (`python -m dukpyra.tables`,
+    run by setup.py and `make tables`), so importing the parser never
+    introspects the grammar, never writes parsetab.py / parser.out into
+    the package directory, and works on read-only installs.
+    
+    Tables that are missing, built by another PLY version, or stale for
+    this grammar fall back to building the parser in memory (slow but
+    correct; nothing is written).
+    """
+    tables = yacc.LRTable()
+    try:
+        signature = tables.read_table(__package__ + '.parsetab')
+        if signature == grammar_signature():
+            tables.bind_callables(globals())
+            return yacc.LRParser(tables, p_error)
+    except (ImportError, yacc.VersionError, KeyError):
+        pass
+    return yacc.yacc(debug=False, write_tables=False, errorlog=yacc.NullLogger())
+
+
+parser = _load_parser()
+
+
+# ==============================================================================
+# Parse Sessions
+# ==============================================================================
+
+class ParseSession:
+    """
+    Lexer and parser state for one compilation unit.
+    
+    The module-level `lexer` and `parser` are templates: a session clones
+    the lexer (sharing its compiled master regex) and shallow-copies the
+    parser (sharing its LALR tables), so the mutable state - input
+    position, line counter, parse stacks - belongs to the session alone.
+    Sessions in different threads can parse at the same time, and every
+    parse numbers lines from 1.
+    
+    Usage:
+        session = ParseSession()
+        ast = session.parse(source_code)
+    """
+    
+    def __init__(self):
+        self.lexer = lexer.clone()
+        self.parser = copy.copy(parser)
+    
+    def parse(self, source_code: str, lineno: int = 1) -> ProgramNode:
+        """
+        Parse source_code; lineno is the line number of its first line
+        (for a fragment cut out of a larger file).
+        """
+        # Ensure source ends with newline
+        if not source_code.endswith('\n'):
+            source_code += '\n'
+        
+        self.lexer.lineno = lineno
+        return self.parser.parse(source_code, lexer=self.lexer)
 
 
 # ==============================================================================
@@ -460,15 +556,14 @@ def parse(source_code: str) -> ProgramNode:
     """
     Parse Dukpyra source code and return AST.
     
+    Each call runs in a fresh ParseSession, so it is thread-safe and line
+    numbers always start at 1.
+    
     Usage:
         from dukpyra.parser import parse
         ast = parse(source_code)
     """
-    # Ensure source ends with newline
-    if not source_code.endswith('\n'):
-        source_code += '\n'
-    
-    return parser.parse(source_code, lexer=lexer)
+    return ParseSession().parse(source_code)
 
 
 # ==============================================================================
@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'leftEQNEGTLTGELEleftSTARAT CLASS COLON COMMA DEF DELETE DOT EQ EQUALS FALSE FOR GE GET GT ID IF IMPORT IN LBRACE LBRACKET LE LPAREN LT NE NEWLINE NONE NUMBER PATCH POST PUT RBRACE RBRACKET RETURN RPAREN STAR STRING TRUE TYPE_BOOL TYPE_FLOAT TYPE_INT TYPE_STRprogram : preamble class_definitions endpointspreamble : optional_newlines import_stmt app_creationpreamble : optional_newlines import_stmtpreamble : optional_newlinesimport_stmt : IMPORT ID NEWLINE optional_newlinesapp_creation : ID EQUALS ID DOT ID LPAREN RPAREN NEWLINE optional_newlinesoptional_newlines : optional_newlines : NEWLINE optional_newlinesclass_definitions : class_definition class_definitionsclass_definitions : class_definition : CLASS ID COLON NEWLINE class_propertiesclass_properties : class_property class_propertiesclass_properties : class_propertyclass_property : ID COLON type_hint NEWLINEendpoints : endpoint endpointsendpoints : endpointendpoint : decorator function_defraw_decorator : AT ID DOT ID LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT GET LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT POST LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT PUT LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT DELETE LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT PATCH LPAREN STRING RPAREN NEWLINEfunction_def : DEF ID LPAREN params RPAREN COLON NEWLINE RETURN expression NEWLINEfunction_def : DEF ID LPAREN RPAREN COLON NEWLINE RETURN expression NEWLINEparams : param COMMA paramsparams : paramparam : ID COLON type_hintparam : IDtype_hint : TYPE_INTtype_hint : TYPE_STRtype_hint : TYPE_FLOATtype_hint : TYPE_BOOLtype_hint : IDexpression : STRINGexpression : NUMBERexpression : LBRACE dict_items RBRACEexpression : LBRACE RBRACEexpression : expression STAR expression\n| expression GT expression\n| expression LT expression\n| expression EQ expression\n| expression NE expression\n| expression GE expression\n| expression LE expressionexpression : LBRACKET expression FOR ID IN expression optional_if RBRACKEToptional_if : IF expressionoptional_if : expression : LBRACKET list_items RBRACKETexpression : LBRACKET RBRACKETlist_items : expression COMMA list_itemslist_items : expressionexpression : IDexpression : ID DOT IDexpression : TRUEexpression : FALSEexpression : NONEdict_items : dict_item COMMA dict_itemsdict_items : dict_itemdict_item : STRING COLON expression'
+_lr_signature = 'leftEQNEGTLTGELEleftSTARAT CLASS COLON COMMA DEF DELETE DOT EQ EQUALS FALSE FOR GE GET GT ID IF IMPORT IN LBRACE LBRACKET LE LPAREN LT NE NEWLINE NONE NUMBER PATCH POST PUT RBRACE RBRACKET RETURN RPAREN STAR STRING TRUE TYPE_BOOL TYPE_FLOAT TYPE_INT TYPE_STRprogram : preamble class_definitions endpointspreamble : optional_newlines import_stmt app_creationpreamble : optional_newlines import_stmtpreamble : optional_newlinesimport_stmt : IMPORT ID NEWLINE optional_newlinesapp_creation : ID EQUALS ID DOT ID LPAREN RPAREN NEWLINE optional_newlinesoptional_newlines : optional_newlines : NEWLINE optional_newlinesclass_definitions : class_definitions class_definitionclass_definitions : class_definition : CLASS ID COLON NEWLINE class_propertiesclass_properties : class_properties class_propertyclass_properties : class_propertyclass_property : ID COLON type_hint NEWLINEendpoints : endpoints endpointendpoints : endpointendpoint : decorator function_defraw_decorator : AT ID DOT ID LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT GET LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT POST LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT PUT LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT DELETE LPAREN STRING RPAREN NEWLINEdecorator : AT ID DOT PATCH LPAREN STRING RPAREN NEWLINEfunction_def : DEF ID LPAREN params RPAREN COLON NEWLINE RETURN expression NEWLINEfunction_def : DEF ID LPAREN RPAREN COLON NEWLINE RETURN expression NEWLINEparams : params COMMA paramparams : paramparam : ID COLON type_hintparam : IDtype_hint : TYPE_INTtype_hint : TYPE_STRtype_hint : TYPE_FLOATtype_hint : TYPE_BOOLtype_hint : IDexpression : STRINGexpression : NUMBERexpression : LBRACE dict_items RBRACEexpression : LBRACE RBRACEexpression : expression STAR expression\n                  | expression GT expression\n                  | expression LT expression\n                  | expression EQ expression\n                  | expression NE expression\n                  | expression GE expression\n                  | expression LE expressionexpression : LBRACKET expression FOR ID IN expression optional_if RBRACKEToptional_if : IF expressionoptional_if : expression : LBRACKET list_items RBRACKETexpression : LBRACKET RBRACKETlist_items : list_items COMMA expressionlist_items : expressionexpression : IDexpression : ID DOT IDexpression : TRUEexpression : FALSEexpression : NONEdict_items : dict_items COMMA dict_itemdict_items : dict_itemdict_item : STRING COLON expression'
     
-_lr_action_items = {'IMPORT':([0,3,4,10,],[-7,9,-7,-8,]),'CLASS':([0,2,3,4,6,8,10,17,26,31,39,40,52,79,88,99,],[-7,7,-4,-7,7,-3,-8,-2,-7,-5,-11,-13,-12,-14,-7,-6,]),'AT':([0,2,3,4,5,6,8,10,12,15,17,21,26,31,39,40,52,79,88,99,102,117,],[-7,-10,-4,-7,14,-10,-3,-8,14,-9,-2,-17,-7,-5,-11,-13,-12,-14,-7,-6,-25,-24,]),'NEWLINE':([0,4,19,24,26,56,63,64,65,66,67,68,71,74,75,76,77,78,80,88,90,91,92,93,96,97,98,100,111,115,118,119,120,121,122,123,124,125,126,131,141,],[4,4,26,29,4,72,-34,79,-30,-31,-32,-33,81,83,84,85,86,87,88,4,-53,102,-35,-36,-55,-56,-57,117,-38,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-46,]),'$end':([1,11,12,20,21,102,117,],[0,-1,-16,-15,-17,-25,-24,]),'ID':([4,7,8,9,10,14,22,25,26,29,31,32,40,41,51,54,57,79,82,89,95,101,103,104,105,106,107,108,109,128,129,130,137,140,],[-7,16,18,19,-8,23,27,30,-7,38,-5,42,38,53,63,63,42,-14,90,90,90,118,90,90,90,90,90,90,90,90,134,90,90,90,]),'DEF':([13,83,84,85,86,87,],[22,-19,-20,-21,-22,-23,]),'COLON':([16,38,42,44,55,113,],[24,51,54,56,71,128,]),'EQUALS':([18,],[25,]),'DOT':([23,30,90,],[28,41,101,]),'LPAREN':([27,33,34,35,36,37,53,],[32,46,47,48,49,50,69,]),'GET':([28,],[33,]),'POST':([28,],[34,]),'PUT':([28,],[35,]),'DELETE':([28,],[36,]),'PATCH':([28,],[37,]),'RPAREN':([32,42,43,45,58,59,60,61,62,63,65,66,67,68,69,70,73,],[44,-29,55,-27,74,75,76,77,78,-34,-30,-31,-32,-33,80,-28,-26,]),'COMMA':([42,45,63,65,66,67,68,70,90,92,93,96,97,98,111,112,114,115,118,119,120,121,122,123,124,125,126,131,133,135,141,],[-29,57,-34,-30,-31,-32,-33,-28,-53,-35,-36,-55,-56,-57,-38,127,130,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-60,130,-46,]),'STRING':([46,47,48,49,50,82,89,94,95,103,104,105,106,107,108,109,127,128,130,137,140,],[58,59,60,61,62,92,92,113,92,92,92,92,92,92,92,92,113,92,92,92,92,]),'TYPE_INT':([51,54,],[65,65,]),'TYPE_STR':([51,54,],[66,66,]),'TYPE_FLOAT':([51,54,],[67,67,]),'TYPE_BOOL':([51,54,],[68,68,]),'RETURN':([72,81,],[82,89,]),'NUMBER':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[93,93,93,93,93,93,93,93,93,93,93,93,93,93,]),'LBRACE':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[94,94,94,94,94,94,94,94,94,94,94,94,94,94,]),'LBRACKET':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[95,95,95,95,95,95,95,95,95,95,95,95,95,95,]),'TRUE':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[96,96,96,96,96,96,96,96,96,96,96,96,96,96,]),'FALSE':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[97,97,97,97,97,97,97,97,97,97,97,97,97,97,]),'NONE':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[98,98,98,98,98,98,98,98,98,98,98,98,98,98,]),'STAR':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,103,-35,-36,-55,-56,-57,103,-38,103,-50,-54,-39,103,103,103,103,103,103,-37,-49,103,103,103,-46,103,]),'GT':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,104,-35,-36,-55,-56,-57,104,-38,104,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,104,104,104,-46,104,]),'LT':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,105,-35,-36,-55,-56,-57,105,-38,105,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,105,105,105,-46,105,]),'EQ':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,106,-35,-36,-55,-56,-57,106,-38,106,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,106,106,106,-46,106,]),'NE':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,107,-35,-36,-55,-56,-57,107,-38,107,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,107,107,107,-46,107,]),'GE':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,108,-35,-36,-55,-56,-57,108,-38,108,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,108,108,108,-46,108,]),'LE':([90,91,92,93,96,97,98,100,111,114,115,118,119,120,121,122,123,124,125,126,131,133,135,138,141,142,],[-53,109,-35,-36,-55,-56,-57,109,-38,109,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,109,109,109,-46,109,]),'FOR':([90,92,93,96,97,98,111,114,115,118,119,120,121,122,123,124,125,126,131,141,],[-53,-35,-36,-55,-56,-57,-38,129,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-46,]),'RBRACKET':([90,92,93,95,96,97,98,111,114,115,116,118,119,120,121,122,123,124,125,126,131,135,136,138,139,141,142,],[-53,-35,-36,115,-55,-56,-57,-38,-52,-50,131,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-52,-51,-48,141,-46,-47,]),'RBRACE':([90,92,93,94,96,97,98,110,111,112,115,118,119,120,121,122,123,124,125,126,131,132,133,141,],[-53,-35,-36,111,-55,-56,-57,126,-38,-59,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-58,-60,-46,]),'IF':([90,92,93,96,97,98,111,115,118,119,120,121,122,123,124,125,126,131,138,141,],[-53,-35,-36,-55,-56,-57,-38,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,140,-46,]),'IN':([134,],[137,]),}
+_lr_action_items = {'IMPORT':([0,3,4,8,],[-7,7,-7,-8,]),'CLASS':([0,2,3,4,5,6,8,10,15,24,29,39,40,52,79,87,98,],[-7,-10,-4,-7,12,-3,-8,-9,-2,-7,-5,-11,-13,-12,-14,-7,-6,]),'AT':([0,2,3,4,5,6,8,9,10,11,15,18,20,24,29,39,40,52,79,87,98,101,116,],[-7,-10,-4,-7,14,-3,-8,14,-9,-16,-2,-15,-17,-7,-5,-11,-13,-12,-14,-7,-6,-25,-24,]),'NEWLINE':([0,4,17,24,25,56,63,64,65,66,67,68,70,73,74,75,76,77,78,87,89,90,91,92,95,96,97,99,110,114,117,118,119,120,121,122,123,124,125,129,139,],[4,4,24,4,30,72,-34,79,-30,-31,-32,-33,80,82,83,84,85,86,87,4,-53,101,-35,-36,-55,-56,-57,116,-38,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-46,]),'$end':([1,9,11,18,20,101,116,],[0,-1,-16,-15,-17,-25,-24,]),'ID':([4,6,7,8,12,14,21,23,24,29,30,31,37,39,40,51,52,53,55,79,81,88,94,100,102,103,104,105,106,107,108,127,128,130,135,138,],[-7,16,17,-8,19,22,26,28,-7,-5,38,41,50,38,-13,63,-12,63,41,-14,89,89,89,117,89,89,89,89,89,89,89,89,133,89,89,89,]),'DEF':([13,82,83,84,85,86,],[21,-19,-20,-21,-22,-23,]),'EQUALS':([16,],[23,]),'COLON':([19,38,41,43,54,112,],[25,51,53,56,70,127,]),'DOT':([22,28,89,],[27,37,100,]),'LPAREN':([26,32,33,34,35,36,50,],[31,45,46,47,48,49,62,]),'GET':([27,],[32,]),'POST':([27,],[33,]),'PUT':([27,],[34,]),'DELETE':([27,],[35,]),'PATCH':([27,],[36,]),'RPAREN':([31,41,42,44,57,58,59,60,61,62,63,65,66,67,68,69,71,],[43,-29,54,-27,73,74,75,76,77,78,-34,-30,-31,-32,-33,-28,-26,]),'COMMA':([41,42,44,63,65,66,67,68,69,71,89,91,92,95,96,97,109,110,111,113,114,115,117,118,119,120,121,122,123,124,125,129,131,132,134,139,],[-29,55,-27,-34,-30,-31,-32,-33,-28,-26,-53,-35,-36,-55,-56,-57,126,-38,-59,-52,-50,130,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-58,-60,-51,-46,]),'STRING':([45,46,47,48,49,81,88,93,94,102,103,104,105,106,107,108,126,127,130,135,138,],[57,58,59,60,61,91,91,112,91,91,91,91,91,91,91,91,112,91,91,91,91,]),'TYPE_INT':([51,53,],[65,65,]),'TYPE_STR':([51,53,],[66,66,]),'TYPE_FLOAT':([51,53,],[67,67,]),'TYPE_BOOL':([51,53,],[68,68,]),'RETURN':([72,80,],[81,88,]),'NUMBER':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[92,92,92,92,92,92,92,92,92,92,92,92,92,92,]),'LBRACE':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[93,93,93,93,93,93,93,93,93,93,93,93,93,93,]),'LBRACKET':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[94,94,94,94,94,94,94,94,94,94,94,94,94,94,]),'TRUE':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[95,95,95,95,95,95,95,95,95,95,95,95,95,95,]),'FALSE':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[96,96,96,96,96,96,96,96,96,96,96,96,96,96,]),'NONE':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[97,97,97,97,97,97,97,97,97,97,97,97,97,97,]),'STAR':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,102,-35,-36,-55,-56,-57,102,-38,102,-50,-54,-39,102,102,102,102,102,102,-37,-49,102,102,102,-46,102,]),'GT':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,103,-35,-36,-55,-56,-57,103,-38,103,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,103,103,103,-46,103,]),'LT':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,104,-35,-36,-55,-56,-57,104,-38,104,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,104,104,104,-46,104,]),'EQ':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,105,-35,-36,-55,-56,-57,105,-38,105,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,105,105,105,-46,105,]),'NE':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,106,-35,-36,-55,-56,-57,106,-38,106,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,106,106,106,-46,106,]),'GE':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,107,-35,-36,-55,-56,-57,107,-38,107,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,107,107,107,-46,107,]),'LE':([89,90,91,92,95,96,97,99,110,113,114,117,118,119,120,121,122,123,124,125,129,132,134,136,139,140,],[-53,108,-35,-36,-55,-56,-57,108,-38,108,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,108,108,108,-46,108,]),'FOR':([89,91,92,95,96,97,110,113,114,117,118,119,120,121,122,123,124,125,129,139,],[-53,-35,-36,-55,-56,-57,-38,128,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-46,]),'RBRACKET':([89,91,92,94,95,96,97,110,113,114,115,117,118,119,120,121,122,123,124,125,129,134,136,137,139,140,],[-53,-35,-36,114,-55,-56,-57,-38,-52,-50,129,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-51,-48,139,-46,-47,]),'RBRACE':([89,91,92,93,95,96,97,109,110,111,114,117,118,119,120,121,122,123,124,125,129,131,132,139,],[-53,-35,-36,110,-55,-56,-57,125,-38,-59,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,-58,-60,-46,]),'IF':([89,91,92,95,96,97,110,114,117,118,119,120,121,122,123,124,125,129,136,139,],[-53,-35,-36,-55,-56,-57,-38,-50,-54,-39,-40,-41,-42,-43,-44,-45,-37,-49,138,-46,]),'IN':([133,],[135,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'program':([0,],[1,]),'preamble':([0,],[2,]),'optional_newlines':([0,4,26,88,],[3,10,31,99,]),'class_definitions':([2,6,],[5,15,]),'class_definition':([2,6,],[6,6,]),'import_stmt':([3,],[8,]),'endpoints':([5,12,],[11,20,]),'endpoint':([5,12,],[12,12,]),'decorator':([5,12,],[13,13,]),'app_creation':([8,],[17,]),'function_def':([13,],[21,]),'class_properties':([29,40,],[39,52,]),'class_property':([29,40,],[40,40,]),'params':([32,57,],[43,73,]),'param':([32,57,],[45,45,]),'type_hint':([51,54,],[64,70,]),'expression':([82,89,95,103,104,105,106,107,108,109,128,130,137,140,],[91,100,114,119,120,121,122,123,124,125,133,135,138,142,]),'dict_items':([94,127,],[110,132,]),'dict_item':([94,127,],[112,112,]),'list_items':([95,130,],[116,136,]),'optional_if':([138,],[139,]),}
+_lr_goto_items = {'program':([0,],[1,]),'preamble':([0,],[2,]),'optional_newlines':([0,4,24,87,],[3,8,29,98,]),'class_definitions':([2,],[5,]),'import_stmt':([3,],[6,]),'endpoints':([5,],[9,]),'class_definition':([5,],[10,]),'endpoint':([5,9,],[11,18,]),'decorator':([5,9,],[13,13,]),'app_creation':([6,],[15,]),'function_def':([13,],[20,]),'class_properties':([30,],[39,]),'class_property':([30,39,],[40,52,]),'params':([31,],[42,]),'param':([31,55,],[44,71,]),'type_hint':([51,53,],[64,69,]),'expression':([81,88,94,102,103,104,105,106,107,108,127,130,135,138,],[90,99,113,118,119,120,121,122,123,124,132,134,136,140,]),'dict_items':([93,],[109,]),'dict_item':([93,126,],[111,131,]),'list_items':([94,],[115,]),'optional_if':([136,],[137,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,64 +27,64 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> program","S'",1,None,None,None),
-  ('program -> preamble class_definitions endpoints','program',3,'p_program','parser.py',52),
-  ('preamble -> optional_newlines import_stmt app_creation','preamble',3,'p_preamble_full','parser.py',70),
-  ('preamble -> optional_newlines import_stmt','preamble',2,'p_preamble_with_import','parser.py',78),
-  ('preamble -> optional_newlines','preamble',1,'p_preamble_empty','parser.py',86),
-  ('import_stmt -> IMPORT ID NEWLINE optional_newlines','import_stmt',4,'p_import_stmt','parser.py',95),
-  ('app_creation -> ID EQUALS ID DOT ID LPAREN RPAREN NEWLINE optional_newlines','app_creation',9,'p_app_creation','parser.py',101),
-  ('optional_newlines -> <empty>','optional_newlines',0,'p_optional_newlines_empty','parser.py',112),
-  ('optional_newlines -> NEWLINE optional_newlines','optional_newlines',2,'p_optional_newlines_some','parser.py',117),
-  ('class_definitions -> class_definition class_definitions','class_definitions',2,'p_class_definitions_multiple','parser.py',126),
-  ('class_definitions -> <empty>','class_definitions',0,'p_class_definitions_empty','parser.py',131),
-  ('class_definition -> CLASS ID COLON NEWLINE class_properties','class_definition',5,'p_class_definition','parser.py',136),
-  ('class_properties -> class_property class_properties','class_properties',2,'p_class_properties_multiple','parser.py',145),
-  ('class_properties -> class_property','class_properties',1,'p_class_properties_single','parser.py',150),
-  ('class_property -> ID COLON type_hint NEWLINE','class_property',4,'p_class_property','parser.py',155),
-  ('endpoints -> endpoint endpoints','endpoints',2,'p_endpoints_multiple','parser.py',165),
-  ('endpoints -> endpoint','endpoints',1,'p_endpoints_single','parser.py',170),
-  ('endpoint -> decorator function_def','endpoint',2,'p_endpoint','parser.py',176),
-  ('raw_decorator -> AT ID DOT ID LPAREN STRING RPAREN NEWLINE','raw_decorator',8,'p_raw_decorator','parser.py',191),
-  ('decorator -> AT ID DOT GET LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_get','parser.py',200),
-  ('decorator -> AT ID DOT POST LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_post','parser.py',205),
-  ('decorator -> AT ID DOT PUT LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_put','parser.py',210),
-  ('decorator -> AT ID DOT DELETE LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_delete','parser.py',215),
-  ('decorator -> AT ID DOT PATCH LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_patch','parser.py',220),
-  ('function_def -> DEF ID LPAREN params RPAREN COLON NEWLINE RETURN expression NEWLINE','function_def',10,'p_function_def_with_params','parser.py',226),
-  ('function_def -> DEF ID LPAREN RPAREN COLON NEWLINE RETURN expression NEWLINE','function_def',9,'p_function_def_no_params','parser.py',236),
-  ('params -> param COMMA params','params',3,'p_params_multiple','parser.py',247),
-  ('params -> param','params',1,'p_params_single','parser.py',252),
-  ('param -> ID COLON type_hint','param',3,'p_param_typed','parser.py',258),
-  ('param -> ID','param',1,'p_param_untyped','parser.py',267),
-  ('type_hint -> TYPE_INT','type_hint',1,'p_type_hint_int','parser.py',277),
-  ('type_hint -> TYPE_STR','type_hint',1,'p_type_hint_str','parser.py',282),
-  ('type_hint -> TYPE_FLOAT','type_hint',1,'p_type_hint_float','parser.py',287),
-  ('type_hint -> TYPE_BOOL','type_hint',1,'p_type_hint_bool','parser.py',292),
-  ('type_hint -> ID','type_hint',1,'p_type_hint_custom','parser.py',297),
-  ('expression -> STRING','expression',1,'p_expression_string','parser.py',305),
-  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',310),
-  ('expression -> LBRACE dict_items RBRACE','expression',3,'p_expression_dict','parser.py',315),
-  ('expression -> LBRACE RBRACE','expression',2,'p_expression_empty_dict','parser.py',320),
-  ('expression -> expression STAR expression','expression',3,'p_expression_binary_op','parser.py',325),
-  ('expression -> expression GT expression','expression',3,'p_expression_binary_op','parser.py',326),
-  ('expression -> expression LT expression','expression',3,'p_expression_binary_op','parser.py',327),
-  ('expression -> expression EQ expression','expression',3,'p_expression_binary_op','parser.py',328),
-  ('expression -> expression NE expression','expression',3,'p_expression_binary_op','parser.py',329),
-  ('expression -> expression GE expression','expression',3,'p_expression_binary_op','parser.py',330),
-  ('expression -> expression LE expression','expression',3,'p_expression_binary_op','parser.py',331),
-  ('expression -> LBRACKET expression FOR ID IN expression optional_if RBRACKET','expression',8,'p_expression_list_comp','parser.py',342),
-  ('optional_if -> IF expression','optional_if',2,'p_optional_if_present','parser.py',353),
-  ('optional_if -> <empty>','optional_if',0,'p_optional_if_empty','parser.py',357),
-  ('expression -> LBRACKET list_items RBRACKET','expression',3,'p_expression_list','parser.py',361),
-  ('expression -> LBRACKET RBRACKET','expression',2,'p_expression_empty_list','parser.py',366),
-  ('list_items -> expression COMMA list_items','list_items',3,'p_list_items_multiple','parser.py',371),
-  ('list_items -> expression','list_items',1,'p_list_items_single','parser.py',376),
-  ('expression -> ID','expression',1,'p_expression_identifier','parser.py',381),
-  ('expression -> ID DOT ID','expression',3,'p_expression_member_access','parser.py',387),
-  ('expression -> TRUE','expression',1,'p_expression_true','parser.py',396),
-  ('expression -> FALSE','expression',1,'p_expression_false','parser.py',401),
-  ('expression -> NONE','expression',1,'p_expression_none','parser.py',406),
-  ('dict_items -> dict_item COMMA dict_items','dict_items',3,'p_dict_items_multiple','parser.py',412),
-  ('dict_items -> dict_item','dict_items',1,'p_dict_items_single','parser.py',417),
-  ('dict_item -> STRING COLON expression','dict_item',3,'p_dict_item','parser.py',422),
+  ('program -> preamble class_definitions endpoints','program',3,'p_program','parser.py',55),
+  ('preamble -> optional_newlines import_stmt app_creation','preamble',3,'p_preamble_full','parser.py',73),
+  ('preamble -> optional_newlines import_stmt','preamble',2,'p_preamble_with_import','parser.py',81),
+  ('preamble -> optional_newlines','preamble',1,'p_preamble_empty','parser.py',89),
+  ('import_stmt -> IMPORT ID NEWLINE optional_newlines','import_stmt',4,'p_import_stmt','parser.py',98),
+  ('app_creation -> ID EQUALS ID DOT ID LPAREN RPAREN NEWLINE optional_newlines','app_creation',9,'p_app_creation','parser.py',104),
+  ('optional_newlines -> <empty>','optional_newlines',0,'p_optional_newlines_empty','parser.py',115),
+  ('optional_newlines -> NEWLINE optional_newlines','optional_newlines',2,'p_optional_newlines_some','parser.py',120),
+  ('class_definitions -> class_definitions class_definition','class_definitions',2,'p_class_definitions_multiple','parser.py',133),
+  ('class_definitions -> <empty>','class_definitions',0,'p_class_definitions_empty','parser.py',139),
+  ('class_definition -> CLASS ID COLON NEWLINE class_properties','class_definition',5,'p_class_definition','parser.py',144),
+  ('class_properties -> class_properties class_property','class_properties',2,'p_class_properties_multiple','parser.py',153),
+  ('class_properties -> class_property','class_properties',1,'p_class_properties_single','parser.py',159),
+  ('class_property -> ID COLON type_hint NEWLINE','class_property',4,'p_class_property','parser.py',164),
+  ('endpoints -> endpoints endpoint','endpoints',2,'p_endpoints_multiple','parser.py',174),
+  ('endpoints -> endpoint','endpoints',1,'p_endpoints_single','parser.py',180),
+  ('endpoint -> decorator function_def','endpoint',2,'p_endpoint','parser.py',186),
+  ('raw_decorator -> AT ID DOT ID LPAREN STRING RPAREN NEWLINE','raw_decorator',8,'p_raw_decorator','parser.py',201),
+  ('decorator -> AT ID DOT GET LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_get','parser.py',210),
+  ('decorator -> AT ID DOT POST LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_post','parser.py',215),
+  ('decorator -> AT ID DOT PUT LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_put','parser.py',220),
+  ('decorator -> AT ID DOT DELETE LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_delete','parser.py',225),
+  ('decorator -> AT ID DOT PATCH LPAREN STRING RPAREN NEWLINE','decorator',8,'p_decorator_patch','parser.py',230),
+  ('function_def -> DEF ID LPAREN params RPAREN COLON NEWLINE RETURN expression NEWLINE','function_def',10,'p_function_def_with_params','parser.py',236),
+  ('function_def -> DEF ID LPAREN RPAREN COLON NEWLINE RETURN expression NEWLINE','function_def',9,'p_function_def_no_params','parser.py',246),
+  ('params -> params COMMA param','params',3,'p_params_multiple','parser.py',257),
+  ('params -> param','params',1,'p_params_single','parser.py',263),
+  ('param -> ID COLON type_hint','param',3,'p_param_typed','parser.py',269),
+  ('param -> ID','param',1,'p_param_untyped','parser.py',278),
+  ('type_hint -> TYPE_INT','type_hint',1,'p_type_hint_int','parser.py',288),
+  ('type_hint -> TYPE_STR','type_hint',1,'p_type_hint_str','parser.py',293),
+  ('type_hint -> TYPE_FLOAT','type_hint',1,'p_type_hint_float','parser.py',298),
+  ('type_hint -> TYPE_BOOL','type_hint',1,'p_type_hint_bool','parser.py',303),
+  ('type_hint -> ID','type_hint',1,'p_type_hint_custom','parser.py',308),
+  ('expression -> STRING','expression',1,'p_expression_string','parser.py',316),
+  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',321),
+  ('expression -> LBRACE dict_items RBRACE','expression',3,'p_expression_dict','parser.py',326),
+  ('expression -> LBRACE RBRACE','expression',2,'p_expression_empty_dict','parser.py',331),
+  ('expression -> expression STAR expression','expression',3,'p_expression_binary_op','parser.py',336),
+  ('expression -> expression GT expression','expression',3,'p_expression_binary_op','parser.py',337),
+  ('expression -> expression LT expression','expression',3,'p_expression_binary_op','parser.py',338),
+  ('expression -> expression EQ expression','expression',3,'p_expression_binary_op','parser.py',339),
+  ('expression -> expression NE expression','expression',3,'p_expression_binary_op','parser.py',340),
+  ('expression -> expression GE expression','expression',3,'p_expression_binary_op','parser.py',341),
+  ('expression -> expression LE expression','expression',3,'p_expression_binary_op','parser.py',342),
+  ('expression -> LBRACKET expression FOR ID IN expression optional_if RBRACKET','expression',8,'p_expression_list_comp','parser.py',353),
+  ('optional_if -> IF expression','optional_if',2,'p_optional_if_present','parser.py',363),
+  ('optional_if -> <empty>','optional_if',0,'p_optional_if_empty','parser.py',367),
+  ('expression -> LBRACKET list_items RBRACKET','expression',3,'p_expression_list','parser.py',371),
+  ('expression -> LBRACKET RBRACKET','expression',2,'p_expression_empty_list','parser.py',376),
+  ('list_items -> list_items COMMA expression','list_items',3,'p_list_items_multiple','parser.py',381),
+  ('list_items -> expression','list_items',1,'p_list_items_single','parser.py',387),
+  ('expression -> ID','expression',1,'p_expression_identifier','parser.py',392),
+  ('expression -> ID DOT ID','expression',3,'p_expression_member_access','parser.py',398),
+  ('expression -> TRUE','expression',1,'p_expression_true','parser.py',407),
+  ('expression -> FALSE','expression',1,'p_expression_false','parser.py',412),
+  ('expression -> NONE','expression',1,'p_expression_none','parser.py',417),
+  ('dict_items -> dict_items COMMA dict_item','dict_items',3,'p_dict_items_multiple','parser.py',423),
+  ('dict_items -> dict_item','dict_items',1,'p_dict_items_single','parser.py',429),
+  ('dict_item -> STRING COLON expression','dict_item',3,'p_dict_item','parser.py',434),
 ]
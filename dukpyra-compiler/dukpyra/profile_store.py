@@ -0,0 +1,532 @@
+"""
+Dukpyra Profile Store - Reading, Writing and Merging Type Profiles
+
+The runtime shim (runtime.py) records how often each type was observed for
+every handler argument. This module owns the on-disk format of that data:
+
+    {
+      "types":        {"get_user": {"id": "int"}},          # resolved, read by CodeGen
+      "observations": {"get_user": {"id": {"int": 42}}},    # type -> count
+      "stats":        {"get_user": {"id": {"min": 1, "max": 9000, ...}}},
+      "metadata":     {"version": "0.3.0", ...}
+    }
+
+Value statistics (see ValueStats) are bounded per argument no matter how
+long profiling runs, and every field merges exactly across shards: min/max,
+log2-bucketed histograms of string lengths and collection sizes, and a small
+HyperLogLog sketch of distinct values.
+
+When profiling runs in several processes (uvicorn --workers N) or on several
+hosts, each process writes its own shard under .dukpyra/shards/ and
+`dukpyra profile merge` folds them into a single profile.
+
+The runtime does not rewrite the profile for every new observation. It
+appends count deltas to an observation log next to it (types.json.log, one
+JSON record per line) and periodically compacts the log into the snapshot:
+
+    1. types.json.log      → types.json.log.<generation>   (atomic rename)
+    2. snapshot + segments → types.json                    (atomic replace,
+                                                            records log_generation)
+    3. delete segments with generation <= log_generation
+
+A crash at any step is repaired by the next compaction: segments newer than
+the snapshot's log_generation are folded in, older ones are only deleted.
+Readers (load_observations, load_types) fold the log in memory, so they
+always see every appended record.
+
+Architecture:
+    Runtime (per process) → log → compaction → .dukpyra/types.json → CodeGen
+"""
+
+import json
+import math
+import os
+import socket
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+
+PROFILE_VERSION = "0.3.0"
+
+# Observations: {"function_name": {"param_name": {"type_name": count}}}
+Observations = Dict[str, Dict[str, Dict[str, int]]]
+
+# Stats: {"function_name": {"param_name": {"min": ..., "hll": "...", ...}}}
+Stats = Dict[str, Dict[str, dict]]
+
+# Log records: (function_name, param_name, type_name, count_delta)
+#              (function_name, param_name, stats_delta)
+Record = Tuple[str, str, str, int]
+StatsRecord = Tuple[str, str, dict]
+
+
+# ==============================================================================
+# Resolution
+# ==============================================================================
+
+def resolve_types(observations: Observations) -> Dict[str, Dict[str, str]]:
+    """
+    Pick one type per argument: the most frequently observed one.
+
+    Ties keep the type that was observed first.
+
+    Example:
+        {"get_user": {"id": {"int": 9, "str": 1}}} -> {"get_user": {"id": "int"}}
+    """
+    types = {}
+    for func_name, args in observations.items():
+        resolved = {}
+        for arg_name, counts in args.items():
+            if counts:
+                resolved[arg_name] = max(counts, key=counts.get)
+        types[func_name] = resolved
+    return types
+
+
+def make_profile(observations: Observations, stats: Stats = None,
+                 log_generation: int = 0) -> dict:
+    """
+    Build the JSON document written to types.json or a shard.
+
+    log_generation is the newest log segment already folded into
+    observations (see compact_profile).
+    """
+    return {
+        "types": resolve_types(observations),
+        "observations": observations,
+        "stats": {
+            func_name: {
+                arg_name: _with_estimates(arg_stats)
+                for arg_name, arg_stats in args.items()
+            }
+            for func_name, args in (stats or {}).items()
+        },
+        "metadata": {
+            "version": PROFILE_VERSION,
+            "method": "runtime_profiling",
+            "research_ref": "[6] Krivanek & Uttner - Runtime type collecting",
+            "log_generation": log_generation,
+        }
+    }
+
+
+def _add_count(observations: Observations, func_name: str, arg_name: str,
+               type_name: str, count: int) -> None:
+    counts = observations.setdefault(func_name, {}).setdefault(arg_name, {})
+    counts[type_name] = counts.get(type_name, 0) + count
+
+
+# ==============================================================================
+# Value Statistics
+# ==============================================================================
+
+# 2^6 registers: 64 bytes per argument, ~13% standard error
+HLL_REGISTERS = 64
+_HLL_RANK_BITS = 26
+_HLL_RANK_MASK = (1 << _HLL_RANK_BITS) - 1
+
+
+def hll_estimate(registers: bytes) -> int:
+    """Estimated number of distinct values from HyperLogLog registers."""
+    m = len(registers)
+    estimate = 0.709 * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        # Small-range correction (linear counting)
+        estimate = m * math.log(m / zeros)
+    return int(round(estimate))
+
+
+class ValueStats:
+    """
+    Streaming statistics of the values seen for one argument.
+
+    Memory is constant per argument: min/max, two histograms with at most
+    one bucket per bit of length, and HLL_REGISTERS bytes.
+
+    Attributes:
+        lo, hi: smallest / largest int or float
+        max_length: longest str
+        max_size: largest list or dict
+        lengths: {len(str).bit_length(): count} since the last drain()
+        sizes: {len(collection).bit_length(): count} since the last drain()
+        registers: HyperLogLog registers over ints, floats and strs
+    """
+    __slots__ = ("lo", "hi", "max_length", "max_size", "lengths", "sizes", "registers")
+
+    def __init__(self):
+        self.lo = None
+        self.hi = None
+        self.max_length = None
+        self.max_size = None
+        self.lengths = {}
+        self.sizes = {}
+        self.registers = bytearray(HLL_REGISTERS)
+
+    def add(self, value: Any, cls: type) -> None:
+        """Record one value (cls is type(value), already computed by the caller)."""
+        if cls is int or cls is float:
+            if self.lo is None or value < self.lo:
+                self.lo = value
+            if self.hi is None or value > self.hi:
+                self.hi = value
+            self._add_distinct(repr(value))
+        elif cls is str:
+            n = len(value)
+            bucket = n.bit_length()
+            self.lengths[bucket] = self.lengths.get(bucket, 0) + 1
+            if self.max_length is None or n > self.max_length:
+                self.max_length = n
+            self._add_distinct(value)
+        elif cls is list or cls is dict:
+            n = len(value)
+            bucket = n.bit_length()
+            self.sizes[bucket] = self.sizes.get(bucket, 0) + 1
+            if self.max_size is None or n > self.max_size:
+                self.max_size = n
+
+    def _add_distinct(self, text: str) -> None:
+        # Stable hash: crc32 spread by a Fibonacci multiply. Unlike hash(),
+        # it is the same in every process, which merging sketches from
+        # several shards requires.
+        h = (zlib.crc32(text.encode("utf-8", "surrogatepass")) * 0x9E3779B1) & 0xFFFFFFFF
+        index = h >> _HLL_RANK_BITS
+        # Position of the lowest 1 bit in the remaining 26 bits
+        w = h & _HLL_RANK_MASK
+        rank = (w & -w).bit_length() if w else _HLL_RANK_BITS + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def drain(self) -> dict:
+        """
+        Stats delta for the observation log.
+
+        Histograms are deltas and are reset; min/max and the sketch are
+        cumulative (merging them twice changes nothing).
+        """
+        lengths, self.lengths = self.lengths, {}
+        sizes, self.sizes = self.sizes, {}
+        record = {}
+        for key, value in (("min", self.lo), ("max", self.hi),
+                           ("max_length", self.max_length), ("max_size", self.max_size)):
+            if value is not None:
+                record[key] = value
+        if lengths:
+            record["lengths"] = {str(bucket): count for bucket, count in lengths.items()}
+        if sizes:
+            record["sizes"] = {str(bucket): count for bucket, count in sizes.items()}
+        if any(self.registers):
+            record["hll"] = self.registers.hex()
+        return record
+
+    def merge(self, other: "ValueStats") -> None:
+        """Fold another accumulator's stats into this one (in place)."""
+        for attr, pick in (("lo", min), ("hi", max), ("max_length", max), ("max_size", max)):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                ours = getattr(self, attr)
+                setattr(self, attr, theirs if ours is None else pick(ours, theirs))
+        for mine, theirs in ((self.lengths, other.lengths), (self.sizes, other.sizes)):
+            for bucket, count in theirs.items():
+                mine[bucket] = mine.get(bucket, 0) + count
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def restore(self, record: dict) -> None:
+        """Put back the histogram deltas of a record that could not be written."""
+        for key, histogram in (("lengths", self.lengths), ("sizes", self.sizes)):
+            for bucket, count in record.get(key, {}).items():
+                histogram[int(bucket)] = histogram.get(int(bucket), 0) + count
+
+
+def merge_stats(into: dict, other: dict) -> None:
+    """Merge one argument's stats (or a stats delta) into another (in place)."""
+    for key, pick in (("min", min), ("max", max), ("max_length", max), ("max_size", max)):
+        if key in other:
+            into[key] = pick(into[key], other[key]) if key in into else other[key]
+    for key in ("lengths", "sizes"):
+        if key in other:
+            histogram = into.setdefault(key, {})
+            for bucket, count in other[key].items():
+                histogram[bucket] = histogram.get(bucket, 0) + count
+    if "hll" in other:
+        registers = bytes.fromhex(other["hll"])
+        if "hll" in into:
+            registers = bytes(map(max, bytes.fromhex(into["hll"]), registers))
+        into["hll"] = registers.hex()
+
+
+def _add_stats(stats: Stats, func_name: str, arg_name: str, delta: dict) -> None:
+    merge_stats(stats.setdefault(func_name, {}).setdefault(arg_name, {}), delta)
+
+
+def _with_estimates(arg_stats: dict) -> dict:
+    """Stats as written to a snapshot: adds the derived distinct-value estimate."""
+    arg_stats = {key: value for key, value in arg_stats.items() if key != "distinct"}
+    if "hll" in arg_stats:
+        arg_stats["distinct"] = hll_estimate(bytes.fromhex(arg_stats["hll"]))
+    return arg_stats
+
+
+# ==============================================================================
+# Reading and Writing
+# ==============================================================================
+
+def write_profile_atomic(path: Path, data: dict) -> None:
+    """
+    Write a profile as JSON through a temp file and os.replace().
+
+    Readers (CodeGen, merge) never see a partially written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True, parents=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=str(path.parent),
+        prefix=path.name + ".",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_snapshot(path: Path) -> Tuple[Observations, Stats, int]:
+    """
+    Read the observations, stats and log generation of a snapshot.
+
+    A missing snapshot is empty. Older profiles stored a plain list of
+    types per argument; each listed type is counted once.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}, {}, 0
+
+    observations = {}
+    for func_name, args in data.get("observations", {}).items():
+        for arg_name, seen in args.items():
+            if isinstance(seen, list):
+                seen = dict.fromkeys(seen, 1)
+            observations.setdefault(func_name, {})[arg_name] = dict(seen)
+    stats = data.get("stats", {})
+    return observations, stats, data.get("metadata", {}).get("log_generation", 0)
+
+
+def load_profile(path: Path) -> Tuple[Observations, Stats]:
+    """Read the observations and stats of a profile, including records still in its log."""
+    path = Path(path)
+    observations, stats, generation = _read_snapshot(path)
+    for segment_generation, segment in _log_segments(path):
+        if segment_generation > generation:
+            _fold_log(observations, stats, segment)
+    _fold_log(observations, stats, log_path(path))
+    return observations, stats
+
+
+def load_observations(path: Path) -> Observations:
+    """Read the observations of a profile, including records still in its log."""
+    return load_profile(path)[0]
+
+
+def load_stats(path: Path) -> Stats:
+    """Read the value statistics of a profile, including records still in its log."""
+    return load_profile(path)[1]
+
+
+def load_types(path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Read the resolved types that CodeGen uses.
+
+    Accepts both the full profile format ({"types": ...}) and a bare
+    {"function_name": {"param_name": "type"}} mapping. Records that have
+    not been compacted yet are taken into account.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not (isinstance(data.get("types"), dict) and isinstance(data.get("metadata"), dict)):
+        return data
+    if log_path(path).exists() or _log_segments(path):
+        return resolve_types(load_observations(path))
+    return data["types"]
+
+
+# ==============================================================================
+# Observation Log and Compaction
+# ==============================================================================
+
+def log_path(path: Path) -> Path:
+    """Observation log of a profile: types.json → types.json.log"""
+    path = Path(path)
+    return path.with_name(path.name + ".log")
+
+
+def _log_segments(path: Path) -> List[Tuple[int, Path]]:
+    """Log segments left by compaction, oldest first."""
+    prefix = log_path(path).name + "."
+    segments = []
+    for segment in path.parent.glob(prefix + "*"):
+        suffix = segment.name[len(prefix):]
+        if suffix.isdigit():
+            segments.append((int(suffix), segment))
+    return sorted(segments)
+
+
+def append_records(path: Path, records: List[Record],
+                   stats_records: Iterable[StatsRecord] = ()) -> int:
+    """
+    Append count and stats deltas to the observation log of a profile.
+
+    Cost is proportional to the number of records, not to the size of the
+    profile. Returns the number of bytes written.
+    """
+    lines = [
+        {"f": func_name, "a": arg_name, "t": type_name, "n": count}
+        for func_name, arg_name, type_name, count in records
+    ]
+    lines.extend(
+        {"f": func_name, "a": arg_name, "s": delta}
+        for func_name, arg_name, delta in stats_records
+    )
+    lines = "".join(
+        json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for line in lines
+    ).encode("utf-8")
+
+    log = log_path(path)
+    log.parent.mkdir(exist_ok=True, parents=True)
+    with open(log, "ab") as f:
+        f.write(lines)
+    return len(lines)
+
+
+def _fold_log(observations: Observations, stats: Stats, log: Path) -> None:
+    """Add the records of one log file to observations and stats (in place)."""
+    try:
+        f = open(log, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if "s" in record:
+                    _add_stats(stats, record["f"], record["a"], record["s"])
+                else:
+                    _add_count(observations, record["f"], record["a"], record["t"], record["n"])
+            except (ValueError, KeyError, TypeError):
+                continue  # torn last line after a crash
+
+
+def compact_profile(path: Path) -> int:
+    """
+    Fold the observation log into the snapshot.
+
+    Safe to re-run after a crash at any point (see the module docstring).
+    Must not run concurrently with appends from another process.
+
+    Returns:
+        The snapshot's new log generation.
+    """
+    path = Path(path)
+    observations, stats, generation = _read_snapshot(path)
+    segments = _log_segments(path)
+
+    # 1. Freeze the live log as a new segment
+    log = log_path(path)
+    if log.exists():
+        next_generation = max([generation] + [g for g, _ in segments]) + 1
+        segment = log.with_name(f"{log.name}.{next_generation}")
+        os.replace(log, segment)
+        segments.append((next_generation, segment))
+
+    # 2. Fold segments not yet in the snapshot and write it
+    for segment_generation, segment in segments:
+        if segment_generation > generation:
+            _fold_log(observations, stats, segment)
+            generation = segment_generation
+    write_profile_atomic(path, make_profile(observations, stats, generation))
+
+    # 3. Everything up to `generation` is in the snapshot now
+    for _, segment in segments:
+        segment.unlink()
+    return generation
+
+
+# ==============================================================================
+# Sharding and Merging
+# ==============================================================================
+
+def shard_path(shard_dir: Path) -> Path:
+    """Shard file for the current process, keyed by host and pid."""
+    return Path(shard_dir) / f"types-{socket.gethostname()}-{os.getpid()}.json"
+
+
+def remove_profile(path: Path) -> None:
+    """
+    Delete a profile with its observation log and log segments.
+
+    The log goes first: a profile file left behind by an interrupted
+    removal is still consistent, while a log left behind would be folded
+    into the next profile written under the same name.
+    """
+    path = Path(path)
+    for _, segment in _log_segments(path):
+        segment.unlink()
+    log = log_path(path)
+    if log.exists():
+        log.unlink()
+    if path.exists():
+        path.unlink()
+
+
+def find_shards(shard_dir: Path) -> List[Path]:
+    """All shard files in a directory, in a stable order."""
+    return sorted(Path(shard_dir).glob("types-*.json"))
+
+
+def merge_observations(into: Observations, observations: Observations) -> None:
+    """Union the observed types and add up their counts (in place)."""
+    for func_name, args in observations.items():
+        merged_args = into.setdefault(func_name, {})
+        for arg_name, counts in args.items():
+            merged = merged_args.setdefault(arg_name, {})
+            for type_name, count in counts.items():
+                merged[type_name] = merged.get(type_name, 0) + count
+
+
+def merge_profiles(paths: Iterable[Union[str, Path]], output: Path) -> int:
+    """
+    Merge any number of profile shards into one profile file.
+
+    Shards are read one at a time (snapshot plus log) and folded into a
+    single accumulator, so memory is bounded by the size of the merged
+    profile rather than by the number of shards.
+
+    Returns:
+        Number of shards merged.
+    """
+    merged: Observations = {}
+    merged_stats: Stats = {}
+    count = 0
+    for path in paths:
+        observations, stats = load_profile(path)
+        merge_observations(merged, observations)
+        for func_name, args in stats.items():
+            for arg_name, arg_stats in args.items():
+                _add_stats(merged_stats, func_name, arg_name, arg_stats)
+        count += 1
+
+    write_profile_atomic(output, make_profile(merged, merged_stats))
+    return count
@@ -0,0 +1,225 @@
+"""
+Dukpyra Replay - Traffic Capture and In-process Replay for Profiling
+
+Profiling normally needs a running server and real traffic. This module
+lets the runtime shim record the requests it serves into a corpus file and
+push that corpus back through the ASGI app later, in-process:
+
+    dukpyra profile --capture .dukpyra/corpus.jsonl   # record live traffic
+    dukpyra profile --replay .dukpyra/corpus.jsonl    # re-profile in seconds
+
+The corpus is one JSON object per line (gzip-compressed when the file name
+ends in .gz):
+
+    {"m": "POST", "p": "/users", "q": "page=2", "ct": "application/json", "b": "{...}"}
+
+    m   method                      q   query string (omitted when empty)
+    p   path                        ct  content-type (omitted when absent)
+    b   body as text                b64 body as base64 (non UTF-8 bodies)
+
+Replay needs no sockets and no uvicorn: each record becomes an ASGI http
+scope sent straight to the app with bounded asyncio concurrency. `dukpyra
+profile --replay` samples every call, and type counts and value statistics
+are order-independent sums, so replaying the same corpus always produces
+the same profile. (With a sample rate below 1, a budget or adaptive
+sampling, which calls are profiled depends on chance and request order.)
+
+Architecture:
+    live traffic → CaptureMiddleware → corpus → replay() → Runtime → types.json
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Union
+
+
+Record = Dict[str, str]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+# ==============================================================================
+# Capture
+# ==============================================================================
+
+class CorpusWriter:
+    """
+    Appends captured requests to a corpus file.
+
+    The file is opened lazily and written through a buffer, so capturing
+    costs no syscall per request; close() flushes what is left.
+
+    The lock only orders writes within one process: buffered writes from
+    several processes are not line-aligned, so one corpus file must have
+    a single writer process (`dukpyra profile` refuses --capture with
+    --workers).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def write(self, record: Record) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = _open(self.path, "a")
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def make_record(scope: dict, body: bytes) -> Record:
+    """Corpus record of one http request."""
+    record = {"m": scope["method"], "p": scope["path"]}
+    query = scope.get("query_string", b"")
+    if query:
+        record["q"] = query.decode("latin-1")
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            record["ct"] = value.decode("latin-1")
+            break
+    if body:
+        try:
+            record["b"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            record["b64"] = base64.b64encode(body).decode("ascii")
+    return record
+
+
+class CaptureMiddleware:
+    """
+    ASGI middleware that copies every http request into a CorpusWriter.
+
+    The request body is collected as the app reads it, so nothing is
+    buffered ahead of the app and streaming bodies still stream.
+    """
+
+    def __init__(self, app: Callable, writer: CorpusWriter):
+        self.app = app
+        self.writer = writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        try:
+            await self.app(scope, capture_receive, send)
+        finally:
+            self.writer.write(make_record(scope, b"".join(chunks)))
+
+
+# ==============================================================================
+# Replay
+# ==============================================================================
+
+def load_corpus(path: Union[str, Path]) -> Iterator[Record]:
+    """Records of a corpus file in capture order (blank and torn lines are skipped)."""
+    with _open(Path(path), "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # last line of a capture that was killed mid-write
+
+
+def _request_body(record: Record) -> bytes:
+    if "b64" in record:
+        return base64.b64decode(record["b64"])
+    return record.get("b", "").encode("utf-8")
+
+
+async def send_request(app: Callable, record: Record) -> int:
+    """Send one corpus record through an ASGI app and return the response status."""
+    body = _request_body(record)
+    path = record["p"]
+    headers = [(b"host", b"replay"), (b"content-length", str(len(body)).encode())]
+    if "ct" in record:
+        headers.append((b"content-type", record["ct"].encode("latin-1")))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": record["m"],
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "root_path": "",
+        "query_string": record.get("q", "").encode("latin-1"),
+        "headers": headers,
+        "client": ("replay", 0),
+        "server": ("replay", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # The app only asks again after the body when it waits for a
+            # disconnect; the response is complete by then.
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        return 500
+    return status
+
+
+async def replay(app: Callable, records: Iterable[Record], concurrency: int = 16) -> Counter:
+    """
+    Send every record through app with at most `concurrency` requests in flight.
+
+    Returns a Counter of response status codes.
+    """
+    statuses = Counter()
+    in_flight = set()
+    for record in records:
+        if len(in_flight) >= concurrency:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            statuses.update(task.result() for task in done)
+        in_flight.add(asyncio.ensure_future(send_request(app, record)))
+    if in_flight:
+        done, _ = await asyncio.wait(in_flight)
+        statuses.update(task.result() for task in done)
+    return statuses
+
+
+def replay_corpus(app: Any, path: Union[str, Path], concurrency: int = 16) -> Counter:
+    """Replay a corpus file through app (blocking); see replay()."""
+    return asyncio.run(replay(app, load_corpus(path), concurrency))
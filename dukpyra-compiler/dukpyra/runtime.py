@@ -7,13 +7,17 @@
 
 วัตถุประสงค์:
 1. ให้โค้ด Dukpyra รันได้บน Python (ใช้ FastAPI)
-2. เก็บข้อมูล Type ของ Parameter ขณะรันไทม์ (Runtime Type Collection)
+2. เก็บข้อมูล Type ของ Parameter และ Return Value ขณะรันไทม์ (Runtime Type Collection)
 3. รองรับ decorator @raw_csharp สำหรับใส่โค้ด C# แท้
 
 การทำงาน:
 - ถ้ามี FastAPI installed → สร้าง FastAPI app จริง
 - ถ้าไม่มี → ทำงานเป็น shim (mock) เฉยๆ
-- เก็บ type ของทุก argument ลง .dukpyra/types.json
+- เก็บ type ของทุก argument ไว้ในหน่วยความจำ แล้วให้ background flusher
+  append count ที่เปลี่ยนลง observation log (.dukpyra/types.json.log) เป็นรอบๆ
+  และ compact log เข้า .dukpyra/types.json เป็นครั้งคราว
+- shard mode (หลาย worker / หลายเครื่อง): แต่ละ process เขียนไฟล์ของตัวเอง
+  ใน .dukpyra/shards/ แล้วรวมด้วย `dukpyra profile merge`
 ==============================================================================
 """
 
@@ -21,23 +25,166 @@
 # ส่วนที่ 1: IMPORTS และ DEPENDENCIES
 # ==============================================================================
 
-import json          # สำหรับบันทึก type ข้อมูลเป็น JSON
-import os            # สำหรับจัดการไฟล์และ directory
+import atexit        # สำหรับ flush type ที่ค้างอยู่ตอนโปรแกรมจบ
+import os            # สำหรับอ่าน environment variables
 import inspect       # สำหรับตรวจสอบ function signature
+import random        # สำหรับ sampling แบบสุ่ม
+import sys           # สำหรับรายงาน error ของ flusher ทาง stderr
+import threading     # สำหรับ background flusher
+import time          # สำหรับนับเวลาระหว่าง compaction
+import traceback     # สำหรับรายงาน error ของ flusher ทาง stderr
+from dataclasses import dataclass # สำหรับ SamplingPolicy
 from pathlib import Path          # สำหรับจัดการ path แบบ object-oriented
 from functools import wraps       # สำหรับสร้าง decorator ที่เก็บ metadata
+from itertools import islice      # สำหรับ sample dict items แบบไม่วนทั้ง dict
 from typing import Optional, Any, Callable  # Type hints
 
+from .profile_store import (
+    ValueStats, append_records, compact_profile, log_path, resolve_types, shard_path,
+)
+
 # ==============================================================================
 # ส่วนที่ 1.1: ตรวจสอบ FastAPI (Optional Dependency)
 # ==============================================================================
 # FastAPI เป็น optional dependency
 # - ถ้ามี: ใช้สำหรับรันโค้ด Dukpyra เป็น web server จริง
 # - ถ้าไม่มี: ทำงานเป็น shim เฉยๆ (สำหรับ compile เท่านั้น)
-try:
-    from fastapi import FastAPI
-except ImportError:
-    FastAPI = None  # ถ้า import ไม่ได้ ให้เป็น None
+# - lite mode ใช้ LiteApp (lite.py) แทน → ไม่ import FastAPI/Starlette/Pydantic เลย
+#   (import ตอนสร้าง app เท่านั้น ไม่ใช่ตอน import module นี้)
+def _load_fastapi():
+    """FastAPI class หรือ None ถ้าไม่ได้ติดตั้ง"""
+    try:
+        from fastapi import FastAPI
+    except ImportError:
+        return None  # ถ้า import ไม่ได้ ให้เป็น None
+    return FastAPI
+
+
+# Sentinel สำหรับ parameter ที่ไม่ได้ส่งค่ามาและไม่มี default
+# (ใช้แทน None เพราะ None เป็นค่าที่ส่งมาได้จริง)
+_MISSING = object()
+
+
+# ==============================================================================
+# ส่วนที่ 1.2: SAMPLING POLICY (Production-safe Profiling)
+# ==============================================================================
+@dataclass
+class SamplingPolicy:
+    """
+    กำหนดว่าจะเก็บ type จาก request ไหนบ้าง
+    
+    การเก็บ type ทุก request (100%) แพงเกินไปสำหรับ traffic จริง
+    policy นี้ลด overhead โดยยังได้ coverage ของ type ครบ
+    
+    Attributes:
+        enabled: False = zero-overhead mode (decorator register handler
+                 โดยไม่ wrap เลย ไม่มีการเก็บ type)
+        rate: สัดส่วนของ call ที่ถูก sample (0.0 - 1.0)
+        budget: หยุด profile endpoint หลังจาก sample ครบจำนวนนี้
+                ติดต่อกันโดยไม่เจอ type ใหม่ (None = ไม่จำกัด)
+        adaptive: ลด rate ลงครึ่งหนึ่งทุกครั้งที่ signature ของ endpoint
+                  คงที่ครบ stable_after sample (เจอ type ใหม่ → กลับไปใช้ rate เดิม)
+        stable_after: จำนวน sample ที่ไม่มี type ใหม่ก่อนลด rate
+        min_rate: rate ต่ำสุดของ adaptive mode
+    
+    ตัวอย่าง:
+        DukpyraRuntime(sampling=SamplingPolicy(rate=0.1, budget=1000))
+    """
+    enabled: bool = True
+    rate: float = 1.0
+    budget: Optional[int] = None
+    adaptive: bool = False
+    stable_after: int = 100
+    min_rate: float = 0.01
+    
+    @classmethod
+    def from_env(cls) -> "SamplingPolicy":
+        """
+        อ่าน policy จาก environment variables
+        
+        ใช้กับ global _runtime ที่ถูกสร้างโดย dukpyra.app() (ตั้งค่าผ่าน constructor ไม่ได้)
+        และ `dukpyra profile` ส่งค่าผ่าน env ไปยัง uvicorn worker
+        
+            DUKPYRA_PROFILE=off        → enabled=False
+            DUKPYRA_SAMPLE_RATE=0.1    → rate
+            DUKPYRA_SAMPLE_BUDGET=1000 → budget
+            DUKPYRA_SAMPLE_ADAPTIVE=1  → adaptive
+        """
+        env = os.environ
+        budget = env.get("DUKPYRA_SAMPLE_BUDGET")
+        return cls(
+            enabled=env.get("DUKPYRA_PROFILE", "on").lower() not in ("0", "off", "false", "no"),
+            rate=float(env.get("DUKPYRA_SAMPLE_RATE", "1.0")),
+            budget=int(budget) if budget else None,
+            adaptive=env.get("DUKPYRA_SAMPLE_ADAPTIVE", "0").lower() in ("1", "on", "true", "yes"),
+        )
+
+
+class _EndpointSampler:
+    """
+    State ของ sampling ต่อ endpoint (สร้างครั้งเดียวตอน decorate)
+    
+    หมายเหตุ:
+    - counter ไม่ได้ป้องกันด้วย lock: ถ้า thread ชนกันนับพลาดไปบ้าง
+      ผลคือ sample มาก/น้อยไปเล็กน้อยเท่านั้น ไม่กระทบความถูกต้องของ type
+    """
+    __slots__ = ("policy", "rate", "stable", "done")
+    
+    def __init__(self, policy: SamplingPolicy):
+        self.policy = policy
+        self.rate = policy.rate
+        self.stable = 0      # จำนวน sample ติดต่อกันที่ไม่เจอ type ใหม่
+        self.done = False    # budget หมดแล้ว → ไม่ sample อีก
+    
+    def should_sample(self) -> bool:
+        if self.done:
+            return False
+        return self.rate >= 1.0 or random.random() < self.rate
+    
+    def record(self, saw_new_type: bool):
+        policy = self.policy
+        if saw_new_type:
+            self.stable = 0
+            self.rate = policy.rate
+            return
+        self.stable += 1
+        if policy.budget is not None and self.stable >= policy.budget:
+            self.done = True
+        elif policy.adaptive and self.stable % policy.stable_after == 0:
+            self.rate = max(policy.min_rate, self.rate / 2)
+
+
+class _Accumulator:
+    """
+    Observation ของ thread หนึ่งตั้งแต่ flusher merge ครั้งล่าสุด
+    
+    request ที่รันบน thread เดียวกัน (sync handler ใน threadpool เดียวกัน
+    หรือ async task ทุกตัวบน event loop) เขียนลง accumulator เดียวกัน
+    lock ของมันจึงแทบไม่เคยถูกแย่ง - แค่กันกับ flusher ตอน swap()
+    
+    Attributes:
+        counts: (function_name, param_name) → {type_name: count} ของรอบนี้
+        stats: (function_name, param_name) → ValueStats ของรอบนี้
+        fast: (function_name, param_name) → (Python class, counts dict, type name)
+              ของค่าล่าสุด (steady-state fast path, เฉพาะ type ที่ไม่ใช่ list/dict)
+        owner: thread เจ้าของ (thread ตายแล้ว → flusher เลิกติดตามหลัง swap ครั้งสุดท้าย)
+    """
+    __slots__ = ("lock", "counts", "stats", "fast", "owner")
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.stats = {}
+        self.fast = {}
+        self.owner = threading.current_thread()
+    
+    def swap(self):
+        """คืน (counts, stats) ของรอบนี้ แล้วเริ่มรอบใหม่ด้วย dict ว่าง"""
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            stats, self.stats = self.stats, {}
+            self.fast = {}  # ชี้ไปที่ counts dict เก่า
+        return counts, stats
 
 
 # ==============================================================================
@@ -67,34 +214,152 @@ class DukpyraRuntime:
     # ==========================================================================
     # ส่วนที่ 2.2: Constructor (__init__)
     # ==========================================================================
-    def __init__(self):
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        flush_every: int = 100,
+        sampling: Optional[SamplingPolicy] = None,
+        shard: Optional[bool] = None,
+        capture: Optional[str] = None,
+        lite: Optional[bool] = None,
+    ):
         """
         สร้าง DukpyraRuntime instance ใหม่
         
+        พารามิเตอร์:
+            flush_interval: จำนวนวินาทีระหว่างการ flush แต่ละรอบของ background flusher
+            flush_every: flush ทันทีเมื่อมี observation ใหม่ครบจำนวนนี้
+            sampling: SamplingPolicy (None = อ่านจาก environment variables)
+            shard: True = เขียนลง shard ของ process นี้แทน types.json
+                   (None = อ่านจาก DUKPYRA_PROFILE_SHARD)
+            capture: path ของ corpus ที่จะบันทึก request ทุกตัวไว้ replay ภายหลัง
+                     (None = อ่านจาก DUKPYRA_CAPTURE, ไม่มี = ไม่บันทึก)
+            lite: True = ใช้ LiteApp แทน FastAPI (None = อ่านจาก DUKPYRA_LITE)
+        
         การทำงาน:
-        1. สร้าง FastAPI() instance ถ้ามี FastAPI installed
+        1. สร้าง FastAPI() instance ถ้ามี FastAPI installed (หรือ LiteApp ใน lite mode)
         2. เตรียม dictionary สำหรับเก็บ type ข้อมูล
         3. กำหนด path ของไฟล์ที่จะบันทึก type
+        4. เตรียม state ของ background flusher (thread จะเริ่มเมื่อมี observation แรก)
         """
-        # สร้าง FastAPI app (ถ้ามี) หรือ None (ถ้าไม่มี)
-        self.app = FastAPI() if FastAPI else None
+        # Type ทั้งหมดที่เคยสังเกตได้ของแต่ละ argument พร้อมจำนวนครั้ง
+        # รูปแบบ: {"function_name": {"param_name": {"int": 42, "str": 1}}}
+        # (resolved type = type ที่เจอบ่อยที่สุด → ดู collected_types)
+        # request ไม่ได้เขียน dict นี้ตรงๆ แต่เขียนลง _Accumulator ของ thread ตัวเอง
+        # แล้ว flusher merge เข้ามา → อ่านผ่าน property type_observations
+        self._observations = {}
+        
+        # สถิติของค่าจริง (min/max, ความยาว string, ขนาด collection, จำนวนค่าที่ต่างกัน)
+        # (function_name, param_name) → ValueStats (ขนาดคงที่ต่อ argument)
+        # CodeGen ใช้เลือก type ที่แคบ/กว้างพอ เช่น int vs long
+        self._stats = {}
+        
+        # Per-thread accumulators (ดู _Accumulator)
+        self._local = threading.local()
+        self._accumulators = []
         
-        # Dictionary สำหรับเก็บ type ข้อมูล
-        # รูปแบบ: {
-        #   "function_name": {
-        #     "param_name": "type_name",
-        #     ...
-        #   },
-        #   ...
-        # }
-        self.collected_types = {}
+        # Type ที่เคยเห็นแล้วของแต่ละ argument (ข้ามทุก thread)
+        # (function_name, param_name) → set ของ type name
+        # ใช้ตัดสินว่า observation เป็น type ใหม่หรือไม่โดยไม่ต้องรอ merge
+        self._known_types = {}
+        
+        # Memo ของ collection type: (class, shallow shape) → type name
+        # (ใช้ร่วมกันทุก thread: get/set ของ dict เป็น atomic และค่าที่ชนกัน
+        #  ก็เป็น type name เดียวกันอยู่แล้ว)
+        self._shape_memo = {}
         
         # Path ของไฟล์ที่จะบันทึก type ข้อมูล
         self.types_file = Path(".dukpyra/types.json")
+        
+        # Shard mode: แต่ละ worker เขียน .dukpyra/shards/types-<host>-<pid>.json
+        # (หลาย process เขียน types.json ไฟล์เดียวกันจะทับข้อมูลกันเอง)
+        if shard is None:
+            shard = os.environ.get("DUKPYRA_PROFILE_SHARD", "0").lower() in ("1", "on", "true", "yes")
+        self.shard = shard
+        
+        # Policy สำหรับเลือกว่าจะเก็บ type จาก call ไหน
+        self.sampling = sampling if sampling is not None else SamplingPolicy.from_env()
+        
+        # Traffic capture: บันทึก request ลง corpus ให้ `dukpyra profile --replay`
+        # ใช้ profile ซ้ำได้โดยไม่ต้องมี traffic จริง (ดู replay.py)
+        capture = capture or os.environ.get("DUKPYRA_CAPTURE")
+        self._capture = None
+        if capture:
+            from .replay import CorpusWriter
+            self._capture = CorpusWriter(capture)
+            atexit.register(self._capture.close)  # corpus ถูกเขียนผ่าน buffer
+        
+        # สร้าง ASGI app ที่ handler จะถูก register (FastAPI / LiteApp / None)
+        if lite is None:
+            lite = os.environ.get("DUKPYRA_LITE", "0").lower() in ("1", "on", "true", "yes")
+        self._create_app(lite)
+        
+        # ============== ส่วนที่ 2.2.1: Batched Writer State ==============
+        # _pending = จำนวน type ใหม่ที่ยังไม่ได้เขียนลงไฟล์ (ครบ flush_every → ปลุก flusher)
+        # _dirty = (function_name, param_name) ที่ count เปลี่ยนตั้งแต่ flush ล่าสุด
+        #          (หลัง merge accumulators)
+        # _flushed = count ที่เขียนลง log แล้ว (ใช้คำนวณ delta)
+        # ถ้าไม่มีอะไรเปลี่ยนตอน flush → ข้ามการเขียนไฟล์ไปเลย
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self._pending = 0
+        self._dirty = set()
+        self._flushed = {}
+        self._log_bytes = 0                      # ขนาด log ที่ append ตั้งแต่ compact ล่าสุด
+        self._last_compact = time.monotonic()
+        self._lock = threading.Lock()        # ป้องกัน state ที่ใช้ร่วมกัน (ไม่ใช่ accumulator)
+        self._write_lock = threading.Lock()  # ให้มีการเขียนไฟล์ได้ทีละครั้ง
+        self._wake = threading.Event()       # ปลุก flusher ก่อนครบ interval
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+    
+    def _create_app(self, lite: bool):
+        """
+        สร้าง self.app
+        
+        - lite=True  → LiteApp (routing + แปลง parameter + JSON response เท่านั้น)
+        - lite=False → FastAPI ถ้าติดตั้งไว้ ไม่งั้น None (shim สำหรับ compile อย่างเดียว)
+        
+        on_shutdown: flush type ที่ค้างอยู่เมื่อ server shutdown
+        (constructor argument ใช้ได้ทั้ง FastAPI รุ่นเก่าและใหม่)
+        
+        หมายเหตุ: handler ที่ register ไว้กับ app เดิมจะไม่ถูกย้ายมา
+        → เรียกก่อน decorate handler เท่านั้น
+        """
+        if lite:
+            from .lite import LiteApp
+            app = LiteApp(on_shutdown=[self.close])
+        else:
+            fastapi = _load_fastapi()
+            app = fastapi(on_shutdown=[self.close]) if fastapi else None
+        if app is not None and self._capture is not None:
+            from .replay import CaptureMiddleware
+            app.add_middleware(CaptureMiddleware, writer=self._capture)
+        self.app = app
+        self.lite = lite
+    
+    @property
+    def type_observations(self) -> dict:
+        """
+        Count ของทุก type ที่สังเกตได้ (merge accumulators ของทุก thread ก่อน)
+        
+        รูปแบบ: {"function_name": {"param_name": {"type_name": count}}}
+        """
+        with self._lock:
+            self._merge_accumulators()
+            return self._observations
+    
+    @property
+    def collected_types(self) -> dict:
+        """
+        Resolved type ของแต่ละ argument (type ที่เจอบ่อยที่สุด)
+        
+        รูปแบบ: {"function_name": {"param_name": "type_name"}}
+        """
+        with self._lock:
+            self._merge_accumulators()
+            return resolve_types(self._observations)
 
-    # ==========================================================================
-    # ส่วนที่ 2.3: เก็บข้อมูล Type (_collect_type)
-    # ==========================================================================
     # ==========================================================================
     # ส่วนที่ 2.3: เก็บข้อมูล Type (Runtime Type Collection)
     # ==========================================================================
@@ -105,7 +370,16 @@ class DukpyraRuntime:
     # เป็น static C# ได้อย่างแม่นยำ
     # ==========================================================================
     
-    def _infer_type(self, value: Any) -> str:
+    # เก็บ ValueStats ด้วยหรือไม่ (False = เก็บแค่ type)
+    collect_stats = True
+    
+    # จำนวน element สูงสุดที่ sample ต่อ collection และความลึกสูงสุดของ nested type
+    # → cost ของการ infer หนึ่งค่ามีขอบเขตคงที่ (ไม่ขึ้นกับขนาดของ payload)
+    #   nodes สูงสุด ≈ 1 + k + k² + ... + k^max_depth
+    infer_sample_size = 5
+    infer_max_depth = 3
+    
+    def _infer_type(self, value: Any, depth: int = 0) -> str:
         """
         ส่วนที่ 2.3.1: Infer Type จากค่าจริง (Core Type Inference)
         
@@ -114,6 +388,7 @@ class DukpyraRuntime:
         
         พารามิเตอร์:
             value: ค่าที่ต้องการ infer type
+            depth: ความลึกปัจจุบันของ nested collection (ใช้ภายใน)
         
         Returns:
             Type name string (เช่น "int", "List[str]", "Dict[str, int]", "User")
@@ -122,6 +397,7 @@ class DukpyraRuntime:
             1. bool (ก่อน int เพราะ bool เป็น subclass ของ int)
             2. Primitive types (int, float, str)
             3. Collections (list, dict) → Infer element types
+               (ลึกเกิน infer_max_depth → element type เป็น dynamic)
             4. Custom classes → ใช้ class name
             5. None → "None"
             6. Unknown → "dynamic"
@@ -144,10 +420,10 @@ class DukpyraRuntime:
         
         # Collection types - Nested inference (งานวิจัย [6])
         if isinstance(value, list):
-            return self._infer_list_type(value)
+            return self._infer_list_type(value, depth)
         
         if isinstance(value, dict):
-            return self._infer_dict_type(value)
+            return self._infer_dict_type(value, depth)
         
         # Custom class detection
         if hasattr(value, '__class__'):
@@ -159,57 +435,138 @@ class DukpyraRuntime:
         # Fallback to dynamic (unknown type)
         return "dynamic"
     
-    def _infer_list_type(self, lst: list) -> str:
+    def _infer_list_type(self, lst: list, depth: int = 0) -> str:
         """
         ส่วนที่ 2.3.2: Infer List Element Type
         
         ตามงานวิจัย [6]: Sample elements เพื่อ infer type ของ collection
         
-        Strategy:
-            - ถ้า list ว่าง → "List[dynamic]"
-            - ถ้ามี elements → sample ตัวแรกเพื่อ infer element type
-            - Future: อาจ sample หลายตัวเพื่อ detect type conflicts
+        Strategy (Stratified Sampling):
+            - ถ้า list ว่าง หรือลึกเกิน infer_max_depth → "List[dynamic]"
+            - sample ไม่เกิน infer_sample_size ตัว กระจายทั่วทั้ง list
+              (ตัวแรก ตัวสุดท้าย และระยะห่างเท่าๆ กันตรงกลาง)
+            - รวม element types ด้วย _merge_types() → union / nullable
         
         Returns:
-            "List[element_type]" เช่น "List[int]", "List[User]"
+            "List[element_type]" เช่น "List[int]", "List[Optional[User]]"
         """
-        if len(lst) == 0:
-            return "List[dynamic]"  # Empty list - ไม่รู้ element type
+        n = len(lst)
+        if n == 0 or depth >= self.infer_max_depth:
+            return "List[dynamic]"  # ไม่รู้ element type
         
-        # Sample first element to infer type
-        first_elem = lst[0]
-        elem_type = self._infer_type(first_elem)
+        k = self.infer_sample_size
+        if n <= k:
+            sample = lst
+        else:
+            # index 0 ... n-1 แบ่งเป็น k-1 ช่วงเท่าๆ กัน
+            sample = [lst[(n - 1) * i // (k - 1)] for i in range(k)]
         
-        return f"List[{elem_type}]"
+        # Shape memo: element classes ที่ sample มา (ถ้าไม่มี nested collection
+        # shape นี้กำหนด type name ได้ทั้งหมด)
+        shape = (list, tuple(map(type, sample)))
+        cached = self._shape_memo.get(shape)
+        if cached is not None:
+            return cached
+        
+        elem_type = self._merge_types(
+            [self._infer_type(elem, depth + 1) for elem in sample]
+        )
+        type_name = f"List[{elem_type}]"
+        self._memoize_shape(shape, type_name)
+        return type_name
     
-    def _infer_dict_type(self, dct: dict) -> str:
+    def _infer_dict_type(self, dct: dict, depth: int = 0) -> str:
         """
         ส่วนที่ 2.3.3: Infer Dictionary Key/Value Types
         
         ตามงานวิจัย [6]: Infer types ของ key และ value
         
         Strategy:
-            - ถ้า dict ว่าง → "Dict[dynamic, dynamic]"
-            - ถ้ามี items → sample คู่แรกเพื่อ infer types
+            - ถ้า dict ว่าง หรือลึกเกิน infer_max_depth → "Dict[dynamic, dynamic]"
+            - sample ไม่เกิน infer_sample_size คู่แรก (dict ไม่มี random access
+              การกระจาย sample ทั่วทั้ง dict ต้องวนทุก item = O(n))
+            - รวม key types และ value types แยกกันด้วย _merge_types()
         
         Returns:
             "Dict[key_type, value_type]" เช่น "Dict[str, int]"
         """
-        if len(dct) == 0:
+        if len(dct) == 0 or depth >= self.infer_max_depth:
             return "Dict[dynamic, dynamic]"
         
-        # Sample first key-value pair
-        first_key = next(iter(dct.keys()))
-        first_val = dct[first_key]
+        items = list(islice(dct.items(), self.infer_sample_size))
+        shape = (dict, tuple((type(key), type(val)) for key, val in items))
+        cached = self._shape_memo.get(shape)
+        if cached is not None:
+            return cached
+        
+        key_types = []
+        val_types = []
+        for key, val in items:
+            key_types.append(self._infer_type(key, depth + 1))
+            val_types.append(self._infer_type(val, depth + 1))
         
-        key_type = self._infer_type(first_key)
-        val_type = self._infer_type(first_val)
+        key_type = self._merge_types(key_types)
+        val_type = self._merge_types(val_types)
         
-        return f"Dict[{key_type}, {val_type}]"
+        type_name = f"Dict[{key_type}, {val_type}]"
+        self._memoize_shape(shape, type_name)
+        return type_name
+    
+    # ขนาดสูงสุดของ shape memo (ล้างทั้งหมดเมื่อเต็ม - กัน memory โตไม่จำกัด)
+    shape_memo_size = 4096
     
-    def _collect_type(self, func_name: str, arg_name: str, value: Any):
+    def _memoize_shape(self, shape: tuple, type_name: str):
+        """
+        จำ type name ของ shape ไว้ ถ้า shape กำหนดผลลัพธ์ได้ครบ
+        
+        shape ที่มี nested list/dict ไม่ถูกจำ เพราะ class ของ element
+        ไม่ได้บอก type ข้างใน (เช่น [[1]] กับ [["a"]] มี shape เดียวกัน)
+        """
+        for cls in shape[1]:
+            classes = cls if isinstance(cls, tuple) else (cls,)
+            if list in classes or dict in classes:
+                return
+        if len(self._shape_memo) >= self.shape_memo_size:
+            self._shape_memo.clear()
+        self._shape_memo[shape] = type_name
+    
+    @staticmethod
+    def _merge_types(type_names: list) -> str:
+        """
+        ส่วนที่ 2.3.4: รวม type ของ elements ที่ sample มา
+        
+        กฎ:
+            ["int", "int"]          → "int"
+            ["int", "None"]         → "Optional[int]"
+            ["int", "str"]          → "Union[int, str]"
+            ["int", "str", "None"]  → "Optional[Union[int, str]]"
         """
-        ส่วนที่ 2.3.4: บันทึก Type Observation
+        unique = list(dict.fromkeys(type_names))  # ตัดตัวซ้ำ รักษาลำดับ
+        if len(unique) == 1:
+            return unique[0]
+        
+        # "Optional[int]" + "int" → nullable + "int"
+        nullable = False
+        members = []
+        for name in unique:
+            if name == "None":
+                nullable = True
+                continue
+            if name.startswith("Optional["):
+                nullable = True
+                name = name[len("Optional["):-1]
+            if name not in members:
+                members.append(name)
+        if not members:
+            return "None"
+        unique = members
+        
+        merged = unique[0] if len(unique) == 1 else f"Union[{', '.join(unique)}]"
+        return f"Optional[{merged}]" if nullable else merged
+    
+    def _collect_type(self, func_name: str, arg_name: str, value: Any) -> bool:
+        """
+        ส่วนที่ 2.3.5: บันทึก Type Observation
         
         บันทึก type ที่สังเกตได้จริงขณะรันไทม์ (Runtime Type Collection)
         ตามวิธีการของงานวิจัย [6] Krivanek & Uttner
@@ -221,175 +578,441 @@ class DukpyraRuntime:
         
         การทำงาน:
         1. Infer type จากค่าจริงด้วย _infer_type() (รองรับ nested types)
-        2. Track type observations (สำหรับ detect conflicts)
-        3. บันทึกลง self.collected_types
-        4. เขียนลงไฟล์ .dukpyra/types.json
+        2. นับจำนวนครั้งที่เจอ type นี้ และอัปเดต ValueStats ของ argument
+           ใน accumulator ของ thread ปัจจุบัน (flusher merge เข้า
+           type_observations ภายหลัง)
+        3. แจ้ง background flusher (ไฟล์ .dukpyra/types.json ถูกเขียนภายหลัง)
+        
+        count และ stats ถูกบันทึกใน lock เดียวกันเสมอ: flusher swap()
+        ระหว่างนั้นไม่ได้ จึงไม่มี key ที่มี stats แต่ไม่มี count
         
         Type Conflict Handling:
         - ถ้า function ถูกเรียกหลายครั้งด้วย types ต่างกัน
-        - จะเก็บทุก type ที่สังเกตได้ไว้
-        - CodeGen จะ resolve conflict ภายหลัง (ใช้ dynamic หรือ union type)
+        - จะเก็บทุก type ที่สังเกตได้ไว้พร้อมจำนวนครั้ง
+        - resolved type = type ที่เจอบ่อยที่สุด (voting)
+          รวมข้าม worker ได้ด้วยการบวก count (ดู profile_store.merge_profiles)
+        
+        Returns:
+            True ถ้าเป็น type ที่ไม่เคยเห็นมาก่อนสำหรับ argument นี้
+            (ใช้โดย sampler เพื่อตัดสินว่า signature คงที่แล้วหรือยัง)
         
         ตัวอย่าง:
             _collect_type("get_user", "id", 42)
-            → types.json: {"get_user": {"id": "int"}}
+            → types.json (หลัง flush): {"types": {"get_user": {"id": "int"}}, ...}
             
             _collect_type("filter_users", "users", [User(), User()])
-            → types.json: {"filter_users": {"users": "List[User]"}}
+            → types.json (หลัง flush): {"types": {"filter_users": {"users": "List[User]"}}, ...}
         """
-        # ============== ส่วนที่ 2.3.4.1: Infer Type ==============
+        # ============== ส่วนที่ 2.3.5.0: Steady-state Fast Path ==============
+        # ค่าเป็น class เดียวกับค่าล่าสุดของ thread นี้ → ไม่มี type ใหม่แน่นอน
+        # แค่บวก count (ไม่ต้อง infer, ไม่ต้องสร้าง string)
+        # lock ของ accumulator มีแค่ thread นี้กับ flusher ใช้ → แทบไม่เคยรอ
+        acc = self._accumulator()
+        key = (func_name, arg_name)
+        cls = type(value)
+        with acc.lock:
+            fast = acc.fast.get(key)
+            if fast is not None and fast[0] is cls:
+                fast[1][fast[2]] += 1
+                if self.collect_stats:
+                    self._add_stats(acc, key, value, cls)
+                return False
+        
+        # ============== ส่วนที่ 2.3.5.1: Infer Type ==============
         # ใช้ enhanced type inference (รองรับ nested types และ custom classes)
+        # (อยู่นอก lock - ไม่แตะ state ของ accumulator)
         type_name = self._infer_type(value)
         
-        # ============== ส่วนที่ 2.3.4.2: Track Observations ==============
-        # Initialize type observations tracking (สำหรับ detect conflicts)
-        if not hasattr(self, 'type_observations'):
-            self.type_observations = {}
+        # ============== ส่วนที่ 2.3.5.2: Track Observations ==============
+        with acc.lock:
+            counts = acc.counts.get(key)
+            if counts is None:
+                counts = acc.counts[key] = {}
+            counts[type_name] = counts.get(type_name, 0) + 1
+            if self.collect_stats:
+                self._add_stats(acc, key, value, cls)
+            
+            # อัปเดต fast path ให้ตรงกับค่าล่าสุด
+            if cls is list or cls is dict:
+                acc.fast.pop(key, None)
+            else:
+                acc.fast[key] = (cls, counts, type_name)
         
-        if func_name not in self.type_observations:
-            self.type_observations[func_name] = {}
+        # ============== ส่วนที่ 2.3.5.3: Type ใหม่? ==============
+        # type ที่เคยเห็นแล้ว (จาก thread ไหนก็ได้) → ไม่ต้องรีบเขียนไฟล์
+        # อ่าน set โดยไม่ถือ lock ได้ จับ global lock เฉพาะตอนเจอ type ใหม่จริงๆ
+        known = self._known_types.get(key)
+        if known is not None and type_name in known:
+            return False
+        with self._lock:
+            known = self._known_types.setdefault(key, set())
+            if type_name in known:
+                return False
+            known.add(type_name)
+            self._pending += 1
+            pending = self._pending
         
-        if arg_name not in self.type_observations[func_name]:
-            self.type_observations[func_name][arg_name] = []
+        # ============== ส่วนที่ 2.3.5.4: ส่งต่อให้ Background Flusher ==============
+        # ไม่เขียนไฟล์ใน request path แล้ว - flusher จะ merge accumulators และเขียน
+        # ตาม interval หรือทันทีเมื่อมี observation ใหม่ครบ flush_every
+        self._ensure_flusher()
+        if pending >= self.flush_every:
+            self._wake.set()
+        return True
+    
+    @staticmethod
+    def _add_stats(acc: _Accumulator, key: tuple, value: Any, cls: type) -> None:
+        """อัปเดต ValueStats ของ argument ใน accumulator (ต้องถือ acc.lock)"""
+        stats = acc.stats.get(key)
+        if stats is None:
+            stats = acc.stats[key] = ValueStats()
+        stats.add(value, cls)
+    
+    def _accumulator(self) -> _Accumulator:
+        """Accumulator ของ thread ปัจจุบัน (สร้างและลงทะเบียนครั้งแรกที่ใช้)"""
+        try:
+            return self._local.acc
+        except AttributeError:
+            acc = self._local.acc = _Accumulator()
+            with self._lock:
+                self._accumulators.append(acc)
+            return acc
+    
+    def _merge_accumulators(self):
+        """
+        รวม observation ของทุก thread เข้า _observations / _stats
+        (ต้องเรียกขณะถือ self._lock)
         
-        # เก็บ type ถ้ายังไม่เคยเห็น
-        if type_name not in self.type_observations[func_name][arg_name]:
-            self.type_observations[func_name][arg_name].append(type_name)
+        count ของแต่ละ thread เป็น delta ตั้งแต่ merge ครั้งก่อน → บวกเข้าไปตรงๆ
+        """
+        alive = []
+        for acc in self._accumulators:
+            counts, stats = acc.swap()
+            for key, delta in counts.items():
+                func_name, arg_name = key
+                observed = self._observations.setdefault(func_name, {}).setdefault(arg_name, {})
+                for type_name, count in delta.items():
+                    observed[type_name] = observed.get(type_name, 0) + count
+                self._dirty.add(key)
+            for key, window in stats.items():
+                merged = self._stats.get(key)
+                if merged is None:
+                    self._stats[key] = window
+                else:
+                    merged.merge(window)
+                self._dirty.add(key)
+            if acc.owner.is_alive():
+                alive.append(acc)
+        self._accumulators = alive
+
+    # ==========================================================================
+    # ส่วนที่ 2.4: Background Flusher (flush / close)
+    # ==========================================================================
+    # Compaction (เขียน types.json ใหม่ทั้งไฟล์) เกิดเมื่อ log ใหญ่เกิน
+    # compact_bytes หรือห่างจากครั้งก่อนเกิน compact_interval วินาที
+    # ระหว่างนั้น flush แค่ append record ที่เปลี่ยน (O(record) ไม่ใช่ O(profile))
+    compact_bytes = 1 << 20
+    compact_interval = 30.0
+    
+    def _ensure_flusher(self):
+        """
+        เริ่ม background flusher thread ครั้งแรกที่มี observation
+        
+        หมายเหตุ:
+        - ไม่เริ่ม thread ตอน __init__ เพราะ _runtime ถูกสร้างตอน import โค้ดผู้ใช้
+          (ก่อน uvicorn fork worker - thread ไม่ข้าม fork)
+        - ลงทะเบียน close() กับ atexit เพื่อ flush ส่วนที่เหลือตอนโปรแกรมจบ
+        """
+        if self._flusher is not None or self._closed:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                name="dukpyra-type-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+        atexit.register(self.close)
+    
+    def _flush_loop(self):
+        """Loop ของ flusher: ตื่นทุก flush_interval วินาที หรือเมื่อถูกปลุก"""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                pass  # เขียนไม่สำเร็จ - flush() คืน _pending ไว้แล้ว รอบหน้าลองใหม่
+            except Exception:
+                # bug อื่นๆ: รายงานแล้วทำงานต่อ (thread ตาย = ไม่มี flush อีกเลย)
+                sys.stderr.write("dukpyra: background type flush failed\n"
+                                 + traceback.format_exc())
+    
+    def flush(self, compact: bool = False) -> bool:
+        """
+        Append count ที่เปลี่ยนตั้งแต่ flush ล่าสุดลง observation log
+        แล้ว compact log เข้า types.json ถ้าถึงเวลา
+        
+        พารามิเตอร์:
+            compact: บังคับ compact ทันที (ใช้ตอน close)
         
-        # ============== ส่วนที่ 2.3.4.3: บันทึก Resolved Type ==============
-        # สร้าง nested dictionary ถ้ายังไม่มี
-        if func_name not in self.collected_types:
-            self.collected_types[func_name] = {}
+        Returns:
+            True ถ้ามีการ append record, False ถ้าไม่มีอะไรใหม่ (ข้ามการเขียน)
+        """
+        with self._write_lock:
+            target = self._target_file()
+            with self._lock:
+                self._merge_accumulators()
+                records, stats_records, previous, pending = self._drain(everything=compact)
+            if records or stats_records:
+                try:
+                    self._log_bytes += append_records(target, records, stats_records)
+                except OSError:
+                    with self._lock:
+                        self._flushed.update(previous)
+                        self._dirty.update(previous)
+                        self._pending += pending
+                        for func_name, arg_name, delta in stats_records:
+                            self._stats[(func_name, arg_name)].restore(delta)
+                    raise
+            
+            # compact เฉพาะเมื่อมี record ใน log รออยู่
+            if log_path(target).exists() and (compact or self._compaction_due(target)):
+                compact_profile(target)
+                self._log_bytes = 0
+                self._last_compact = time.monotonic()
+        return bool(records or stats_records)
+    
+    def _drain(self, everything: bool = False):
+        """
+        สร้าง log record จาก count และ stats ที่เปลี่ยน
+        (ต้องเรียกขณะถือ self._lock หลัง _merge_accumulators)
+        
+        Returns:
+            (records, stats records,
+             count ที่เขียนไปแล้วก่อนหน้า (สำหรับคืนค่าถ้าเขียนไม่สำเร็จ),
+             จำนวน type ใหม่ที่ pending อยู่)
+        """
+        dirty, self._dirty = self._dirty, set()
+        if everything:
+            keys = [(func, arg) for func, args in self._observations.items() for arg in args]
+        else:
+            keys = tuple(dirty)
         
-        # บันทึก type (ใช้วิธี "last observed" - อาจปรับเป็น conflict resolution)
-        # TODO: ในอนาคตอาจใช้ voting หรือ most common type
-        self.collected_types[func_name][arg_name] = type_name
+        records = []
+        stats_records = []
+        previous = {}
+        for key in keys:
+            func_name, arg_name = key
+            stats = self._stats.get(key)
+            if stats is not None and key in dirty:
+                stats_records.append((func_name, arg_name, stats.drain()))
+            counts = dict(self._observations[func_name][arg_name])
+            flushed = self._flushed.get(key, {})
+            for type_name, count in counts.items():
+                delta = count - flushed.get(type_name, 0)
+                if delta:
+                    records.append((func_name, arg_name, type_name, delta))
+            previous[key] = flushed
+            self._flushed[key] = counts
         
-        # ============== ส่วนที่ 2.3.4.4: บันทึกลงไฟล์ ==============
-        # บันทึกลงไฟล์ทันที (สำหรับ real-time profiling)
-        # งานวิจัย [6]: Runtime data ต้อง persist สำหรับ transpilation
-        self._save_types()
+        pending, self._pending = self._pending, 0
+        return records, stats_records, previous, pending
+    
+    def _compaction_due(self, target: Path) -> bool:
+        """ถึงเวลา compact หรือยัง (ครั้งแรกเสมอ - ให้ types.json มีข้อมูลเร็วที่สุด)"""
+        if not target.exists():
+            return True
+        if not self._log_bytes:
+            return False
+        return (self._log_bytes >= self.compact_bytes
+                or time.monotonic() - self._last_compact >= self.compact_interval)
+    
+    def close(self):
+        """
+        หยุด background flusher, flush ส่วนที่เหลือ และ compact log
+        
+        ถูกเรียกอัตโนมัติตอน FastAPI shutdown และตอน interpreter exit (atexit)
+        """
+        self._closed = True
+        self._wake.set()
+        if self._capture is not None:
+            self._capture.close()
+        self.flush(compact=True)
 
     # ==========================================================================
-    # ส่วนที่ 2.4: บันทึกลงไฟล์ (_save_types)
+    # ส่วนที่ 2.5: ไฟล์ปลายทาง
     # ==========================================================================
-    def _save_types(self):
+    # รูปแบบไฟล์ (.dukpyra/types.json หลัง compaction):
+    # {
+    #   "types": {"get_user": {"id": "int"}},               ← ใช้โดย CodeGen
+    #   "observations": {"get_user": {"id": {"int": 42}}},  ← count ของแต่ละ type
+    #   "metadata": {"version": "0.3.0", "log_generation": 3, ...}
+    # }
+    # record ที่ยังไม่ถูก compact อยู่ใน types.json.log (หนึ่ง JSON ต่อบรรทัด)
+    # ดูรายละเอียดใน profile_store.py
+    def _target_file(self) -> Path:
+        """ไฟล์ที่ flush จะเขียน: types.json หรือ shard ของ process นี้"""
+        if self.shard:
+            # ใช้ pid ตอนเขียน (ไม่ใช่ตอน __init__) - worker ที่ fork หลัง
+            # import จะได้ shard ของตัวเอง
+            return shard_path(self.types_file.parent / "shards")
+        return self.types_file
+
+    # ==========================================================================
+    # ส่วนที่ 2.6: Wrap Handler Function (_wrap_handler)
+    # ==========================================================================
+    @staticmethod
+    def _build_binder(func) -> Callable:
         """
-        ส่วนที่ 2.4.1: บันทึก Runtime Type Data
+        สร้าง argument binder ครั้งเดียวตอน decorate
         
-        บันทึก type data ลงไฟล์ .dukpyra/types.json
-        ตามงานวิจัย [6]: Runtime data ต้อง persist สำหรับการ transpile
+        แทนการเรียก inspect.signature() / sig.bind() / apply_defaults() ทุก request
+        binder จะแปลง (args, kwargs) → [(param_name, value), ...] ด้วย
+        tuple ที่เตรียมไว้ล่วงหน้าเท่านั้น
         
-        การทำงาน:
-        1. สร้าง directory .dukpyra/ ถ้ายังไม่มี
-        2. เขียน collected types และ observations เป็น JSON
-        3. Format แบบ pretty-print เพื่อ human-readable
-        
-        รูปแบบไฟล์ (Enhanced):
-        {
-          "types": {
-            "get_user": {
-              "id": "int"
-            },
-            "filter_users": {
-              "users": "List[User]"
-            }
-          },
-          "observations": {
-            "get_user": {
-              "id": ["int"]
-            },
-            "filter_users": {
-              "users": ["List[User]"]
-            }
-          },
-          "metadata": {
-            "version": "0.3.0",
-            "method": "runtime_profiling"
-          }
-        }
+        พารามิเตอร์:
+            func: endpoint function
+        
+        Return:
+            bind(args, kwargs) → list ของ (ชื่อ parameter, ค่า)
+            parameter ที่ไม่ได้ส่งมาและไม่มี default จะมีค่าเป็น _MISSING
         
         หมายเหตุ:
-        - types: Final resolved types (ใช้โดย CodeGen)
-        - observations: Raw type observations (สำหรับ debug/analysis)
-        - metadata: Version และ method information
-        """
-        # สร้าง directory .dukpyra/ ถ้ายังไม่มี
-        self.types_file.parent.mkdir(exist_ok=True, parents=True)
-        
-        # Prepare data structure (Enhanced format)
-        data = {
-            "types": self.collected_types,
-            "observations": getattr(self, 'type_observations', {}),
-            "metadata": {
-                "version": "0.3.0",
-                "method": "runtime_profiling",
-                "research_ref": "[6] Krivanek & Uttner - Runtime type collecting"
-            }
-        }
-        
-        # เขียน JSON file แบบ pretty-print (indent=2)
-        with open(self.types_file, "w") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-    # ==========================================================================
-    # ส่วนที่ 2.5: Wrap Handler Function (_wrap_handler)
-    # ==========================================================================
+        - FastAPI เรียก endpoint ด้วย keyword arguments เสมอ → ทางหลักคือ kwargs.get()
+        - function ที่มี *args / **kwargs ใช้ sig.bind() แบบเดิม (กรณีที่พบน้อย)
+        """
+        sig = inspect.signature(func)
+        params = tuple(sig.parameters.values())
+        
+        if any(p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD) for p in params):
+            def bind_variadic(args, kwargs):
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return list(bound.arguments.items())
+            return bind_variadic
+        
+        names = tuple(p.name for p in params)
+        lookup = tuple(
+            (p.name, _MISSING if p.default is p.empty else p.default)
+            for p in params
+        )
+        
+        def bind(args, kwargs):
+            if args:
+                kwargs = dict(zip(names, args), **kwargs)
+            return [(name, kwargs.get(name, default)) for name, default in lookup]
+        
+        return bind
+    
+    # จำนวน field สูงสุดของ dict ที่ return ต่อ endpoint
+    # (dict ที่ key เปลี่ยนไปเรื่อยๆ เช่น {user_id: ...} ไม่ใช่ record → หยุดเก็บ field ใหม่)
+    return_max_fields = 64
+    
     def _wrap_handler(self, func):
         """
-        Wrap endpoint function เพื่อเก็บ type ข้อมูลก่อนเรียก
+        Wrap endpoint function เพื่อเก็บ type ข้อมูลของ argument และ return value
         
         พารามิเตอร์:
             func: endpoint function ที่จะ wrap
         
         Return:
-            wrapper function ที่เก็บ type ก่อนเรียก func()
+            wrapper function ที่เก็บ type ก่อนและหลังเรียก func()
         
         การทำงาน:
-        1. ใช้ inspect.signature() ดึง parameter names
-        2. ใช้ sig.bind() แปลง args/kwargs เป็น named arguments
+        1. (ตอน decorate) สร้าง binder และตรวจว่า func เป็น async หรือไม่ ครั้งเดียว
+        2. (ทุก request) ใช้ binder แปลง args/kwargs เป็น named arguments
         3. เก็บ type ของแต่ละ argument
-        4. เรียก function จริง (รองรับทั้ง sync และ async)
+        4. เรียก function จริง
+        5. เก็บ type ของ return value:
+           - dict → type ของแต่ละ field ในชื่อ "return.<key>"
+             (CodeGen ใช้สร้าง response record แทน anonymous object)
+           - ค่าอื่น → type ในชื่อ "return"
         
         หมายเหตุ:
         - ใช้ @wraps(func) เพื่อเก็บ metadata ของ function เดิม
-        - รองรับทั้ง async และ sync functions
+        - async function ได้ async wrapper, sync function ได้ sync wrapper
+          (ถ้า wrap sync ด้วย async def FastAPI จะรันโค้ด blocking บน event loop
+          ทำให้ profiling server ทำงานได้ทีละ request)
+        - sampling.enabled=False → return func เดิมเลย (zero overhead)
         """
-        # ใช้ @wraps เพื่อเก็บ __name__, __doc__ ของ function เดิม
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # ============== ส่วนที่ 2.5.1: Inspect Signature ==============
-            # ดึง function signature (parameter names และ types)
-            sig = inspect.signature(func)
-            
-            # Bind args และ kwargs เข้ากับ parameter names
-            # ทำให้เราได้ชื่อของแต่ละ parameter
-            bound = sig.bind(*args, **kwargs)
-            bound.apply_defaults()  # ใส่ค่า default ถ้ามี
-            
-            # ============== ส่วนที่ 2.5.2: Collect Types ==============
-            # วนลูปเก็บ type ของแต่ละ argument
-            for name, value in bound.arguments.items():
-                self._collect_type(func.__name__, name, value)
+        if not self.sampling.enabled:
+            return func
+        
+        # ============== ส่วนที่ 2.6.1: Precompile (ครั้งเดียวต่อ endpoint) ==============
+        bind = self._build_binder(func)
+        func_name = func.__name__
+        is_async = inspect.iscoroutinefunction(func)
+        sampler = _EndpointSampler(self.sampling)
+        collect = self._collect_type
+        
+        return_fields = set()
+        max_fields = self.return_max_fields
+        
+        def observe(args, kwargs) -> bool:
+            # วนลูปเก็บ type ของแต่ละ argument (เฉพาะ call ที่ถูก sample)
+            saw_new_type = False
+            for name, value in bind(args, kwargs):
+                if value is not _MISSING and collect(func_name, name, value):
+                    saw_new_type = True
+            return saw_new_type
+        
+        def observe_return(result) -> bool:
+            if not isinstance(result, dict):
+                return collect(func_name, "return", result)
+            saw_new_type = False
+            for key, value in result.items():
+                if key not in return_fields:
+                    if not isinstance(key, str) or len(return_fields) >= max_fields:
+                        continue
+                    return_fields.add(key)
+                if collect(func_name, "return." + key, value):
+                    saw_new_type = True
+            return saw_new_type
+        
+        # ============== ส่วนที่ 2.6.2: Async Handler ==============
+        # async handler → async wrapper ที่ await function จริง
+        if is_async:
+            # ใช้ @wraps เพื่อเก็บ __name__, __doc__ ของ function เดิม
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not sampler.should_sample():
+                    return await func(*args, **kwargs)
+                saw_new_type = observe(args, kwargs)
+                result = await func(*args, **kwargs)
+                if observe_return(result):
+                    saw_new_type = True
+                sampler.record(saw_new_type)
+                return result
             
-            # ============== ส่วนที่ 2.5.3: Call Original Function ==============
-            # เรียก function จริง (รองรับทั้ง async และ sync)
-            if inspect.iscoroutinefunction(func):
-                # ถ้าเป็น async function ใช้ await
-                return await func(*args, **kwargs)
-            else:
-                # ถ้าเป็น sync function เรียกตรงๆ
+            return async_wrapper
+        
+        # ============== ส่วนที่ 2.6.3: Sync Handler ==============
+        # sync handler → sync wrapper (ห้ามเป็น async def!)
+        # FastAPI จะเห็นว่าเป็น def ธรรมดาแล้วรันใน threadpool ของมันเอง
+        # เหมือนตอน deploy จริง - โค้ดที่ block จะไม่ไปค้าง event loop
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not sampler.should_sample():
                 return func(*args, **kwargs)
+            saw_new_type = observe(args, kwargs)
+            result = func(*args, **kwargs)
+            if observe_return(result):
+                saw_new_type = True
+            sampler.record(saw_new_type)
+            return result
         
         return wrapper
 
     # ==========================================================================
-    # ส่วนที่ 2.6: HTTP Method Decorators
+    # ส่วนที่ 2.7: HTTP Method Decorators
     # ==========================================================================
     # Decorators สำหรับแต่ละ HTTP method (GET, POST, PUT, DELETE, PATCH)
     # รูปแบบเหมือนกันหมด แค่เปลี่ยน method ที่เรียก
     
-    # ============== ส่วนที่ 2.6.1: GET Method ==============
+    # ============== ส่วนที่ 2.7.1: GET Method ==============
     def get(self, path: str):
         """
         Decorator สำหรับ HTTP GET endpoint
@@ -416,7 +1039,7 @@ class DukpyraRuntime:
             return func  # Return function เดิมเพื่อให้สามารถเรียกใช้ได้
         return decorator
 
-    # ============== ส่วนที่ 2.6.2: POST Method ==============
+    # ============== ส่วนที่ 2.7.2: POST Method ==============
     def post(self, path: str):
         """
         Decorator สำหรับ HTTP POST endpoint
@@ -429,7 +1052,7 @@ class DukpyraRuntime:
             return func
         return decorator
 
-    # ============== ส่วนที่ 2.6.3: PUT Method ==============
+    # ============== ส่วนที่ 2.7.3: PUT Method ==============
     def put(self, path: str):
         """
         Decorator สำหรับ HTTP PUT endpoint
@@ -442,7 +1065,7 @@ class DukpyraRuntime:
             return func
         return decorator
     
-    # ============== ส่วนที่ 2.6.4: DELETE Method ==============
+    # ============== ส่วนที่ 2.7.4: DELETE Method ==============
     def delete(self, path: str):
         """
         Decorator สำหรับ HTTP DELETE endpoint
@@ -455,7 +1078,7 @@ class DukpyraRuntime:
             return func
         return decorator
 
-    # ============== ส่วนที่ 2.6.5: PATCH Method ==============
+    # ============== ส่วนที่ 2.7.5: PATCH Method ==============
     def patch(self, path: str):
         """
         Decorator สำหรับ HTTP PATCH endpoint
@@ -476,7 +1099,17 @@ class DukpyraRuntime:
 # ============== ส่วนที่ 3.1: Global Runtime Instance ==============
 # สร้าง DukpyraRuntime instance ตัวเดียว (Singleton pattern)
 # ใช้ underscore prefix เพื่อบอกว่าเป็น internal variable
-_runtime = DukpyraRuntime()
+# สร้างตอนถูกใช้ครั้งแรก ไม่ใช่ตอน import: การสร้าง app จะ import FastAPI
+# (หลายร้อย ms) ซึ่ง compiler / CLI ที่ import dukpyra ไม่ได้ใช้
+_global_runtime: Optional[DukpyraRuntime] = None
+_global_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """dukpyra.runtime._runtime → global instance (สร้างเมื่อเข้าถึงครั้งแรก)"""
+    if name == "_runtime":
+        return app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============== ส่วนที่ 3.2: Factory Function ==============
@@ -485,7 +1118,7 @@ def app():
     Factory function สำหรับดึง DukpyraRuntime instance
     
     การทำงาน:
-        Return global _runtime instance
+        Return global runtime instance (สร้างครั้งแรกที่เรียก)
     
     ตัวอย่างการใช้งาน:
         import dukpyra
@@ -500,7 +1133,12 @@ def app():
         - ทำให้การเรียกใช้ดูเหมือน FastAPI
         - แต่จริงๆ คือ DukpyraRuntime ที่มี type collection
     """
-    return _runtime
+    global _global_runtime
+    if _global_runtime is None:
+        with _global_lock:
+            if _global_runtime is None:
+                _global_runtime = DukpyraRuntime()
+    return _global_runtime
 
 
 # ==============================================================================
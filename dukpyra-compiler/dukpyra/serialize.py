@@ -0,0 +1,248 @@
+"""
+Dukpyra Serialize - Compact Binary Encoding of AST Trees
+
+The compile cache (cache.py) persists parsed modules between runs. The
+only other serializer, ast_to_dict/print_ast, is reflective and
+JSON-based, and pickle stores every slotted node as a class reference
+plus a dict of its slots. This module encodes trees against a fixed
+schema instead:
+
+    header   MAGIC, FORMAT_VERSION, marshal version, schema digest
+    strings  string table: every name, key and literal stored once
+    nodes    node table, in post-order: (tag, field, field, ...)
+             with tag = NODE_TYPES index
+    payload  plain values; a tree in it (and a child field in the node
+             table) is an int (node table index), a list of trees or None
+
+Field values are encoded by their annotation in ast.py: str fields as
+string-table indices, int/float/bool fields as-is, everything else as a
+tree. Each node type gets a generated encode/decode function, so no field
+loop runs per node; the bytes themselves are written and read by marshal
+(C code).
+
+The node table is flat, so neither the stream nor the code depends on how
+deeply the tree nests: encoding is a Visitor.fold (explicit stack), and
+decoding is one pass over the table, children coming before their parent.
+The schema digest covers NODE_TYPES and their fields, so a stream from a
+different AST definition is rejected with ValueError rather than decoded
+into the wrong classes.
+
+A node reachable more than once (the cache stores both a file's AST and
+the incremental blocks made of the same nodes) is encoded once and decoded
+as one object, like pickle does.
+
+    data = dumps(program)
+    assert loads(data) == program
+
+Several trees can share one string table and one stream:
+
+    encoder = Encoder()
+    payload = (encoder.encode(ast), encoder.encode(nodes), "plain value")
+    data = encoder.dumps(payload)
+    decoder = Decoder(data)
+    ast = decoder.decode(decoder.payload[0])
+"""
+
+import gc
+import hashlib
+import marshal
+import struct
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast import (
+    Node, ProgramNode, ImportNode, AppCreationNode, ClassDefNode,
+    ClassPropertyNode, EndpointNode, GenericEndpointNode, DecoratorNode,
+    FunctionDefNode, ParameterNode, ExpressionNode, StringExpr, NumberExpr,
+    BoolExpr, NoneExpr, IdentifierExpr, MemberAccessExpr, DictExpr,
+    DictItemNode, ListExpr, ListCompNode, BinaryOpExpr,
+)
+from .visitor import SCALAR, STRING, TREE, TREES, Visitor, field_kinds
+
+# Bump when the encoding itself changes; AST changes are caught by the digest
+FORMAT_VERSION = 2
+
+MAGIC = b"DKAST"
+
+# Tag of a node type = its index here. Append new node types at the end.
+NODE_TYPES = (
+    Node, ProgramNode, ImportNode, AppCreationNode, ClassDefNode,
+    ClassPropertyNode, EndpointNode, GenericEndpointNode, DecoratorNode,
+    FunctionDefNode, ParameterNode, ExpressionNode, StringExpr, NumberExpr,
+    BoolExpr, NoneExpr, IdentifierExpr, MemberAccessExpr, DictExpr,
+    DictItemNode, ListExpr, ListCompNode, BinaryOpExpr,
+)
+
+# node type → (tag, field names, field kinds); kinds as in visitor.py
+_SCHEMA = {
+    cls: (tag, tuple(name for name, _ in field_kinds(cls)), tuple(kind for _, kind in field_kinds(cls)))
+    for tag, cls in enumerate(NODE_TYPES)
+}
+
+SCHEMA_DIGEST = hashlib.sha256(repr([
+    (cls.__name__, names, kinds) for cls, (_, names, kinds) in _SCHEMA.items()
+]).encode()).digest()[:8]
+
+_HEADER = struct.Struct("<5sHB8s")
+
+
+def _encoder_source(cls: type) -> str:
+    """
+    Source of encode_<Type>(): a Visitor.fold handler that appends the
+    node's tuple to the node table and returns its index.
+    """
+    tag, names, kinds = _SCHEMA[cls]
+    params, parts = [], [str(tag)]
+    for name, kind in zip(names, kinds):
+        if kind >= TREE:
+            params.append(f", child_{name}")  # already encoded
+            parts.append(f"child_{name}")
+        else:
+            parts.append(f"node.{name}" if kind == SCALAR else f"string(node.{name})")
+    return (f"def encode_{cls.__name__}(self, node{''.join(params)}):\n"
+            f"    string = self.string\n"
+            f"    self.table.append(({', '.join(parts)},))\n"
+            f"    self.shared[id(node)] = index = len(self.nodes)\n"
+            f"    self.nodes.append(node)\n"
+            f"    return index\n")
+
+
+def _decoder_source(cls: type) -> str:
+    """Source of decode_<Type>(): the node rebuilt from its tuple, slot by slot."""
+    _, names, kinds = _SCHEMA[cls]
+    lines = [f"def decode_{cls.__name__}(value, strings, nodes, tree):",
+             f"    node = new({cls.__name__})"]
+    for index, (name, kind) in enumerate(zip(names, kinds), 1):
+        item = f"value[{index}]"
+        if kind == STRING:
+            item = f"strings[{item}]"
+        elif kind == TREE:
+            lines.append(f"    item = {item}")
+            item = "nodes[item] if type(item) is int else tree(item)"
+        elif kind == TREES:
+            lines.append(f"    items = {item}")
+            item = ("[nodes[item] if type(item) is int else tree(item) for item in items]"
+                    " if type(items) is list else tree(items)")
+        lines.append(f"    node.{name} = {item}")
+    lines.append("    return node")
+    return "\n".join(lines) + "\n"
+
+
+# Per-type functions without a loop over the fields, generated once (like
+# dataclasses generates __init__)
+_NAMESPACE: Dict[str, Any] = dict({cls.__name__: cls for cls in NODE_TYPES}, new=object.__new__)
+exec("".join(_encoder_source(cls) + _decoder_source(cls) for cls in NODE_TYPES), _NAMESPACE)
+_ENCODERS = {cls: f"encode_{cls.__name__}" for cls in NODE_TYPES}
+_DECODERS = tuple(_NAMESPACE[f"decode_{cls.__name__}"] for cls in NODE_TYPES)
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Allocating thousands of containers triggers the cyclic GC over and over
+    (it scans every tracked object each time); encoded trees and decoded
+    AST nodes contain no cycles, so it is paused meanwhile.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class Encoder(Visitor):
+    """Encodes trees into one node table and one string table."""
+
+    handlers = _ENCODERS  # the encode_<Type> methods are added below
+
+    @classmethod
+    def _resolve(cls, node_type: type):
+        # Exact types only: a subclass would decode as its base class
+        if node_type not in cls.handlers:
+            raise ValueError(f"cannot serialize {node_type.__name__}")
+        return super()._resolve(node_type)
+
+    def __init__(self):
+        self.strings: Dict[Optional[str], int] = {}
+        self.table: List[Tuple] = []
+        # id(node) → node table index, and the nodes themselves (kept alive
+        # so that ids stay unique while encoding)
+        self.shared: Dict[int, int] = {}
+        self.nodes: List[Node] = []
+
+    def string(self, value: Optional[str]) -> int:
+        strings = self.strings
+        index = strings.get(value)  # None (Optional[str]) is an entry too
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    def encode(self, tree: Any) -> Any:
+        """Encode a node, a (nested) list of nodes, or None."""
+        with _gc_paused():
+            # Nodes encoded before fold to their index
+            return self.fold(tree, self.shared)
+
+    def dumps(self, payload: Any) -> bytes:
+        """Header + string table + node table + payload (encoded trees and plain values)."""
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, SCHEMA_DIGEST)
+        return header + marshal.dumps((tuple(self.strings), self.table, payload))
+
+
+for _name in _ENCODERS.values():
+    setattr(Encoder, _name, _NAMESPACE[_name])
+
+
+class Decoder:
+    """Reads a stream written by Encoder.dumps; decode() rebuilds its trees."""
+
+    def __init__(self, data: bytes):
+        if len(data) < _HEADER.size:
+            raise ValueError("truncated Dukpyra AST stream")
+        magic, version, marshal_version, digest = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Dukpyra AST stream")
+        if (version, marshal_version) != (FORMAT_VERSION, marshal.version):
+            raise ValueError(f"unsupported AST stream format {version}.{marshal_version}")
+        if digest != SCHEMA_DIGEST:
+            raise ValueError("AST stream was written for different node types")
+        with _gc_paused():
+            strings, self._table, self.payload = marshal.loads(data[_HEADER.size:])
+        self.strings = tuple(sys.intern(s) if type(s) is str else s for s in strings)
+        self._nodes: Optional[List[Node]] = None
+
+    def _tree(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if type(value) is list:
+            return [self._tree(item) for item in value]  # lists of lists only
+        return self._nodes[value]
+
+    def decode(self, tree: Any) -> Any:
+        """Rebuild a tree of the payload (the whole node table on first use)."""
+        if self._nodes is None:
+            strings = self.strings
+            nodes: List[Node] = []
+            append = nodes.append
+            decoders = _DECODERS
+            tree_of = self._tree
+            self._nodes = nodes
+            with _gc_paused():
+                for value in self._table:  # post-order: children first
+                    append(decoders[value[0]](value, strings, nodes, tree_of))
+        return self._tree(tree)
+
+
+def dumps(tree: Any) -> bytes:
+    """Encode a ProgramNode (or any node, list of nodes or None) to bytes."""
+    encoder = Encoder()
+    return encoder.dumps(encoder.encode(tree))
+
+
+def loads(data: bytes) -> Any:
+    """Inverse of dumps(); raises ValueError for foreign or outdated data."""
+    decoder = Decoder(data)
+    return decoder.decode(decoder.payload)
@@ -0,0 +1,53 @@
+"""
+Dukpyra Tables - Build-time Generation of the Lexer and Parser Tables
+
+lexer.py and parser.py load prebuilt PLY tables instead of reflecting on
+the grammar at import time:
+
+    dukpyra/lextab.py    lexer master regexes (lex.lex(optimize=1))
+    dukpyra/parsetab.py  LALR action/goto tables (yacc.LRTable)
+
+Regenerate them after changing a token rule or a grammar rule:
+
+    python -m dukpyra.tables            # or: make tables
+
+setup.py runs this before building the package, so installed copies
+always ship tables that match their grammar. Nothing here writes a
+parser.out debug file.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+import ply.lex as lex
+import ply.yacc as yacc
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def build_tables(outputdir: Optional[Union[str, Path]] = None) -> None:
+    """Write lextab.py and parsetab.py for the current grammar into outputdir."""
+    # dukpyra.lexer the package attribute is the lexer object; the token
+    # rules live in the submodule
+    from . import parser as parser_module
+    lexer_module = sys.modules[__package__ + ".lexer"]
+
+    outputdir = str(outputdir or PACKAGE_DIR)
+
+    # Full (validating) lexer build, then dump its master regexes
+    lex.lex(module=lexer_module).writetab("lextab", outputdir)
+
+    # yacc only regenerates when dukpyra.parsetab is missing or its signature
+    # differs from the grammar; grammar warnings and conflicts go to stderr.
+    yacc.yacc(
+        module=parser_module,
+        tabmodule="parsetab",
+        outputdir=outputdir,
+        debug=False,
+        write_tables=True,
+    )
+
+
+if __name__ == "__main__":
+    build_tables(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,211 @@
+"""
+Dukpyra Visitor - Table-dispatched, Explicit-stack AST Traversal
+
+Every pass over the AST (Analyzer, CodeGen, ast_to_dict, the cache codec in
+serialize.py) used to dispatch through an isinstance chain and recurse into
+children. Both costs grow with the tree: each node paid for the chain up to
+its own type, and a deeply nested dict/list literal or comprehension hit
+Python's recursion limit (about 1000 frames).
+
+Visitor replaces both:
+
+    - dispatch: a subclass maps node types to handler method names in
+      `handlers`; the table is resolved once per (visitor class, node type),
+      following the node type's MRO, so a lookup is one dict access.
+    - traversal: fold() and walk() keep their own stack, so depth is bounded
+      by memory, not by the interpreter's frame limit.
+
+Two traversals cover the passes in this package:
+
+    fold(tree)          post-order, bottom-up. The handler of a node gets the
+                        results of its child fields, in field order:
+                            def visit_binary_op(self, node, left, right)
+                        list fields give a list of results, None gives None.
+
+    walk(tree, context) pre-order, top-down. The handler gets the node and
+                        the context of its parent and returns the
+                        (child, context) pairs to visit next, or None to
+                        visit every child with the same context.
+
+Child fields are found from the annotations in ast.py (see field_kinds):
+str/int/float/bool fields are never descended into.
+
+Architecture:
+    Analyzer (walk), CodeGen (fold), ast_to_dict (fold), serialize (fold)
+"""
+
+import functools
+import operator
+from dataclasses import fields
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .ast import Node
+
+# How a field is treated: by value (SCALAR, STRING) or as a subtree (TREE,
+# TREES for List[...] annotations)
+SCALAR, STRING, TREE, TREES = 0, 1, 2, 3
+
+_SCALAR_TYPES = (int, float, bool, Union[int, float])
+_STRING_TYPES = (str, Optional[str])
+
+
+def _field_kind(annotation: Any) -> int:
+    if annotation in _STRING_TYPES:
+        return STRING
+    if annotation in _SCALAR_TYPES:
+        return SCALAR
+    if getattr(annotation, "__origin__", None) is list:
+        return TREES
+    return TREE
+
+
+@functools.lru_cache(maxsize=None)
+def field_kinds(node_type: type) -> Tuple[Tuple[str, int], ...]:
+    """(field name, kind) of every field of a node type, in declaration order."""
+    return tuple((f.name, _field_kind(f.type)) for f in fields(node_type))
+
+
+@functools.lru_cache(maxsize=None)
+def child_fields(node_type: type) -> Tuple[str, ...]:
+    """Names of the fields of a node type that hold nodes or lists of nodes."""
+    return tuple(name for name, kind in field_kinds(node_type) if kind >= TREE)
+
+
+def _value(visitor: "Visitor", value: Any) -> Any:
+    """Handler of values that are not nodes (folded as themselves)."""
+    return value
+
+
+class Visitor:
+    """
+    Base class of AST passes.
+
+        class Printer(Visitor):
+            handlers = {ListExpr: "visit_list", ExpressionNode: "visit_other"}
+
+            def visit_list(self, node, items):
+                return "[" + ", ".join(items) + "]"
+
+            def visit_other(self, node, *children):
+                return type(node).__name__
+
+        Printer().fold(tree)
+
+    A node type without an entry uses the entry of its nearest base class,
+    then generic_visit.
+    """
+
+    handlers: Dict[type, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # node type → (handler function or None for generic_visit,
+        #              number of child fields, attrgetter of the child fields:
+        #              the value for one field, a tuple for several)
+        cls._table = {}
+
+    @classmethod
+    def _resolve(cls, node_type: type) -> Tuple[Optional[Callable], int, Optional[Callable]]:
+        if not issubclass(node_type, Node):
+            entry = (_value, 0, None)
+        else:
+            name = next((cls.handlers[base] for base in node_type.__mro__
+                         if base in cls.handlers), "generic_visit")
+            handler = getattr(cls, name)
+            if handler is Visitor.generic_visit:
+                handler = None  # nothing to call: walk() just visits the children
+            names = child_fields(node_type)
+            entry = (handler, len(names), operator.attrgetter(*names) if names else None)
+        cls._table[node_type] = entry
+        return entry
+
+    def generic_visit(self, node: Node, *children: Any) -> Any:
+        """Handler of node types without an entry in `handlers`."""
+        return None
+
+    # -------------------------- traversals --------------------------
+
+    def fold(self, tree: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+        """
+        Post-order fold of a node, a list of nodes or None.
+
+        memo (optional) maps id(node) to a result: such nodes are not
+        visited again and fold to that result (handlers may add to it).
+        """
+        table = self._table
+        resolve = self._resolve
+        out: List[Any] = []
+        append = out.append
+        stack = [tree]
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        while stack:
+            node = pop()
+            kind = type(node)
+            if kind is tuple:
+                # Exit frame: the `count` results on top of out belong to node
+                handler, node, count = node
+                if handler is None:  # a list
+                    items = out[-count:]
+                    del out[-count:]
+                    append(items)
+                elif count == 1:
+                    out[-1] = handler(self, node, out[-1])
+                else:
+                    children = out[-count:]
+                    del out[-count:]
+                    append(handler(self, node, *children))
+            elif kind is list:
+                if node:
+                    push((None, node, len(node)))
+                    extend(reversed(node))
+                else:
+                    append([])
+            elif node is None:
+                append(None)
+            elif memo is not None and id(node) in memo:
+                append(memo[id(node)])
+            else:
+                handler, count, children = table.get(kind) or resolve(kind)
+                if handler is None:
+                    handler = type(self).generic_visit
+                if not count:
+                    append(handler(self, node))
+                    continue
+                push((handler, node, count))
+                if count == 1:
+                    push(children(node))
+                else:
+                    extend(reversed(children(node)))
+        return out[0]
+
+    def walk(self, tree: Any, context: Any = None) -> None:
+        """Pre-order walk of a node, a list of nodes or None, threading context."""
+        table = self._table
+        resolve = self._resolve
+        stack = [(tree, context)]
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        while stack:
+            node, context = pop()
+            kind = type(node)
+            if kind is list:
+                extend(zip(reversed(node), repeat(context)))
+                continue
+            if node is None:
+                continue
+            handler, count, children = table.get(kind) or resolve(kind)
+            if handler is not None:
+                if handler is _value:
+                    continue  # not a node
+                pairs: Optional[Iterable] = handler(self, node, context)
+                if pairs is not None:
+                    extend(reversed(list(pairs)))
+                    continue
+            if count == 1:
+                push((children(node), context))
+            elif count:
+                extend(zip(reversed(children(node)), repeat(context)))
@@ -9,6 +9,7 @@ SETUP.PY - Python Package Configuration
 2. ระบุ dependencies ที่จำเป็น
 3. สร้าง CLI command (dukpyra command)
 4. กำหนด Python version ที่รองรับ
+5. สร้าง lexer/parser tables (python -m dukpyra.tables) ตอน build
 
 การใช้งาน:
     # Development install (แก้โค้ดแล้วใช้งานได้ทันที)
@@ -31,7 +32,20 @@ Setup Tools:
 ==============================================================================
 """
 
+import subprocess
+import sys
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+
+class BuildWithTables(build_py):
+    """สร้าง lextab.py / parsetab.py ให้ตรงกับ grammar ก่อน copy ไฟล์ของ package"""
+
+    def run(self):
+        subprocess.check_call([sys.executable, "-m", "dukpyra.tables"])
+        super().run()
+
 
 # อ่าน README สำหรับ long_description (แสดงใน PyPI)
 with open("README.md", "r", encoding="utf-8") as f:
@@ -100,6 +114,9 @@ setup(
         ],
     },
     
+    # ========== Build ==========
+    cmdclass={"build_py": BuildWithTables},
+    
     # ========== CLI Entry Points ==========
     entry_points={
         "console_scripts": [
@@ -55,6 +55,9 @@ print("\nTest 6: Type conflicts")
 runtime._collect_type("test_conflict", "value", 42)      # int
 runtime._collect_type("test_conflict", "value", "text")  # str - conflict!
 
+# flush และ compact type ที่สะสมไว้ลง types.json (ปกติทำตอน server shutdown)
+runtime.close()
+
 print("\n==============================================================================")
 print("Runtime type collection completed!")
 print("Check .dukpyra/types.json for results")
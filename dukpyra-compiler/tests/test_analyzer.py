@@ -149,5 +149,84 @@ def create(body: UnknownType):
         assert any(e.code == "E011" for e in result.errors)
 
 
+
+class TestProjectSymbolIndex:
+    """Cross-module duplicates, patched per changed module."""
+    
+    USERS = '''import dukpyra
+app = dukpyra.app()
+class User:
+    name: str
+@app.post("/users")
+def create_user(body: User):
+    return {"name": body.name}
+'''
+    
+    def index_of(self, **modules):
+        from dukpyra.analyzer import ProjectSymbolIndex, collect_symbols
+        
+        index = ProjectSymbolIndex()
+        for name, code in modules.items():
+            index.update(f"{name}.py", code, collect_symbols(parse(code)))
+        return index
+    
+    def test_collect_symbols(self):
+        from dukpyra.analyzer import collect_symbols
+        
+        symbols = collect_symbols(parse(self.USERS))
+        assert symbols.classes == (("User", 3),)
+        assert [key for key, _ in symbols.endpoints] == ["POST /users"]
+        assert symbols.records == ()
+    
+    def test_duplicates_across_modules(self):
+        index = self.index_of(a=self.USERS, b=self.USERS.replace("/users", "/people"), c=self.USERS)
+        errors = [(module, error.code, error.message) for module, error in index.errors()]
+        assert errors == [
+            ("b.py", "E001", "Duplicate class definition: 'User' (already defined in a.py line 3)"),
+            ("c.py", "E001", "Duplicate class definition: 'User' (already defined in a.py line 3)"),
+            ("c.py", "E002", "Duplicate endpoint: POST /users (already defined in a.py line 5)"),
+        ]
+    
+    def test_updates_patch_the_index(self):
+        from dukpyra.analyzer import collect_symbols
+        
+        index = self.index_of(a=self.USERS, b=self.USERS)
+        assert len(index.errors()) == 2
+        
+        fixed = self.USERS.replace("User", "Admin").replace("/users", "/admins")
+        assert index.update("b.py", fixed, collect_symbols(parse(fixed)))
+        assert not index.update("b.py", fixed, collect_symbols(parse(fixed)))  # same digest
+        assert index.errors() == []
+        
+        index.update("c.py", self.USERS, collect_symbols(parse(self.USERS)))
+        assert {module for module, _ in index.errors()} == {"c.py"}
+        index.remove("a.py")
+        assert index.errors() == []
+        assert set(index.classes) == {"User", "Admin"}
+        index.remove("c.py")
+        assert "User" not in index.classes
+    
+    def test_response_records_collide_with_records_and_classes(self):
+        from dukpyra.analyzer import FileSymbols, ProjectSymbolIndex
+        
+        index = ProjectSymbolIndex()
+        index.update("a.py", "a", FileSymbols(records=(("GetUserResponse", 4),)))
+        index.update("b.py", "b", FileSymbols(classes=(("GetUserResponse", 3),)))
+        index.update("c.py", "c", FileSymbols(records=(("GetUserResponse", 7),)))
+        errors = [(module, error.code, error.message) for module, error in index.errors()]
+        assert errors == [
+            ("b.py", "E005", "Duplicate type name: class 'GetUserResponse' "
+                             "(already defined as a response record in a.py line 4)"),
+            ("c.py", "E005", "Duplicate type name: response record 'GetUserResponse' "
+                             "(already defined as a response record in a.py line 4)"),
+        ]
+        
+        # Same source, new profile: the record is gone
+        index.update("a.py", "a", FileSymbols())
+        index.update("c.py", "c", FileSymbols())
+        assert index.errors() == []
+        assert set(index.records) == set() and set(index.classes) == {"GetUserResponse"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
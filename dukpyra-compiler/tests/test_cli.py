@@ -15,3 +15,172 @@ def test_cli_help():
     result = runner.invoke(cli, ['--help'])
     assert result.exit_code == 0
     assert 'Dukpyra' in result.output
+
+def test_import_is_lazy():
+    """import dukpyra / dukpyra.cli must not build parser tables or load FastAPI"""
+    import subprocess
+    import sys
+    code = (
+        "import sys, dukpyra, dukpyra.cli; dukpyra.app\n"
+        "heavy = ('dukpyra.parser', 'dukpyra.codegen', 'ply', 'jinja2', 'fastapi', 'watchdog')\n"
+        "print(sorted(m for m in sys.modules if m.startswith(heavy)))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_parallel_compile_matches_sequential(tmp_path, monkeypatch):
+    """Process-pool compilation must write the same Program.cs as the sequential path"""
+    from dukpyra import cli as cli_module
+    from dukpyra.cli import DukpyraCompiler
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli_module, "PARALLEL_MIN_FILES", 2)
+    for i in range(6):
+        (tmp_path / f"module_{i}.py").write_text(
+            "import dukpyra\n"
+            "app = dukpyra.app()\n"
+            f"@app.get(\"/items{i}/{{item_id}}\")\n"
+            f"def get_item_{i}(item_id: int):\n"
+            f"    return {{\"id\": item_id, \"module\": {i}}}\n"
+        )
+
+    outputs = []
+    for jobs in (1, 3):
+        compiler = DukpyraCompiler(tmp_path, jobs=jobs, use_cache=False)
+        compiler.ensure_structure()
+        assert compiler.compile_project()
+        outputs.append((compiler.compiled_dir / "Program.cs").read_bytes())
+    assert outputs[0] == outputs[1]
+    assert outputs[0].index(b"/items0/") < outputs[0].index(b"/items5/")
+
+def test_compile_cache_recompiles_only_changed_files(tmp_path, monkeypatch):
+    """Unchanged files come from .dukpyra/cache; edits and profile changes invalidate one file"""
+    import json
+    import os
+    from dukpyra.cli import DukpyraCompiler
+
+    monkeypatch.chdir(tmp_path)
+    for i in range(4):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(
+            "import dukpyra\n"
+            "app = dukpyra.app()\n"
+            f"@app.get(\"/items{i}\")\n"
+            f"def get_item_{i}(item_id):\n"
+            f"    return {{\"module\": {i}}}\n"
+        )
+        os.utime(path, (1_000_000_000, 1_000_000_000))  # outside the racy window
+
+    def compile_once():
+        compiler = DukpyraCompiler(tmp_path, jobs=1)
+        compiler.ensure_structure()
+        assert compiler.compile_project()
+        return compiler.cache, (compiler.compiled_dir / "Program.cs").read_text()
+
+    cache, first = compile_once()
+    assert (cache.hits, cache.misses) == (0, 4)
+    cache, second = compile_once()
+    assert (cache.hits, cache.misses) == (4, 0)
+    assert second == first
+
+    # One-line edit: only that file is recompiled
+    (tmp_path / "module_2.py").write_text(
+        (tmp_path / "module_2.py").read_text().replace('"/items2"', '"/things2"'))
+    cache, third = compile_once()
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert '"/things2"' in third and '"/items2"' not in third
+
+    # A profile entry for one handler invalidates only the file that defines it
+    (tmp_path / ".dukpyra" / "types.json").write_text(json.dumps({"get_item_1": {"item_id": "int"}}))
+    cache, fourth = compile_once()
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert "int item_id" in fourth
+
+def test_duplicates_across_modules_fail_the_compile(tmp_path, monkeypatch, capsys):
+    """The same route in two modules is an error; fixing one file patches the project index"""
+    from dukpyra.cli import DukpyraCompiler
+
+    monkeypatch.chdir(tmp_path)
+    for name in ("orders", "users"):
+        (tmp_path / f"{name}.py").write_text(
+            "import dukpyra\n"
+            "app = dukpyra.app()\n"
+            "@app.get(\"/items\")\n"
+            f"def list_{name}():\n"
+            "    return []\n"
+        )
+    compiler = DukpyraCompiler(tmp_path, jobs=1)
+    compiler.ensure_structure()
+    assert not compiler.compile_project()
+    assert "❌ users.py: Error E002 (line 3): Duplicate endpoint: GET /items (already defined in orders.py line 3)" \
+        in capsys.readouterr().err
+
+    users = tmp_path / "users.py"
+    users.write_text(users.read_text().replace('"/items"', '"/users"'))
+    index = compiler.symbols
+    assert compiler.compile_project()
+    assert compiler.symbols is index and set(index.endpoints) == {"GET /items", "GET /users"}
+    assert (compiler.cache.hits, compiler.cache.misses) == (1, 1)
+
+def test_response_records_are_qualified_by_module(tmp_path, monkeypatch):
+    """Handlers with the same name in two modules get different response records"""
+    import json
+    from dukpyra.cli import DukpyraCompiler
+
+    monkeypatch.chdir(tmp_path)
+    for name in ("orders", "users"):
+        (tmp_path / f"{name}.py").write_text(
+            "import dukpyra\n"
+            "app = dukpyra.app()\n"
+            f"@app.get(\"/{name}/{{item_id}}\")\n"
+            "def get_item(item_id: int):\n"
+            "    return {\"id\": item_id}\n"
+        )
+    (tmp_path / ".dukpyra").mkdir()
+    (tmp_path / ".dukpyra" / "types.json").write_text(json.dumps({"get_item": {"return.id": "int"}}))
+    compiler = DukpyraCompiler(tmp_path, jobs=1, use_cache=False)
+    compiler.ensure_structure()
+    assert compiler.compile_project()
+    program = (compiler.compiled_dir / "Program.cs").read_text()
+    assert program.count("public record OrdersGetItemResponse(int id);") == 1
+    assert program.count("public record UsersGetItemResponse(int id);") == 1
+
+def test_merge_dedupes_identical_records_and_rejects_conflicts(tmp_path):
+    from dukpyra.cli import DukpyraCompiler
+
+    compiler = DukpyraCompiler(tmp_path)
+    module = "public record Item(int id);\n// --- Dukpyra Generated Routes ---\n// --------------------------------\n"
+    assert compiler._merge_compiled_code([module, module]).count("public record Item(int id);") == 1
+    with pytest.raises(ValueError, match="Item"):
+        compiler._merge_compiled_code([module, module.replace("int id", "string id")])
+
+def test_response_record_clashing_with_a_class_fails_the_compile(tmp_path, monkeypatch, capsys):
+    import json
+    from dukpyra.cli import DukpyraCompiler
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "orders.py").write_text(
+        "import dukpyra\n"
+        "app = dukpyra.app()\n"
+        "@app.get(\"/orders/{item_id}\")\n"
+        "def get_item(item_id: int):\n"
+        "    return {\"id\": item_id}\n"
+    )
+    (tmp_path / "users.py").write_text(
+        "import dukpyra\n"
+        "app = dukpyra.app()\n"
+        "class OrdersGetItemResponse:\n"
+        "    id: int\n"
+        "@app.get(\"/users\")\n"
+        "def list_users():\n"
+        "    return []\n"
+    )
+    compiler = DukpyraCompiler(tmp_path, jobs=1)
+    compiler.ensure_structure()
+    assert compiler.compile_project()
+
+    # The profile adds a response record to the unchanged orders.py
+    (tmp_path / ".dukpyra" / "types.json").write_text(json.dumps({"get_item": {"return.id": "int"}}))
+    assert not compiler.compile_project()
+    assert "❌ users.py: Error E005 (line 3): Duplicate type name: class 'OrdersGetItemResponse' " \
+        "(already defined as a response record in orders.py line 3)" in capsys.readouterr().err
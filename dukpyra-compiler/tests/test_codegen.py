@@ -166,6 +166,92 @@ def home():
         assert "public record User(string name, int age);" in csharp
 
 
+class TestCodegenProfiledTypes:
+    """Test mapping of runtime-profiled type strings to C#."""
+    
+    def test_generic_types(self):
+        from dukpyra.codegen import CSharpCodeGenerator
+        gen = CSharpCodeGenerator()
+        assert gen.python_type_to_csharp("List[int]") == "List<int>"
+        assert gen.python_type_to_csharp("Dict[str, List[float]]") == "Dictionary<string, List<double>>"
+        assert gen.python_type_to_csharp("Optional[int]") == "int?"
+        assert gen.python_type_to_csharp("List[Union[int, str]]") == "List<dynamic>"
+    
+    def test_profiled_return_generates_response_record(self):
+        from dukpyra.codegen import CSharpCodeGenerator
+        code = '''import dukpyra
+app = dukpyra.app()
+@app.get("/users/{user_id}")
+def get_user(user_id: int):
+    return {"id": user_id, "name": "Bob", "tags": ["a"]}
+@app.get("/")
+def home():
+    return {"ok": True}
+'''
+        gen = CSharpCodeGenerator()
+        gen.collected_types = {"get_user": {"user_id": "int", "return.id": "int"}}
+        csharp = gen.generate(parse(code))
+        assert "public record GetUserResponse(int id, string name, object tags);" in csharp
+        assert 'return TypedResults.Ok(new GetUserResponse(user_id, "Bob", new[] { "a" }));' in csharp
+        assert "[System.Text.Json.Serialization.JsonSerializable(typeof(GetUserResponse))]" in csharp
+        assert "TypeInfoResolverChain.Insert(0, DukpyraJsonContext.Default)" in csharp
+        # Handlers without a profiled return value keep anonymous objects
+        assert "return Results.Ok(new { ok = true });" in csharp
+
+    def test_literal_field_keeps_its_static_type(self):
+        from dukpyra.codegen import CSharpCodeGenerator
+        code = '''import dukpyra
+app = dukpyra.app()
+@app.get("/users/{user_id}")
+def get_user(user_id: int):
+    return {"id": user_id, "name": "Bob", "score": 1}
+'''
+        gen = CSharpCodeGenerator()
+        gen.collected_types = {"get_user": {
+            "return.id": "Optional[int]", "return.name": "Optional[str]", "return.score": "float",
+        }}
+        csharp = gen.generate(parse(code))
+        assert "public record GetUserResponse(int? id, string name, int score);" in csharp
+
+    def test_value_range_widens_int_to_long(self):
+        from dukpyra.codegen import CSharpCodeGenerator
+        code = '''import dukpyra
+app = dukpyra.app()
+@app.get("/items/{item_id}")
+def get_item(item_id: int, page: int):
+    return {"ok": True}
+'''
+        gen = CSharpCodeGenerator()
+        gen.value_stats = {"get_item": {
+            "item_id": {"min": 1, "max": 3000000000},
+            "page": {"min": 1, "max": 40},
+        }}
+        csharp = gen.generate(parse(code))
+        assert "(long item_id, int page)" in csharp
+    
+    def test_numeric_union_becomes_double(self):
+        from dukpyra.codegen import CSharpCodeGenerator
+        code = '''import dukpyra
+app = dukpyra.app()
+@app.get("/prices")
+def get_prices(price, discount, weight):
+    return {"ok": True}
+'''
+        gen = CSharpCodeGenerator()
+        gen.collected_types = {"get_prices": {
+            "price": "Union[float, int]",
+            "discount": "Optional[Union[float, int]]",
+            "weight": "Union[float, int]",
+        }}
+        gen.value_stats = {"get_prices": {
+            "price": {"min": 0, "max": 99.5},
+            "discount": {"min": 0.1, "max": 5},
+            "weight": {"min": 0, "max": 2**60},  # not exact as a double
+        }}
+        csharp = gen.generate(parse(code))
+        assert "(double price, double? discount, dynamic weight)" in csharp
+
+
 class TestCodegenStructure:
     """Test overall code structure."""
     
@@ -191,6 +277,17 @@ def home():
         csharp = generate_csharp(ast)
         assert "app.Run();" in csharp
 
+    def test_no_json_context_without_response_records(self):
+        code = '''import dukpyra
+app = dukpyra.app()
+@app.get("/")
+def home():
+    return {"ok": True}
+'''
+        csharp = generate_csharp(parse(code))
+        assert csharp.startswith("var builder = WebApplication.CreateBuilder(args);\nvar app = builder.Build();\n")
+        assert csharp.endswith("app.Run();")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,86 @@
+"""
+Dukpyra Compiler Unit Tests - Incremental Reparse
+
+Block-level reparse must always produce the AST and C# of a full compile.
+"""
+
+from dukpyra.codegen import CSharpCodeGenerator, EndpointFragments
+from dukpyra.incremental import IncrementalParser, split_blocks
+from dukpyra.parser import parse
+
+
+SOURCE = '''import dukpyra
+app = dukpyra.app()
+
+class CreateUser:
+    name: str
+    age: int
+
+@app.get("/users/{user_id}")
+def get_user(user_id: int):
+    return {"id": user_id, "name": "Ann"}
+
+@app.post("/users")
+def create_user(body: CreateUser):
+    return {"name": body.name, "ok": True}
+
+@app.get("/items")
+def list_items():
+    return [{"id": n} for n in [1, 2, 3] if n > 1]
+'''
+
+
+def compile_incremental(source, previous=None):
+    parser = IncrementalParser(previous)
+    ast = parser.parse(source)
+    fragments = EndpointFragments(parser.endpoint_keys, parser.previous.fragments)
+    csharp = CSharpCodeGenerator().generate(ast, fragments)
+    parser.state.fragments = fragments.current
+    return ast, csharp, parser, fragments
+
+
+def test_split_blocks():
+    blocks = split_blocks(SOURCE)
+    assert [b.kind for b in blocks] == ["preamble", "class", "endpoint", "endpoint", "endpoint"]
+    assert [b.start for b in blocks] == [1, 4, 8, 12, 16]
+    assert "".join(b.text for b in blocks) == SOURCE
+
+
+def test_only_edited_block_is_reparsed():
+    ast, csharp, parser, _ = compile_incremental(SOURCE)
+    assert ast == parse(SOURCE)
+    assert parser.reparsed == 5
+
+    edited = SOURCE.replace('"name": "Ann"', '"name": "Bob"')
+    ast, csharp, parser, fragments = compile_incremental(edited, parser.state)
+    assert ast == parse(edited)
+    assert (parser.reparsed, parser.reused) == (1, 4)
+    assert fragments.reused == 2
+    assert csharp == CSharpCodeGenerator().generate(parse(edited))
+
+
+def test_reused_blocks_follow_inserted_lines():
+    _, _, parser, _ = compile_incremental(SOURCE)
+    shifted = SOURCE.replace("class CreateUser:", "# models\n\n\nclass CreateUser:")
+    ast, csharp, parser, _ = compile_incremental(shifted, parser.state)
+    assert ast == parse(shifted)
+    assert parser.reparsed == 1  # only the preamble changed
+    assert ast.endpoints[2].handler.lineno == 20
+    assert csharp == CSharpCodeGenerator().generate(parse(shifted))
+
+
+def test_unsplittable_source_falls_back_to_full_parse():
+    # Endpoint before a class is a syntax error for the whole file
+    reordered = SOURCE.replace(
+        "class CreateUser:\n    name: str\n    age: int\n\n", ""
+    ) + "\nclass Late:\n    x: int\n"
+    parser = IncrementalParser()
+    assert parser.parse(reordered) == parse(reordered)
+    assert parser.endpoint_keys is None
+
+    # Duplicate blocks get their own nodes
+    duplicated = SOURCE + SOURCE[SOURCE.index("@app.get(\"/items\")"):]
+    _, _, first, _ = compile_incremental(duplicated)
+    ast, _, _, _ = compile_incremental(duplicated, first.state)
+    assert ast == parse(duplicated)
+    assert ast.endpoints[2] is not ast.endpoints[3]
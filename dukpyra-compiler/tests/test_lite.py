@@ -0,0 +1,102 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from dukpyra.lite import LiteApp
+from dukpyra.runtime import DukpyraRuntime
+
+
+def call(app, method, path, query="", body=None):
+    """Send one request through the ASGI app; return (status, decoded JSON)."""
+    raw = b"" if body is None else json.dumps(body).encode()
+    scope = {
+        "type": "http", "method": method, "path": path,
+        "query_string": query.encode(), "headers": [],
+    }
+    messages = [{"type": "http.request", "body": raw, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+class CreateUser:
+    def __init__(self, name: str, age: int):
+        self.name = name
+        self.age = age
+
+
+def test_path_query_and_body_parameters():
+    app = LiteApp()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int, q: Optional[str] = None, verbose: bool = False):
+        return {"item_id": item_id, "q": q, "verbose": verbose}
+
+    @app.post("/users")
+    async def create_user(user: CreateUser):
+        return {"type": type(user).__name__, "name": user.name}
+
+    @app.post("/sum")
+    def total(values: List[int], scale: int = 1):
+        return sum(values) * scale
+
+    assert call(app, "GET", "/items/42", "verbose=true") == (
+        200, {"item_id": 42, "q": None, "verbose": True})
+    assert call(app, "POST", "/users", body={"name": "Ann", "age": 3}) == (
+        200, {"type": "CreateUser", "name": "Ann"})
+    assert call(app, "POST", "/sum", "scale=2", body=[1, 2, 3]) == (200, 12)
+
+
+def test_errors_are_json_responses():
+    app = LiteApp()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("nope")
+
+    assert call(app, "GET", "/nowhere")[0] == 404
+    assert call(app, "POST", "/items/1")[0] == 405
+    assert call(app, "GET", "/items/abc")[0] == 422
+    assert call(app, "GET", "/boom") == (500, {"detail": "RuntimeError: nope"})
+
+
+def test_lite_runtime_collects_types(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60, lite=True)
+    runtime.types_file = tmp_path / "types.json"
+    assert isinstance(runtime.app, LiteApp)
+
+    @runtime.get("/users/{user_id}")
+    def get_user(user_id: int):
+        return {"id": user_id, "name": "x"}
+
+    assert call(runtime.app, "GET", "/users/7") == (200, {"id": 7, "name": "x"})
+
+    # The lifespan shutdown runs the runtime's flush
+    async def lifespan():
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await runtime.app({"type": "lifespan"}, receive, send)
+        return sent
+
+    assert asyncio.run(lifespan()) == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    with open(runtime.types_file) as f:
+        assert json.load(f)["types"]["get_user"] == {
+            "user_id": "int", "return.id": "int", "return.name": "str"}
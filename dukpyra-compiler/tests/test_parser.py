@@ -10,7 +10,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dukpyra.parser import parse
+from dukpyra.parser import ParseSession, parse
 from dukpyra.ast import (
     ProgramNode, EndpointNode, ClassDefNode, 
     StringExpr, NumberExpr, DictExpr, ListExpr,
@@ -152,5 +152,135 @@ def home():
         assert body.items[1].value.value == False
 
 
+class TestParserSequences:
+    """Long sequences keep source order (left-recursive rules)."""
+
+    def test_long_sequences_keep_order(self):
+        n = 2000
+        code = (
+            'import dukpyra\napp = dukpyra.app()\n\n'
+            'class Model:\n'
+            + ''.join(f'    f{i}: int\n' for i in range(n)) + '\n'
+            + '@app.get("/a")\n'
+            + 'def a(' + ', '.join(f'p{i}: int' for i in range(n)) + '):\n'
+            + '    return {' + ', '.join(f'"k{i}": [{i}, {i + 1}]' for i in range(n)) + '}\n'
+            + ''.join(f'\n@app.get("/e{i}")\ndef e{i}():\n    return None\n' for i in range(n))
+        )
+        ast = parse(code)
+        assert [p.name for p in ast.classes[0].properties] == [f'f{i}' for i in range(n)]
+        handler = ast.endpoints[0].handler
+        assert [p.name for p in handler.params] == [f'p{i}' for i in range(n)]
+        assert [item.key for item in handler.body.items] == [f'k{i}' for i in range(n)]
+        assert [v.value for v in handler.body.items[-1].value.items] == [n - 1, n]
+        assert [e.path for e in ast.endpoints[1:]] == [f'/e{i}' for i in range(n)]
+
+
+class TestCompactNodes:
+    """AST nodes use __slots__ and share interned names."""
+
+    CODE = '''import dukpyra
+app = dukpyra.app()
+
+class CreateItem:
+    name: str
+
+@app.post("/a")
+def a(body: CreateItem):
+    return {"name": body.name}
+
+@app.post("/b")
+def b(body: CreateItem):
+    return {"name": body.name}
+'''
+
+    def test_nodes_have_no_instance_dict(self):
+        import pickle
+        from dukpyra.ast import ast_to_dict
+
+        ast = parse(self.CODE)
+        assert not hasattr(ast, '__dict__')
+        assert not hasattr(ast.endpoints[0].handler.body.items[0], '__dict__')
+        assert pickle.loads(pickle.dumps(ast)) == ast
+        as_dict = ast_to_dict(ast)
+        assert as_dict['_type'] == 'ProgramNode'
+        assert as_dict['classes'][0]['properties'][0]['name'] == 'name'
+        with pytest.raises(AttributeError):
+            ast.undeclared = 1
+
+    def test_names_and_keys_are_interned(self):
+        a, b = parse(self.CODE).endpoints
+        assert a.handler.params[0].type_hint is b.handler.params[0].type_hint
+        assert a.handler.body.items[0].key is b.handler.body.items[0].key
+        assert a.handler.body.items[0].value.member_name is b.handler.body.items[0].value.member_name
+
+
+class TestParseSession:
+    """Each parse owns its lexer/parser state."""
+
+    CODE = '''import dukpyra
+app = dukpyra.app()
+
+@app.get("/a")
+def a():
+    return {"n": 1}
+
+@app.get("/b")
+def b():
+    return {"n": 2}
+'''
+
+    def test_line_numbers_restart_for_every_parse(self):
+        first = parse(self.CODE)
+        second = parse(self.CODE)
+        assert first == second
+        assert first.endpoints[1].handler.body.lineno == 10
+
+    def test_session_is_reusable(self):
+        session = ParseSession()
+        assert session.parse(self.CODE) == session.parse(self.CODE) == parse(self.CODE)
+
+    def test_concurrent_parsing(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        sources = [self.CODE.replace('"/a"', f'"/a{i}"') for i in range(64)]
+        expected = [parse(source) for source in sources]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(parse, sources)) == expected
+
+
+class TestPrebuiltTables:
+    """The committed lexer/parser tables must match the grammar."""
+
+    def test_parsetab_matches_grammar(self):
+        import ply.yacc as yacc
+        from dukpyra import parser as parser_module
+
+        signature = yacc.LRTable().read_table("dukpyra.parsetab")
+        assert signature == parser_module.grammar_signature()
+        assert isinstance(parser_module.parser, yacc.LRParser)
+
+    def test_lextab_matches_token_rules(self, tmp_path):
+        import ply.lex as lex
+
+        package_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dukpyra")
+        lex.lex(module=sys.modules["dukpyra.lexer"]).writetab("lextab", str(tmp_path))
+        with open(os.path.join(package_dir, "lextab.py")) as f:
+            committed = f.read()
+        assert (tmp_path / "lextab.py").read_text() == committed
+
+    def test_import_writes_nothing(self, tmp_path):
+        import subprocess
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", "from dukpyra.parser import parse; parse('')"],
+            cwd=str(tmp_path), env=dict(os.environ, PYTHONPATH=root, PYTHONDONTWRITEBYTECODE="1"),
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout == "" and result.stderr == ""
+        assert list(tmp_path.iterdir()) == []
+        assert not os.path.exists(os.path.join(root, "dukpyra", "parser.out"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
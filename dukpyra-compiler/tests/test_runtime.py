@@ -1,8 +1,12 @@
 import pytest
 import shutil
 import json
+import time
 from pathlib import Path
-from dukpyra.runtime import DukpyraRuntime
+from dukpyra.runtime import DukpyraRuntime, SamplingPolicy
+from dukpyra.profile_store import (
+    append_records, compact_profile, load_observations, load_types, log_path,
+)
 from dukpyra.codegen import generate_csharp
 from dukpyra.parser import parse
 
@@ -14,6 +18,7 @@ def test_runtime_collector():
     # Mock function recording
     runtime._collect_type("get_user", "id", 123)
     runtime._collect_type("get_user", "active", True)
+    runtime.flush()
     
     # Verify file created
     assert runtime.types_file.exists()
@@ -21,13 +26,50 @@ def test_runtime_collector():
     # Verify content
     with open(runtime.types_file) as f:
         data = json.load(f)
-        assert data["get_user"]["id"] == "int"
-        assert data["get_user"]["active"] == "bool"
+        assert data["types"]["get_user"]["id"] == "int"
+        assert data["types"]["get_user"]["active"] == "bool"
     
     # Cleanup
+    runtime.close()
     if runtime.types_file.exists():
         runtime.types_file.unlink()
 
+def test_flush_skips_write_when_nothing_new(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    
+    runtime._collect_type("get_user", "id", 1)
+    assert runtime.flush() is True
+    mtime = runtime.types_file.stat().st_mtime_ns
+    
+    # No calls since the last flush - nothing to write
+    assert runtime.flush() is False
+    
+    # Same type again - only the count delta is appended to the log
+    runtime._collect_type("get_user", "id", 2)
+    assert runtime.flush() is True
+    assert runtime.types_file.stat().st_mtime_ns == mtime
+    
+    # Atomic write leaves no temp files behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["types.json", "types.json.log"]
+    runtime.close()
+
+def test_flush_every_wakes_background_flusher(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60, flush_every=2)
+    runtime.types_file = tmp_path / "types.json"
+    
+    runtime._collect_type("f", "a", 1)
+    runtime._collect_type("f", "b", "x")
+    
+    # Flusher is woken before its 60s interval elapses
+    for _ in range(200):
+        if runtime.types_file.exists():
+            break
+        time.sleep(0.01)
+    
+    assert load_types(runtime.types_file)["f"] == {"a": "int", "b": "str"}
+    runtime.close()
+
 def test_codegen_uses_collected_types(monkeypatch):
     # Mock file existence and content
     mock_types = {
@@ -62,3 +104,507 @@ def get_user(id, name):
     assert "int id" in csharp
     assert "string name" in csharp
     assert "dynamic" not in csharp
+
+def test_binder_applies_defaults_and_positional_args():
+    def handler(user_id: int, verbose: bool = False, *, fields="all"):
+        return user_id
+    
+    bind = DukpyraRuntime._build_binder(handler)
+    assert bind((), {"user_id": 1}) == [("user_id", 1), ("verbose", False), ("fields", "all")]
+    assert bind((7, True), {"fields": "id"}) == [("user_id", 7), ("verbose", True), ("fields", "id")]
+
+def test_wrapped_handler_collects_bound_arguments(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    
+    def get_user(user_id: int, verbose: bool = False):
+        return {"user_id": user_id}
+    
+    wrapper = runtime._wrap_handler(get_user)
+    assert wrapper(user_id=5) == {"user_id": 5}
+    assert runtime.collected_types["get_user"] == {
+        "user_id": "int", "verbose": "bool", "return.user_id": "int",
+    }
+    runtime.close()
+
+def test_wrapper_keeps_sync_and_async_kind(tmp_path):
+    import asyncio
+    import inspect
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    
+    def sync_handler(q: str):
+        return q
+    
+    async def async_handler(q: str):
+        return q
+    
+    # Sync handlers must stay sync so FastAPI runs them in its threadpool
+    sync_wrapper = runtime._wrap_handler(sync_handler)
+    assert not inspect.iscoroutinefunction(sync_wrapper)
+    assert sync_wrapper(q="a") == "a"
+    
+    async_wrapper = runtime._wrap_handler(async_handler)
+    assert inspect.iscoroutinefunction(async_wrapper)
+    assert asyncio.run(async_wrapper(q="b")) == "b"
+    runtime.close()
+
+def test_disabled_sampling_registers_handler_unwrapped():
+    runtime = DukpyraRuntime(sampling=SamplingPolicy(enabled=False))
+    
+    def handler(q: str):
+        return q
+    
+    assert runtime._wrap_handler(handler) is handler
+
+def test_zero_sample_rate_collects_nothing(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60, sampling=SamplingPolicy(rate=0.0))
+    runtime.types_file = tmp_path / "types.json"
+    
+    def handler(q: str):
+        return q
+    
+    wrapper = runtime._wrap_handler(handler)
+    for _ in range(100):
+        wrapper(q="x")
+    assert runtime.collected_types == {}
+
+def test_budget_stops_sampling_stable_endpoint(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60, sampling=SamplingPolicy(budget=3))
+    runtime.types_file = tmp_path / "types.json"
+    calls = []
+    original = runtime._collect_type
+    runtime._collect_type = lambda *a: calls.append(a) or original(*a)
+    
+    def handler(q):
+        return q
+    
+    wrapper = runtime._wrap_handler(handler)
+    for _ in range(10):
+        wrapper(q="x")
+    # 1 call with a new type + 3 stable samples, then the budget is spent
+    # (each sample collects the argument and the return value)
+    assert len(calls) == 8
+    wrapper(q=1)
+    assert len(calls) == 8
+    runtime.close()
+
+def test_adaptive_sampling_backs_off():
+    from dukpyra.runtime import _EndpointSampler
+    sampler = _EndpointSampler(SamplingPolicy(adaptive=True, stable_after=10, min_rate=0.25))
+    for _ in range(10):
+        sampler.record(False)
+    assert sampler.rate == 0.5
+    for _ in range(100):
+        sampler.record(False)
+    assert sampler.rate == 0.25
+    
+    # A new type restores the configured rate
+    sampler.record(True)
+    assert sampler.rate == 1.0
+
+def test_sampling_policy_from_env(monkeypatch):
+    monkeypatch.setenv("DUKPYRA_SAMPLE_RATE", "0.1")
+    monkeypatch.setenv("DUKPYRA_SAMPLE_BUDGET", "1000")
+    monkeypatch.setenv("DUKPYRA_SAMPLE_ADAPTIVE", "1")
+    policy = SamplingPolicy.from_env()
+    assert policy == SamplingPolicy(rate=0.1, budget=1000, adaptive=True)
+    
+    monkeypatch.setenv("DUKPYRA_PROFILE", "off")
+    assert SamplingPolicy.from_env().enabled is False
+
+def test_list_inference_samples_across_the_collection():
+    runtime = DukpyraRuntime()
+    # The first element alone would say List[int]
+    assert runtime._infer_type([1] * 50 + ["x"] * 50) == "List[Union[int, str]]"
+    assert runtime._infer_type([1, None, 3]) == "List[Optional[int]]"
+    assert runtime._infer_type({"a": 1, "b": "x"}) == "Dict[str, Union[int, str]]"
+
+def test_inference_cost_is_bounded():
+    runtime = DukpyraRuntime()
+    visited = []
+    original = runtime._infer_type
+    runtime._infer_type = lambda value, depth=0: visited.append(value) or original(value, depth)
+    
+    runtime._infer_type(list(range(100_000)))
+    assert len(visited) <= 1 + runtime.infer_sample_size
+    
+    # Nesting deeper than infer_max_depth is cut off
+    deep = [[[[[[1]]]]]]
+    assert original(deep) == "List[List[List[List[dynamic]]]]"
+
+def test_steady_state_skips_inference(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    runtime._collect_type("get_user", "id", 1)
+    
+    inferred = []
+    original = runtime._infer_type
+    runtime._infer_type = lambda value, depth=0: inferred.append(value) or original(value, depth)
+    
+    for i in range(100):
+        assert runtime._collect_type("get_user", "id", i) is False
+    assert inferred == []
+    
+    # A different class leaves the fast path and is recorded
+    assert runtime._collect_type("get_user", "id", "42") is True
+    assert runtime.type_observations["get_user"]["id"] == {"int": 101, "str": 1}
+    # The most common type wins
+    assert runtime.collected_types["get_user"]["id"] == "int"
+    runtime.close()
+
+def test_concurrent_threads_count_exactly(tmp_path):
+    import threading
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    start = threading.Barrier(8)
+    
+    def worker(n):
+        start.wait()
+        for i in range(1000):
+            runtime._collect_type("get_user", "id", i)
+            runtime._collect_type("get_user", "name", f"u{n}")
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    # Flushing while the workers run must not lose or double-count anything
+    runtime.flush()
+    for t in threads:
+        t.join()
+    runtime.close()
+    
+    assert runtime.type_observations["get_user"] == {"id": {"int": 8000}, "name": {"str": 8000}}
+    assert load_observations(runtime.types_file)["get_user"]["id"] == {"int": 8000}
+    # Each thread kept its own accumulator; dead threads are dropped after merging
+    assert runtime._accumulators == []
+    
+    from dukpyra.profile_store import load_stats
+    stats = load_stats(runtime.types_file)["get_user"]
+    assert (stats["id"]["min"], stats["id"]["max"]) == (0, 999)
+    assert stats["name"]["lengths"] == {"2": 8000}
+
+def test_collection_shape_memo():
+    runtime = DukpyraRuntime()
+    assert runtime._infer_type([1, 2, 3]) == "List[int]"
+    assert runtime._shape_memo[(list, (int, int, int))] == "List[int]"
+    
+    # Nested collections are never memoized by shallow shape
+    assert runtime._infer_type([[1]]) == "List[List[int]]"
+    assert runtime._infer_type([["a"]]) == "List[List[str]]"
+
+def test_shard_mode_writes_per_process_file(tmp_path):
+    import os
+    runtime = DukpyraRuntime(flush_interval=60, shard=True)
+    runtime.types_file = tmp_path / "types.json"
+    runtime._collect_type("get_user", "id", 1)
+    runtime.close()
+    
+    assert not runtime.types_file.exists()
+    [shard] = (tmp_path / "shards").iterdir()
+    assert shard.name.endswith(f"-{os.getpid()}.json")
+    with open(shard) as f:
+        assert json.load(f)["observations"] == {"get_user": {"id": {"int": 1}}}
+
+def test_merge_profiles_adds_counts(tmp_path):
+    from dukpyra.profile_store import find_shards, merge_profiles
+    
+    shard_dir = tmp_path / "shards"
+    for pid, values in ((1, [1, 2, 3]), (2, ["a"]), (3, ["b", "c", "d", "e"])):
+        runtime = DukpyraRuntime(flush_interval=60)
+        runtime.types_file = shard_dir / f"types-host-{pid}.json"
+        for value in values:
+            runtime._collect_type("get_user", "id", value)
+        runtime._collect_type("get_user", "verbose", True)
+        runtime.close()
+    
+    output = tmp_path / "types.json"
+    assert merge_profiles(find_shards(shard_dir), output) == 3
+    with open(output) as f:
+        data = json.load(f)
+    assert data["observations"]["get_user"] == {
+        "id": {"int": 3, "str": 5},
+        "verbose": {"bool": 3},
+    }
+    assert load_types(output) == {"get_user": {"id": "str", "verbose": "bool"}}
+
+def test_profile_merge_command(tmp_path):
+    from click.testing import CliRunner
+    from dukpyra.cli import cli
+    
+    shard = tmp_path / "types-host-1.json"
+    shard.write_text(json.dumps({"observations": {"f": {"a": ["int"]}}}))
+    output = tmp_path / "types.json"
+    
+    result = CliRunner().invoke(cli, [
+        "profile", "merge", "--shard-dir", str(tmp_path), "-o", str(output),
+    ])
+    assert result.exit_code == 0, result.output
+    with open(output) as f:
+        assert json.load(f)["types"] == {"f": {"a": "int"}}
+
+def test_profile_merge_clean_removes_shard_logs(tmp_path):
+    from click.testing import CliRunner
+    from dukpyra.cli import cli
+    
+    def write_shard(value):
+        runtime = DukpyraRuntime(flush_interval=60)
+        runtime.types_file = tmp_path / "shards" / "types-host-1.json"
+        runtime._collect_type("f", "a", value)
+        runtime.flush()  # snapshot
+        runtime._collect_type("f", "a", value)
+        runtime.flush()  # log only
+        return runtime
+    
+    runtime = write_shard(1)
+    (tmp_path / "shards" / "types-host-1.json.log.3").write_text("")  # compaction segment
+    result = CliRunner().invoke(cli, [
+        "profile", "merge", "--shard-dir", str(tmp_path / "shards"),
+        "-o", str(tmp_path / "types.json"), "--clean",
+    ])
+    assert result.exit_code == 0, result.output
+    assert list((tmp_path / "shards").iterdir()) == []
+    
+    # A later process with the same host and pid starts from an empty profile
+    runtime = write_shard("x")
+    assert load_observations(runtime.types_file) == {"f": {"a": {"str": 2}}}
+    runtime.close()
+
+def test_capture_then_replay_reproduces_profile(tmp_path):
+    pytest.importorskip("fastapi")
+    from dukpyra.replay import load_corpus, replay_corpus, send_request
+    from typing import List
+    import asyncio
+    
+    def build(**kwargs):
+        runtime = DukpyraRuntime(flush_interval=60, **kwargs)
+        
+        @runtime.get("/items/{item_id}")
+        def get_item(item_id: int, q: str = ""):
+            return {"item_id": item_id}
+        
+        @runtime.post("/echo")
+        async def echo(values: List[int]):
+            return {"n": len(values)}
+        
+        return runtime
+    
+    corpus = tmp_path / "corpus.jsonl.gz"
+    live = build(capture=str(corpus))
+    live.types_file = tmp_path / "live" / "types.json"
+    requests = [
+        {"m": "GET", "p": "/items/1", "q": "q=abc"},
+        {"m": "GET", "p": "/items/2"},
+        {"m": "POST", "p": "/echo", "ct": "application/json", "b": "[1, 2, 3]"},
+    ]
+    for record in requests:
+        assert asyncio.run(send_request(live.app, record)) == 200
+    live.close()
+    assert list(load_corpus(corpus)) == requests
+    
+    replayed = build()
+    replayed.types_file = tmp_path / "replay" / "types.json"
+    statuses = replay_corpus(replayed.app, corpus, concurrency=2)
+    replayed.close()
+    
+    assert statuses == {200: 3}
+    assert load_observations(replayed.types_file) == load_observations(live.types_file)
+    assert load_types(replayed.types_file)["echo"]["values"] == "List[int]"
+
+def test_profile_replay_command(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from click.testing import CliRunner
+    from dukpyra.cli import cli
+    
+    (tmp_path / "main.py").write_text(
+        "import dukpyra\n"
+        "app = dukpyra.app()\n"
+        "@app.get('/users/{user_id}')\n"
+        "def get_user(user_id: int):\n"
+        "    return {'id': user_id}\n"
+    )
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('{"m":"GET","p":"/users/7"}\n{"m":"GET","p":"/users/8"}\n')
+    monkeypatch.chdir(tmp_path)
+    
+    # Replay samples every call whatever the environment asks for
+    monkeypatch.setenv("DUKPYRA_SAMPLE_RATE", "0")
+    
+    result = CliRunner().invoke(cli, ["profile", "--replay", str(corpus)])
+    assert result.exit_code == 0, result.output
+    assert "Replayed 2 request(s)" in result.output
+    assert load_observations(tmp_path / ".dukpyra" / "types.json")["get_user"] == {
+        "user_id": {"int": 2},
+        "return.id": {"int": 2},
+    }
+
+@pytest.mark.parametrize("args", [
+    ["--capture", "corpus.jsonl", "--workers", "2"],
+    ["--replay", "corpus.jsonl", "--sample-rate", "0.5"],
+    ["--replay", "corpus.jsonl", "--budget", "10"],
+    ["--replay", "corpus.jsonl", "--adaptive"],
+])
+def test_profile_rejects_nondeterministic_capture_and_replay(tmp_path, monkeypatch, args):
+    from click.testing import CliRunner
+    from dukpyra.cli import cli
+    
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "corpus.jsonl").write_text("")
+    result = CliRunner().invoke(cli, ["profile"] + args)
+    assert result.exit_code == 2
+    assert "Error:" in result.output
+
+def test_flush_appends_to_log_between_compactions(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    runtime._collect_type("get_user", "id", 1)
+    runtime.flush()  # first flush writes the snapshot
+    
+    for i in range(5):
+        runtime._collect_type("get_user", "id", i)
+    runtime._collect_type("get_user", "name", "x")
+    runtime.flush()
+    
+    # Only the count deltas since the last flush are appended
+    lines = log_path(runtime.types_file).read_text().splitlines()
+    assert sorted(line for line in lines if '"t":' in line) == [
+        '{"f":"get_user","a":"id","t":"int","n":5}',
+        '{"f":"get_user","a":"name","t":"str","n":1}',
+    ]
+    # Readers see the log before it is compacted
+    assert load_types(runtime.types_file)["get_user"] == {"id": "int", "name": "str"}
+    
+    runtime.close()
+    assert not log_path(runtime.types_file).exists()
+    with open(runtime.types_file) as f:
+        data = json.load(f)
+    assert data["observations"]["get_user"] == {"id": {"int": 6}, "name": {"str": 1}}
+
+def test_compaction_recovers_after_crash(tmp_path):
+    path = tmp_path / "types.json"
+    append_records(path, [("f", "a", "int", 2)])
+    compact_profile(path)
+    
+    # Crash after the log was frozen as a segment, before the snapshot was written
+    append_records(path, [("f", "a", "str", 1)])
+    log_path(path).rename(tmp_path / "types.json.log.2")
+    append_records(path, [("f", "a", "int", 1)])
+    # ... and a stale segment that is already part of the snapshot
+    (tmp_path / "types.json.log.1").write_text('{"f":"f","a":"a","t":"int","n":100}\n{"f":')
+    
+    expected = {"f": {"a": {"int": 3, "str": 1}}}
+    assert load_observations(path) == expected
+    assert compact_profile(path) == 3
+    assert load_observations(path) == expected
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["types.json"]
+
+def test_return_values_are_profiled(tmp_path):
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    runtime.return_max_fields = 2
+    
+    def count():
+        return 3
+    
+    def lookup(key: str):
+        return {"name": key, "tags": ["a"], key: 1}
+    
+    runtime._wrap_handler(count)()
+    wrapped = runtime._wrap_handler(lookup)
+    wrapped(key="x")
+    wrapped(key="y")
+    
+    assert runtime.collected_types["count"] == {"return": "int"}
+    # Fields beyond return_max_fields (dynamic keys) are not recorded
+    assert runtime.collected_types["lookup"] == {
+        "key": "str", "return.name": "str", "return.tags": "List[str]",
+    }
+    runtime.close()
+
+def test_value_stats_are_bounded_and_mergeable(tmp_path):
+    from dukpyra.profile_store import ValueStats, merge_stats, hll_estimate
+    
+    stats = ValueStats()
+    for i in range(20000):
+        stats.add(i * 1000, int)
+        stats.add("x" * (i % 300), str)
+    assert (stats.lo, stats.hi, stats.max_length) == (0, 19999000, 299)
+    # One histogram bucket per bit of length, fixed-size sketch
+    assert len(stats.lengths) <= 10 and len(stats.registers) == 64
+    estimate = hll_estimate(stats.registers)
+    assert 20300 * 0.6 < estimate < 20300 * 1.4
+    
+    # Merging a delta twice only re-adds the histogram counts
+    merged = {}
+    delta = stats.drain()
+    merge_stats(merged, delta)
+    merge_stats(merged, delta)
+    assert merged["min"] == 0 and merged["hll"] == delta["hll"]
+    assert sum(merged["lengths"].values()) == 40000
+    assert stats.drain().get("lengths") is None
+
+def test_stats_survive_log_compaction_and_merge(tmp_path):
+    from dukpyra.profile_store import load_stats, merge_profiles
+    
+    for pid, values in ((1, [5, 3_000_000_000]), (2, [-7, 12])):
+        runtime = DukpyraRuntime(flush_interval=60)
+        runtime.types_file = tmp_path / f"types-host-{pid}.json"
+        for value in values:
+            runtime._collect_type("get_item", "item_id", value)
+        runtime.flush()  # snapshot
+        runtime._collect_type("get_item", "q", "abc")
+        runtime.flush()  # log only
+        assert load_stats(runtime.types_file)["get_item"]["q"]["max_length"] == 3
+        runtime.close()
+    
+    output = tmp_path / "merged" / "types.json"
+    merge_profiles(sorted(tmp_path.glob("types-*.json")), output)
+    with open(output) as f:
+        stats = json.load(f)["stats"]["get_item"]
+    assert (stats["item_id"]["min"], stats["item_id"]["max"]) == (-7, 3_000_000_000)
+    assert stats["item_id"]["distinct"] == 4
+    assert stats["q"]["lengths"] == {"2": 2}
+
+def test_flush_during_inference_keeps_stats_and_counts_together(tmp_path):
+    """A flush between inferring a value's type and counting it must not break the flusher"""
+    from dukpyra.profile_store import load_stats
+    
+    runtime = DukpyraRuntime(flush_interval=60)
+    runtime.types_file = tmp_path / "types.json"
+    infer = runtime._infer_type
+    
+    def infer_then_flush(value):
+        runtime.flush()
+        return infer(value)
+    
+    runtime._infer_type = infer_then_flush
+    runtime._collect_type("h", "x", 5)
+    runtime._infer_type = infer
+    runtime.close()
+    
+    assert load_observations(runtime.types_file)["h"]["x"] == {"int": 1}
+    assert load_stats(runtime.types_file)["h"]["x"]["max"] == 5
+
+def test_flusher_survives_unexpected_errors(tmp_path, capsys):
+    runtime = DukpyraRuntime(flush_interval=0.01)
+    runtime.types_file = tmp_path / "types.json"
+    flush = runtime.flush
+    failures = []
+    
+    def failing_flush(compact=False):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("boom")
+        return flush(compact)
+    
+    runtime.flush = failing_flush
+    runtime._collect_type("h", "x", 5)
+    for _ in range(200):
+        if runtime.types_file.exists():
+            break
+        time.sleep(0.01)
+    
+    assert runtime._flusher.is_alive()
+    assert load_types(runtime.types_file)["h"] == {"x": "int"}
+    assert "RuntimeError: boom" in capsys.readouterr().err
+    runtime.close()
@@ -0,0 +1,88 @@
+"""
+Dukpyra Compiler Unit Tests - AST Serialization
+
+loads(dumps(ast)) must rebuild exactly the tree the parser produced.
+"""
+
+import random
+
+import pytest
+
+from dukpyra import serialize
+from dukpyra.ast import ast_to_dict
+from dukpyra.parser import parse
+
+
+def random_expression(rng, depth=0):
+    choice = rng.randrange(10 if depth < 3 else 5)
+    if choice == 0:
+        return repr(rng.choice(["", "a", "ข้อความ", "x\\ny", "/users/{id}"]))
+    if choice == 1:
+        return rng.choice(["0", "42", "3.14", "100000000000"])
+    if choice == 2:
+        return rng.choice(["True", "False", "None"])
+    if choice == 3:
+        return rng.choice(["user_id", "body", "n"])
+    if choice == 4:
+        return rng.choice(["body.name", "body.price"])
+    if choice == 5:
+        items = [f'"k{i}": {random_expression(rng, depth + 1)}' for i in range(rng.randrange(4))]
+        return "{" + ", ".join(items) + "}"
+    if choice == 6:
+        return "[" + ", ".join(random_expression(rng, depth + 1) for _ in range(rng.randrange(4))) + "]"
+    if choice == 7:
+        condition = f" if n > {rng.randrange(5)}" if rng.random() < 0.5 else ""
+        return f"[{random_expression(rng, depth + 1)} for n in [1, 2, 3]{condition}]"
+    op = rng.choice(["*", ">", "<", "==", "!=", ">=", "<="])
+    return f"{random_expression(rng, depth + 1)} {op} {random_expression(rng, depth + 1)}"
+
+
+def random_program(rng):
+    lines = ["import dukpyra", "app = dukpyra.app()", ""]
+    classes = [f"Model{i}" for i in range(rng.randrange(3))]
+    for name in classes:
+        lines.append(f"class {name}:")
+        for j in range(rng.randrange(1, 4)):
+            lines.append(f"    f{j}: {rng.choice(['int', 'str', 'float', 'bool', name])}")
+        lines.append("")
+    for i in range(rng.randrange(1, 6)):
+        params = [rng.choice(["user_id: int", "n", "q: str"])]
+        if classes:
+            params.append(f"body: {rng.choice(classes)}")
+        method = rng.choice(["get", "post", "put", "delete", "patch"])
+        lines.append(f'@app.{method}("/r{i}/{{user_id}}")')
+        lines.append(f"def handler_{i}({', '.join(params)}):")
+        lines.append(f"    return {random_expression(rng)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def test_round_trip_matches_parser_output():
+    for seed in range(200):
+        source = random_program(random.Random(seed))
+        ast = parse(source)
+        assert ast is not None, source
+        loaded = serialize.loads(serialize.dumps(ast))
+        assert loaded == ast, source
+        assert ast_to_dict(loaded) == ast_to_dict(ast), source
+
+
+def test_shared_nodes_stay_shared():
+    ast = parse(random_program(random.Random(1)))
+    encoder = serialize.Encoder()
+    payload = (encoder.encode(ast), encoder.encode(ast.endpoints))
+    decoder = serialize.Decoder(encoder.dumps(payload))
+    program = decoder.decode(decoder.payload[0])
+    endpoints = decoder.decode(decoder.payload[1])
+    assert program == ast
+    assert all(a is b for a, b in zip(program.endpoints, endpoints))
+
+
+def test_foreign_or_outdated_data_is_rejected():
+    data = serialize.dumps(parse(random_program(random.Random(2))))
+    with pytest.raises(ValueError):
+        serialize.loads(b"not an AST")
+    with pytest.raises(ValueError):
+        serialize.loads(data[:5] + b"\xff\xff" + data[7:])   # format version
+    with pytest.raises(ValueError):
+        serialize.loads(data[:8] + b"\x00" * 8 + data[16:])   # schema digest
@@ -0,0 +1,91 @@
+"""
+Dukpyra Compiler Unit Tests - Visitor
+
+Table dispatch and explicit-stack traversals (fold/walk), and every AST
+pass on trees nested far deeper than the recursion limit.
+"""
+
+import sys
+
+import pytest
+
+from dukpyra import serialize
+from dukpyra.analyzer import analyze
+from dukpyra.ast import (
+    BinaryOpExpr, ExpressionNode, IdentifierExpr, ListExpr, NumberExpr, ast_to_dict,
+)
+from dukpyra.codegen import generate_csharp
+from dukpyra.parser import parse
+from dukpyra.visitor import Visitor
+
+PREAMBLE = 'import dukpyra\napp = dukpyra.app()\n\n@app.get("/a")\ndef a(n: int):\n    return '
+
+
+class Printer(Visitor):
+    handlers = {ListExpr: "visit_list", BinaryOpExpr: "visit_binary_op",
+                ExpressionNode: "visit_other"}
+
+    def visit_list(self, node, items):
+        return "[" + ", ".join(items) + "]"
+
+    def visit_binary_op(self, node, left, right):
+        return f"({left} {node.op} {right})"
+
+    def visit_other(self, node, *children):
+        return type(node).__name__
+
+
+class Names(Visitor):
+    handlers = {IdentifierExpr: "visit_identifier"}
+
+    def __init__(self):
+        self.seen = []
+
+    def visit_identifier(self, node, depth):
+        self.seen.append((node.name, depth))
+
+    def generic_visit(self, node, depth):
+        return [(child, depth + 1) for child in (getattr(node, "items", None) or [])]
+
+
+def body_of(expression: str):
+    return parse(PREAMBLE + expression + "\n").endpoints[0].handler.body
+
+
+def test_fold_dispatches_by_nearest_base_class():
+    tree = body_of("[1, n * 2, [], None]")
+    assert Printer().fold(tree) == "[NumberExpr, (IdentifierExpr * NumberExpr), [], NoneExpr]"
+    assert Printer().fold([tree, None]) == [Printer().fold(tree), None]
+
+
+def test_walk_threads_context_in_source_order():
+    names = Names()
+    names.walk(body_of("[a, [b, [c]], d]"), 0)
+    assert names.seen == [("a", 1), ("b", 2), ("c", 3), ("d", 1)]
+
+
+@pytest.mark.parametrize("expression", [
+    "[" * 3000 + "n" + "]" * 3000,
+    '{"k": ' * 3000 + "m" + "}" * 3000,
+    " * ".join(["n"] * 3000),
+    "[" * 3000 + "x" + " for x in [1]]" * 3000,
+], ids=["list", "dict", "binop", "comprehension"])
+def test_every_pass_handles_deep_trees(expression):
+    assert 3000 > sys.getrecursionlimit() / 2
+    program = parse(PREAMBLE + expression + "\n")
+    result = analyze(program)
+    csharp = generate_csharp(program)
+    as_dict = ast_to_dict(program)
+    loaded = serialize.loads(serialize.dumps(program))
+    assert generate_csharp(loaded) == csharp
+    assert as_dict["_type"] == "ProgramNode"
+    assert [error.message for error in result.errors] == (
+        ["Undefined variable 'm'"] if "m" in expression else [])
+
+
+def test_serialize_rejects_unknown_node_types():
+    class Custom(NumberExpr):
+        __slots__ = ()
+
+    with pytest.raises(ValueError, match="cannot serialize Custom"):
+        serialize.dumps(ListExpr(items=[Custom(value=1)]))